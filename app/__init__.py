@@ -13,24 +13,43 @@ db = SQLAlchemy()
 def create_app():
     app = Flask(__name__)
     app.config.from_object('config.settings.Config')
-    
+
+    from app.services import startup
+    startup.init_app(app)
+    timer = app.extensions['startup']['timer']
+
     db.init_app(app)
-    
+    with app.app_context():
+        # pragmas go on every new connection, so attach them before the first one
+        from app.services import sqlite_profile
+        sqlite_profile.init_app(app, db.engine)
+
     migrate = Migrate(app, db)
 
     login_manager.init_app(app)
 
-    # Import blueprints
-    from app.controllers.admin_controller import admin_bp
-    from app.controllers.auth_controller import auth_bp
-    from app.controllers.users_controller import users_bp
-    from app.controllers.comments_controller import comments_bp
+    with timer.phase('extensions'):
+        from app.services.certificate_queue import CertificateQueue
+        CertificateQueue(app)
 
-    # Register blueprints
-    app.register_blueprint(admin_bp, url_prefix='/admin')
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(users_bp)
-    app.register_blueprint(comments_bp)
+        from app.services.leaderboard_cache import LeaderboardCache
+        LeaderboardCache(app)
+
+        from app.services.submission_writer import SubmissionWriter
+        SubmissionWriter(app)
+
+    with timer.phase('blueprints'):
+        # Import blueprints
+        from app.controllers.admin_controller import admin_bp
+        from app.controllers.auth_controller import auth_bp
+        from app.controllers.users_controller import users_bp
+        from app.controllers.comments_controller import comments_bp
+
+        # Register blueprints
+        app.register_blueprint(admin_bp, url_prefix='/admin')
+        app.register_blueprint(auth_bp)
+        app.register_blueprint(users_bp)
+        app.register_blueprint(comments_bp)
 
     @login_manager.user_loader
     def load_user(user_id):
@@ -56,17 +75,23 @@ def create_app():
             from .models.score import Score
             from .models.answer import Answer
             from .models.certificate import Certificate
+            from .models.certificate_job import CertificateJob
             from .models.comment import Comment
+            from .models.quiz_attempt import QuizAttempt
+            from .models.standing import Standing
+            from .models.daily_score import DailyScore
+            from .models.quiz_stats import QuizStats
+            from .models.app_state import AppState
         except Exception as e:
             # If imports fail, log but continue; errors will surface elsewhere
             import logging
             logging.warning(f"Failed to import some models: {e}")
 
-        # Create tables automatically - always ensure tables exist
+        # Create tables unless the stored fingerprint shows they are current
         try:
-            db.create_all()
-            import logging
-            logging.info("Database tables initialized")
+            if startup.ensure_schema(app):
+                import logging
+                logging.info("Database tables initialized")
         except Exception as e:
             import logging
             logging.error(f"Failed to create database tables: {e}")
@@ -1,5 +1,6 @@
 from functools import wraps
-from flask import Blueprint, render_template, redirect, flash, request, url_for
+from datetime import datetime, time
+from flask import Blueprint, render_template, redirect, flash, request, url_for, jsonify, abort, Response, stream_with_context
 from sqlalchemy import and_
 from app import db
 from app.forms import SubjectForm, ChapterForm, QuizForm, QuestionForm
@@ -7,16 +8,36 @@ from flask_login import current_user, login_required
 from app.models.chapter import Chapter
 from app.models.question import Question
 from app.models.quiz import Quiz
-from app.models.score import Score
+from app.models.quiz_stats import QuizStats
 from app.models.subject import Subject
 from app.models.user import User
+from app.services.certificate_queue import get_queue as get_certificate_queue
+from app.services import question_cache
+from app.services.export import DATASETS, FORMATS as EXPORT_FORMATS, export_batches, iter_export
+from app.services.quiz_stats import stats_for
+from app.services.leaderboard_cache import get_cache as get_leaderboard_cache
+from app.services.submission_writer import get_writer as get_submission_writer
 from werkzeug.utils import secure_filename
 import os
-from PIL import Image
 import uuid
 
 admin_bp = Blueprint('admin', __name__)
 
+def shrink_image(save_path):
+    """Resize an uploaded image in place to fit 800x800"""
+    try:
+        # PIL is only needed for uploads, so it is not loaded at startup
+        from PIL import Image
+        img = Image.open(save_path)
+        img.thumbnail((800, 800))
+        # ensure RGB for some formats
+        if img.mode in ("RGBA", "P"):
+            img = img.convert("RGB")
+        img.save(save_path, optimize=True, quality=85)
+    except Exception:
+        # if PIL fails, keep original
+        pass
+
 def admin_login_required(func):
     @wraps(func)
 
@@ -35,29 +56,58 @@ def admin_login_required(func):
 @admin_bp.route("/dashboard")
 @admin_login_required
 def admin_dashboard():
-    quizzes = Quiz.query.all()
-    quiz_names = [quiz.name for quiz in quizzes]
-    average_scores = []
-    completion_rates = []
-
-    for quiz in quizzes:
-        scores = Score.query.filter_by(quiz_id=quiz.id).all()
-        if scores:
-            average_score = sum([s.total_scored for s in scores]) / len(scores)
-
-            users_attempted = len(scores)
-            total_users = User.query.filter_by(is_admin=False).count()
-            completion_rate = (users_attempted / total_users * 100) if total_users else 0
-        else:
-           average_score = 0 
-           completion_rate = 0
-        average_scores.append(average_score)
-        completion_rates.append(completion_rate)
+    # precomputed per-quiz statistics; completion counts distinct users
+    rows = db.session.query(
+        Quiz.name,
+        db.func.coalesce(QuizStats.mean, 0.0),
+        db.func.coalesce(QuizStats.user_count, 0)
+    ).outerjoin(QuizStats, QuizStats.quiz_id == Quiz.id).order_by(Quiz.id).all()
+    total_users = User.query.filter_by(is_admin=False).count()
+
+    quiz_names = [name for name, _, _ in rows]
+    average_scores = [average_score for _, average_score, _ in rows]
+    completion_rates = [(users_attempted / total_users * 100) if total_users else 0
+                        for _, _, users_attempted in rows]
     return render_template("admin/dashboard.html",
                            quiz_names=quiz_names,
                            average_scores=average_scores,
                            completion_rates=completion_rates)
 
+@admin_bp.route("/certificate_queue")
+@admin_login_required
+def certificate_queue_metrics():
+    return jsonify(get_certificate_queue().metrics())
+
+@admin_bp.route("/export/<dataset>.<fmt>")
+@admin_login_required
+def export_data(dataset, fmt):
+    if dataset not in DATASETS or fmt not in EXPORT_FORMATS:
+        abort(404)
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    try:
+        start = datetime.combine(datetime.strptime(start_date, '%Y-%m-%d').date(), time.min) if start_date else None
+        end = datetime.combine(datetime.strptime(end_date, '%Y-%m-%d').date(), time.max) if end_date else None
+    except ValueError:
+        abort(400)
+
+    columns, batches = export_batches(dataset, request.args.get('quiz_id', type=int),
+                                      request.args.get('subject_id', type=int), start, end)
+    # rows are read and sent batch by batch while the response streams
+    return Response(stream_with_context(iter_export(fmt, columns, batches)),
+                    mimetype=EXPORT_FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename="{dataset}.{fmt}"'})
+
+@admin_bp.route("/leaderboard_cache")
+@admin_login_required
+def leaderboard_cache_metrics():
+    return jsonify(get_leaderboard_cache().metrics())
+
+@admin_bp.route("/submission_writer")
+@admin_login_required
+def submission_writer_metrics():
+    return jsonify(get_submission_writer().metrics())
+
 # SUBJECT ROUTES
 
 @admin_bp.route("/manage_subjects", methods=['GET', 'POST'])
@@ -202,7 +252,8 @@ def manage_quizzes(chapter_id):
     return render_template("admin/quiz/manage_quizzes.html",
                            query=query,
                            chapter=chapter,
-                           quizzes=quizzes)
+                           quizzes=quizzes,
+                           stats=stats_for(quiz.id for quiz in quizzes))
 
 @admin_bp.route("/chapter/<int:chapter_id>/add_quiz", methods=['GET', 'POST'])
 @admin_login_required
@@ -214,6 +265,7 @@ def add_quiz(chapter_id):
             name=form.name.data,
             date_of_quiz=form.date_of_quiz.data,
             time_duration=form.time_duration.data,
+            draw_count=form.draw_count.data or None,
             chapter_id=chapter_id
         )
         db.session.add(quiz)
@@ -234,6 +286,7 @@ def edit_quiz(chapter_id, quiz_id):
         quiz.name = form.name.data
         quiz.date_of_quiz = form.date_of_quiz.data
         quiz.time_duration = form.time_duration.data
+        quiz.draw_count = form.draw_count.data or None
         quiz.chapter_id = chapter_id
         db.session.commit()
         flash("Quiz updated successfully!", category="success")
@@ -248,6 +301,7 @@ def delete_quiz(chapter_id, quiz_id):
     quiz = Quiz.query.get_or_404(quiz_id)
     db.session.delete(quiz)
     db.session.commit()
+    question_cache.evict(quiz_id)
     flash("Quiz deleted successfully!", category="success")
     return redirect(url_for("admin.manage_quizzes", chapter_id=chapter_id))
 
@@ -256,11 +310,14 @@ def delete_quiz(chapter_id, quiz_id):
 @admin_bp.route("/quiz/<int:quiz_id>/questions")
 @admin_login_required
 def manage_questions(quiz_id):
+    # NumPy is loaded on the first visit instead of at startup
+    from app.services.item_analysis import analyze_quiz
     quiz = Quiz.query.get_or_404(quiz_id)
     questions = quiz.questions
     return render_template("admin/question/manage_questions.html",
                            quiz=quiz,
-                           questions=questions)
+                           questions=questions,
+                           analysis=analyze_quiz(quiz.id))
 
 @admin_bp.route("/quiz/<int:quiz_id>/add_question", methods=['GET', 'POST'])
 @admin_login_required
@@ -289,18 +346,10 @@ def add_question(quiz_id):
             save_path = os.path.join(upload_dir, filename)
             # save to temp then resize
             f.save(save_path)
-            try:
-                img = Image.open(save_path)
-                img.thumbnail((800, 800))
-                # ensure RGB for some formats
-                if img.mode in ("RGBA", "P"):
-                    img = img.convert("RGB")
-                img.save(save_path, optimize=True, quality=85)
-            except Exception:
-                # if PIL fails, keep original
-                pass
+            shrink_image(save_path)
             question.image_path = os.path.join('static', 'uploads', 'questions', filename).replace('\\', '/')
         db.session.add(question)
+        question_cache.bump_version(quiz_id)
         db.session.commit()
         flash("Question added successfully!", category="success")
         return redirect(url_for("admin.manage_questions", quiz_id=quiz_id))
@@ -332,16 +381,13 @@ def edit_question(quiz_id, question_id):
             filename = f"{uuid.uuid4().hex}{ext}"
             save_path = os.path.join(upload_dir, filename)
             f.save(save_path)
-            try:
-                img = Image.open(save_path)
-                img.thumbnail((800, 800))
-                if img.mode in ("RGBA", "P"):
-                    img = img.convert("RGB")
-                img.save(save_path, optimize=True, quality=85)
-            except Exception:
-                pass
+            shrink_image(save_path)
             question.image_path = os.path.join('static', 'uploads', 'questions', filename).replace('\\', '/')
+        old_quiz_id = question.quiz_id
         question.quiz_id = quiz_id
+        question_cache.bump_version(quiz_id)
+        if old_quiz_id != quiz_id:
+            question_cache.bump_version(old_quiz_id)
         db.session.commit()
         flash("Question updated successfully!", category="success")
         return redirect(url_for("admin.manage_questions", quiz_id=quiz_id))
@@ -354,6 +400,7 @@ def edit_question(quiz_id, question_id):
 def delete_question(quiz_id, question_id):
     question = Question.query.get_or_404(question_id)
     db.session.delete(question)
+    question_cache.bump_version(question.quiz_id)
     db.session.commit()
     flash("Question deleted successfully!", category="success")
     return redirect(url_for("admin.manage_questions", quiz_id=quiz_id))
@@ -1,24 +1,27 @@
-from flask import Blueprint, render_template, redirect, flash, url_for, request, session
+from flask import Blueprint, render_template, redirect, flash, url_for, request, session, jsonify, abort, current_app
 from app import db
 from flask_login import current_user, login_required
-from random import shuffle
-import os, csv, time
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from sqlalchemy.exc import IntegrityError
+import logging
 from app.forms import UserDetailsForm, ChangePasswordForm
 from app.models.chapter import Chapter
 from app.models.quiz import Quiz
 from app.models.score import Score
-from app.models.answer import Answer
 from app.models.certificate import Certificate
+from app.models.certificate_job import CertificateJob
+from app.models.comment import Comment
 from app.models.subject import Subject
 from app.models.user import User
+from app.services.attempts import start_attempt, get_attempt, attempt_question_ids, load_answers, save_answers, remember_submission, submitted_quiz_id
+from app.services.certificate_queue import get_queue as get_certificate_queue
+from app.services.certificates import send_certificate
+from app.services.grading import grade, save_submission
+from app.services.leaderboard import leaderboard_page, my_rank, decode_cursor
+from app.services.leaderboard_cache import get_cache as get_leaderboard_cache
+from app.services.question_cache import get_question_set
+from app.services.quiz_stats import stats_for
+from app.services.shuffle import new_attempt, shuffle_questions, option_order, original_option
+from app.services.submission_writer import DuplicateSubmission, get_writer as get_submission_writer
 
 users_bp = Blueprint('users', __name__)
 
@@ -35,231 +38,230 @@ def dashboard():
                            total_attempted_quizzes=total_attempted_quizzes,
                            average_score=average_score)
 
+def _already_submitted(quiz_id):
+    flash('This quiz attempt was already submitted. Showing your result.', category="info")
+    return redirect(url_for("users.quiz_results", quiz_id=quiz_id))
+
+def _submission_not_saved(quiz, token):
+    """The writer gave no result in time; show the result if it landed anyway, else ask for a retry"""
+    db.session.rollback()
+    if submitted_quiz_id(token, current_user.id) is not None:
+        return _already_submitted(quiz.id)
+    flash('Your answers could not be saved right now. Please submit the quiz again.', category="error")
+    return redirect(url_for("users.attempt_quiz", quiz_id=quiz.id))
+
+def _finalize_submission(quiz, token, seed, positions, attempt=None):
+    """Grade shown positions {question id: 1-4}, store the result and redirect to it.
+
+    `token` identifies the rendered attempt; a Score can only be written once
+    per token, so concurrent duplicate POSTs end up on the first result.
+    """
+    # Grade the whole submission in one pass over the cached answer key;
+    # attempts with a drawn subset only touch those questions
+    answer_key = get_question_set(quiz, attempt_question_ids(attempt)).answer_key
+    # Rebuild the shown option order from the seed
+    selected = [original_option(seed, question_id, positions.get(question_id)) for question_id in answer_key.question_ids]
+    graded = grade(answer_key, selected)
+
+    total_awarded = graded.total_awarded
+    total_possible = graded.total_possible
+    percent = (total_awarded / total_possible * 100) if total_possible > 0 else 0
+
+    # Score, answers and the certificate job are written in a single transaction
+    try:
+        # PDF certificates for high scorers are rendered by the background queue
+        certificate = (total_awarded, total_possible) if percent >= 86 else None
+        writer = get_submission_writer()
+        if writer.enabled:
+            # the writer thread commits it together with concurrent submissions
+            future = writer.save(quiz.id, current_user.id, answer_key, graded, attempt_token=token,
+                                 attempt_id=attempt.id if attempt is not None else None, certificate=certificate)
+            try:
+                saved = future.result(timeout=current_app.config['SUBMISSION_WRITER_TIMEOUT'])
+            except (IntegrityError, DuplicateSubmission):
+                raise
+            except Exception:
+                # timed out (concurrent.futures.TimeoutError) or the writer failed
+                logging.exception("Submission writer did not store attempt %s", token)
+                return _submission_not_saved(quiz, token)
+            job = db.session.get(CertificateJob, saved.job_id) if saved.job_id else None
+        else:
+            score = save_submission(quiz.id, current_user.id, answer_key, graded, attempt_token=token)
+            if attempt is not None:
+                attempt.status = 'submitted'
+                attempt.score_id = score.id
+            job = None
+            if certificate is not None:
+                job = get_certificate_queue().add_job(score, *certificate)
+            db.session.commit()
+    except (IntegrityError, DuplicateSubmission):
+        # a concurrent duplicate of this submission won the race
+        db.session.rollback()
+        if submitted_quiz_id(token, current_user.id) is None:
+            raise
+        return _already_submitted(quiz.id)
+    remember_submission(token, current_user.id, quiz.id)
+    get_leaderboard_cache().invalidate()
+
+    flash(f'Quiz completed! Your score: {total_awarded:.2f} / {total_possible:.2f} ({percent:.2f}%)', category="success")
+
+    if job is not None:
+        try:
+            get_certificate_queue().submit(job)
+            if job.status == 'done':
+                flash('Certificate generated successfully!', 'success')
+            elif job.status == 'failed':
+                flash('Certificate generation failed. Please contact administrator.', 'error')
+            else:
+                flash('Your certificate is being generated.', 'info')
+        except Exception:
+            # Log the error but don't block quiz flow; the job stays persisted
+            logging.exception("Failed to submit certificate job")
+
+    return redirect(url_for("users.quiz_results", quiz_id=quiz.id))
+
+def _form_positions(question_ids):
+    positions = {}
+    for question_id in question_ids:
+        user_answer = request.form.get(f'question_{question_id}')
+        if user_answer and user_answer.isdigit():
+            positions[question_id] = int(user_answer)
+    return positions
+
 @users_bp.route("/attempt_quiz/<int:quiz_id>", methods=['GET', 'POST'])
 @login_required
 def attempt_quiz(quiz_id):
     quiz = Quiz.query.get_or_404(quiz_id)
     
     if request.method == 'POST':
-        # Get mapping from session
-        session_key = f'quiz_mapping_{quiz_id}'
-        question_option_mapping = session.get(session_key, {})
-        
-        # Clear the session mapping after use
-        if session_key in session:
-            del session[session_key]
-        
-        total_awarded = 0.0
-        total_possible = 0.0
-
-        # create score placeholder
-        user_score = Score(
-            total_scored=0.0,
-            quiz_id=quiz_id,
-            user_id=current_user.id
-        )
-        db.session.add(user_score)
-        db.session.flush()  # get id
-
-        # Get all questions for this quiz
-        questions = quiz.questions
-        
-        for question in questions:
-            user_answer = request.form.get(f'question_{question.id}')
-            sel = int(user_answer) if user_answer and user_answer.isdigit() else None
-            
-            # Get mapping for this question
-            mapping = question_option_mapping.get(str(question.id), {})
-            correct_shuffled = mapping.get('correct_shuffled')
-            is_correct = (sel == correct_shuffled) if (sel and correct_shuffled) else False
-            points = float(question.points or 0.0)
-            total_possible += points
-            awarded = points if is_correct else 0.0
-            total_awarded += awarded
-
-            # Store the original option number that was selected
-            original_selected = None
-            if sel and mapping.get('shuffled_options'):
-                shuffled_opts = mapping['shuffled_options']
-                # shuffled_opts is list of lists: [[text, orig_num], ...]
-                if 1 <= sel <= len(shuffled_opts):
-                    original_selected = shuffled_opts[sel - 1][1]  # Get original option number
-
-            ans = Answer(
-                score_id=user_score.id,
-                question_id=question.id,
-                selected_option=original_selected,
-                is_correct=is_correct,
-                points_awarded=awarded
-            )
-            db.session.add(ans)
-
-        # finalize score
-        user_score.total_scored = total_awarded
-        db.session.commit()
-
-        percent = (total_awarded / total_possible * 100) if total_possible > 0 else 0
-        flash(f'Quiz completed! Your score: {total_awarded:.2f} / {total_possible:.2f} ({percent:.2f}%)', category="success")
-
-        # generate PDF certificate for high scorers
-        try:
-            if percent >= 86:
-                # Create certificates directory if it doesn't exist
-                certs_dir = os.path.join(os.getcwd(), 'static', 'certificates')
-                os.makedirs(certs_dir, exist_ok=True)
-                
-                # Generate unique filename with timestamp
-                timestamp = int(time.time())
-                filename = f"certificate_{current_user.id}_{quiz_id}_{timestamp}.pdf"
-                relative_path = os.path.join('static', 'certificates', filename).replace('\\', '/')
-                filepath = os.path.join(os.getcwd(), relative_path)
-                
-                # Get subject and chapter info
-                subject_name = quiz.chapter.subject.name if quiz.chapter and quiz.chapter.subject else "General"
-                chapter_name = quiz.chapter.name if quiz.chapter else "General"
-                
-                # Create PDF certificate
-                doc = SimpleDocTemplate(filepath, pagesize=A4)
-                story = []
-                
-                # Define styles
-                styles = getSampleStyleSheet()
-                title_style = ParagraphStyle(
-                    'CustomTitle',
-                    parent=styles['Heading1'],
-                    fontSize=24,
-                    textColor=colors.HexColor('#6366f1'),
-                    spaceAfter=30,
-                    alignment=TA_CENTER,
-                    fontName='Helvetica-Bold'
-                )
-                heading_style = ParagraphStyle(
-                    'CustomHeading',
-                    parent=styles['Heading2'],
-                    fontSize=18,
-                    textColor=colors.HexColor('#1e293b'),
-                    spaceAfter=20,
-                    alignment=TA_CENTER,
-                    fontName='Helvetica-Bold'
-                )
-                normal_style = ParagraphStyle(
-                    'CustomNormal',
-                    parent=styles['Normal'],
-                    fontSize=12,
-                    textColor=colors.HexColor('#64748b'),
-                    spaceAfter=15,
-                    alignment=TA_CENTER,
-                    fontName='Helvetica'
-                )
-                info_style = ParagraphStyle(
-                    'CustomInfo',
-                    parent=styles['Normal'],
-                    fontSize=14,
-                    textColor=colors.HexColor('#1e293b'),
-                    spaceAfter=10,
-                    alignment=TA_LEFT,
-                    fontName='Helvetica'
-                )
-                
-                # Add content
-                story.append(Spacer(1, 1.5*inch))
-                story.append(Paragraph("CERTIFICATE OF ACHIEVEMENT", title_style))
-                story.append(Spacer(1, 0.5*inch))
-                story.append(Paragraph("This is to certify that", normal_style))
-                story.append(Spacer(1, 0.3*inch))
-                story.append(Paragraph(current_user.fullname or current_user.username, heading_style))
-                story.append(Spacer(1, 0.3*inch))
-                story.append(Paragraph("has successfully completed the quiz", normal_style))
-                story.append(Spacer(1, 0.5*inch))
-                
-                # Add quiz information table
-                data = [
-                    ['Subject:', subject_name],
-                    ['Chapter:', chapter_name],
-                    ['Quiz:', quiz.name],
-                    ['Score:', f"{total_awarded:.2f} / {total_possible:.2f}"],
-                    ['Percentage:', f"{percent:.2f}%"],
-                    ['Date:', time.strftime('%Y-%m-%d %H:%M:%S')]
-                ]
-                
-                table = Table(data, colWidths=[2*inch, 4*inch])
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f1f5f9')),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1e293b')),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 12),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                    ('TOPPADDING', (0, 0), (-1, -1), 12),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e2e8f0')),
-                ]))
-                
-                story.append(table)
-                story.append(Spacer(1, 0.5*inch))
-                story.append(Paragraph("Congratulations on your achievement!", normal_style))
-                
-                # Build PDF
-                doc.build(story)
-                
-                # Create certificate record
-                cert = Certificate(
-                    user_id=current_user.id,
-                    quiz_id=quiz_id,
-                    file_path=relative_path
-                )
-                db.session.add(cert)
-                db.session.commit()
-                
-                flash('Certificate generated successfully!', 'success')
-        except Exception as e:
-            # Log the error but don't block quiz flow
-            print('Certificate generation failed:', str(e))
-            import traceback
-            traceback.print_exc()
-            flash('Certificate generation failed. Please contact administrator.', 'error')
-
-        return redirect(url_for("users.quiz_results", quiz_id=quiz_id))
+        # Retried submissions return the stored result without writing again
+        token = request.form.get('attempt_id')
+        if submitted_quiz_id(token, current_user.id) == quiz_id:
+            session.pop(f'quiz_attempt_{quiz_id}', None)
+            return _already_submitted(quiz_id)
+
+        # Get attempt seed from session and clear it after use
+        session_key = f'quiz_attempt_{quiz_id}'
+        attempt = session.pop(session_key, None)
+        if not attempt or attempt.get('id') != token:
+            flash('Your quiz session has expired. Please start the quiz again.', category="error")
+            return redirect(url_for("users.attempt_quiz", quiz_id=quiz_id))
+
+        # Quizzes that draw a subset keep it on a server-side attempt
+        attempt_row = None
+        if quiz.draw_count:
+            attempt_row = get_attempt(attempt['id'], current_user.id)
+            if attempt_row is None:
+                flash('Your quiz session has expired. Please start the quiz again.', category="error")
+                return redirect(url_for("users.attempt_quiz", quiz_id=quiz_id))
+
+        question_ids = get_question_set(quiz, attempt_question_ids(attempt_row)).answer_key.question_ids
+        return _finalize_submission(quiz, token, attempt['seed'], _form_positions(question_ids), attempt=attempt_row)
     
     # GET request - prepare quiz with shuffled options
-    questions = quiz.questions.copy()
-    shuffle(questions)
-    
+    if quiz.draw_count:
+        attempt_row = start_attempt(current_user.id, quiz)
+        attempt = {'id': attempt_row.token, 'seed': attempt_row.seed}
+        question_set = get_question_set(quiz, attempt_question_ids(attempt_row))
+    else:
+        attempt = new_attempt()
+        question_set = get_question_set(quiz)
+    seed = attempt['seed']
+
+    # Large quizzes are delivered page by page
+    if request.args.get('mode') == 'paged' or len(question_set.questions) > current_app.config['PAGED_ATTEMPT_THRESHOLD']:
+        return redirect(url_for("users.attempt_quiz_paged", quiz_id=quiz_id))
+
     # Create a list of questions with randomized options
     questions_with_options = []
-    # Store mapping for POST processing in session
-    question_option_mapping = {}
-    
-    for q in questions:
-        options = [(q.option1, 1), (q.option2, 2), (q.option3, 3), (q.option4, 4)]
-        shuffle(options)
+    for q in shuffle_questions(question_set.questions, seed):
+        # (option text, shown position) - the position is what the form posts back
+        options = [(q.options[orig - 1], pos) for pos, orig in enumerate(option_order(seed, q.id), start=1)]
         questions_with_options.append((q, options))
-        # Create mapping: shuffled_position -> original_option_number
-        # And find where the correct option ended up after shuffling
-        shuffled_correct = None
-        for idx, (opt_text, orig_num) in enumerate(options, start=1):
-            if orig_num == q.correct_option:
-                shuffled_correct = idx
-                break
-        # Store as string key for JSON serialization
-        # Convert tuples to lists for JSON serialization
-        shuffled_options_list = [[opt_text, orig_num] for opt_text, orig_num in options]
-        question_option_mapping[str(q.id)] = {
-            'shuffled_options': shuffled_options_list,  # List of [text, orig_num]
-            'correct_shuffled': shuffled_correct
-        }
-    
-    # Store mapping in session for POST request
-    session_key = f'quiz_mapping_{quiz_id}'
-    session[session_key] = question_option_mapping
-    
-    return render_template("user/attempt_quiz.html", quiz=quiz, questions_with_options=questions_with_options)
+
+    # Only the attempt id and seed are stored; the mapping is rebuilt on POST
+    session[f'quiz_attempt_{quiz_id}'] = attempt
+
+    return render_template("user/attempt_quiz.html", quiz=quiz, questions_with_options=questions_with_options, attempt_id=attempt['id'])
+
+@users_bp.route("/attempt_quiz/<int:quiz_id>/paged")
+@login_required
+def attempt_quiz_paged(quiz_id):
+    quiz = Quiz.query.get_or_404(quiz_id)
+    attempt = start_attempt(current_user.id, quiz)
+    return render_template("user/attempt_quiz_paged.html",
+                           quiz=quiz,
+                           attempt=attempt,
+                           total_questions=len(get_question_set(quiz, attempt_question_ids(attempt)).questions),
+                           page_size=current_app.config['ATTEMPT_PAGE_SIZE'])
+
+@users_bp.route("/attempts/<token>/questions")
+@login_required
+def attempt_questions(token):
+    attempt = get_attempt(token, current_user.id)
+    if attempt is None:
+        abort(404)
+    question_set = get_question_set(attempt.quiz, attempt_question_ids(attempt))
+    ordered = shuffle_questions(question_set.questions, attempt.seed)
+
+    page_size = current_app.config['ATTEMPT_PAGE_SIZE']
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', page_size, type=int), 1), page_size * 5)
+    saved = load_answers(attempt)
+
+    questions = []
+    for number, q in enumerate(ordered[offset:offset + limit], start=offset + 1):
+        image_url = None
+        if q.image_path:
+            image_url = url_for('static', filename=q.image_path.replace('static/', '', 1))
+        questions.append({
+            'id': q.id,
+            'number': number,
+            'statement': q.question_statement,
+            'image_url': image_url,
+            # option texts in shown order; the client posts back 1-based positions
+            'options': [q.options[orig - 1] for orig in option_order(attempt.seed, q.id)],
+            'answer': saved.get(q.id)
+        })
+    return jsonify({'total': len(ordered), 'offset': offset, 'answered': len(saved), 'questions': questions})
+
+@users_bp.route("/attempts/<token>/answers", methods=['POST'])
+@login_required
+def autosave_answers(token):
+    attempt = get_attempt(token, current_user.id)
+    if attempt is None:
+        abort(404)
+    updates = request.get_json(silent=True) or {}
+    if not isinstance(updates, dict):
+        abort(400)
+    question_set = get_question_set(attempt.quiz, attempt_question_ids(attempt))
+    changed = save_answers(attempt, updates.get('answers', {}), question_set.index)
+    return jsonify({'saved': changed})
+
+@users_bp.route("/attempts/<token>/submit", methods=['POST'])
+@login_required
+def submit_attempt(token):
+    submitted_quiz = submitted_quiz_id(token, current_user.id)
+    if submitted_quiz is not None:
+        return _already_submitted(submitted_quiz)
+    attempt = get_attempt(token, current_user.id)
+    if attempt is None:
+        flash('This attempt has expired.', category="error")
+        return redirect(url_for("users.select_quiz"))
+    quiz = attempt.quiz
+    question_set = get_question_set(quiz, attempt_question_ids(attempt))
+    # answers not yet autosaved may come with the final submit
+    positions = load_answers(attempt)
+    for question_id, position in _form_positions(question_set.answer_key.question_ids).items():
+        if 1 <= position <= 4:
+            positions[question_id] = position
+    return _finalize_submission(quiz, token, attempt.seed, positions, attempt=attempt)
 
 @users_bp.route("/quiz_results/<int:quiz_id>")
 @login_required
 def quiz_results(quiz_id):
     quiz = Quiz.query.get_or_404(quiz_id)
-    score = Score.query.filter_by(user_id=current_user.id, quiz_id=quiz_id).first()
+    score = Score.query.filter_by(user_id=current_user.id, quiz_id=quiz_id).order_by(Score.id.desc()).first()
     answers = []
     total_possible = 0.0
     if score:
@@ -270,11 +272,39 @@ def quiz_results(quiz_id):
     percent = (score.total_scored / total_possible * 100) if score and total_possible > 0 else 0
 
     certificate = Certificate.query.filter_by(user_id=current_user.id, quiz_id=quiz_id).order_by(Certificate.created_at.desc()).first()
+    certificate_job = CertificateJob.query.filter(
+        CertificateJob.user_id == current_user.id,
+        CertificateJob.quiz_id == quiz_id,
+        CertificateJob.status.in_(('pending', 'running'))
+    ).order_by(CertificateJob.id.desc()).first()
     
     # Get quiz comments
     quiz_comments = Comment.query.filter_by(comment_type='quiz', quiz_id=quiz_id).order_by(Comment.created_at.desc()).limit(20).all()
 
-    return render_template("user/quiz_results.html", quiz=quiz, score=score, answers=answers, total_possible=total_possible, percent=percent, certificate=certificate, comments=quiz_comments)
+    return render_template("user/quiz_results.html", quiz=quiz, score=score, answers=answers, total_possible=total_possible, percent=percent, certificate=certificate, certificate_job=certificate_job, comments=quiz_comments)
+
+@users_bp.route("/certificate_jobs/<int:job_id>")
+@login_required
+def certificate_job_status(job_id):
+    job = CertificateJob.query.get_or_404(job_id)
+    if job.user_id != current_user.id and not current_user.is_admin:
+        abort(404)
+    return jsonify({
+        'id': job.id,
+        'status': job.status,
+        'certificate_url': url_for('users.download_certificate', certificate_id=job.certificate_id) if job.certificate_id else None
+    })
+
+@users_bp.route("/certificates/<int:certificate_id>/download")
+@login_required
+def download_certificate(certificate_id):
+    cert = Certificate.query.get_or_404(certificate_id)
+    if cert.user_id != current_user.id and not current_user.is_admin:
+        abort(404)
+    response = send_certificate(cert)
+    if response is None:
+        abort(404)
+    return response
 
 @users_bp.route("/leaderboard")
 @login_required
@@ -299,48 +329,39 @@ def leaderboard():
     except ValueError:
         min_score_float = None
 
-    users = User.get_all_users()
-    leaderboard_data = []
-
     subject_name = Subject.query.get(subject_id).name if subject_id else None
 
-    for user in users:
-        # base query with eager loading
-        q = Score.query.filter_by(user_id=user.id)
-        if subject_id:
-            q = q.join(Quiz).join(Chapter).filter(Chapter.subject_id == int(subject_id))
-        if start_datetime:
-            q = q.filter(Score.timestamp >= start_datetime)
-        if end_datetime:
-            q = q.filter(Score.timestamp <= end_datetime)
-            
-        scores = q.all()
-        total_score = sum([s.total_scored for s in scores])
-        avg_score = total_score / len(scores) if scores else 0
-        
-        # Apply filters
-        if subject_id and total_score == 0:
-            continue
-        if min_score_float and total_score < min_score_float:
-            continue
-            
-        leaderboard_data.append({
-            "user_fullname": user.fullname,
-            "total_score": total_score,
-            "avg_score": avg_score,
-            "quiz_count": len(scores),
-            "user": user
-        })
-    
-    leaderboard_data.sort(key=lambda x: (x['total_score'], x['avg_score']), reverse=True)
-    user_fullnames = [x['user_fullname'] for x in leaderboard_data]
-    user_total_scores = [x['total_score'] for x in leaderboard_data]
-    
+    after_cursor = request.args.get('after')
+    after = decode_cursor(after_cursor) if after_cursor else None
+
+    # one page of the ranking, keyset-paginated on (total, avg, user id)
+    page_size = current_app.config['LEADERBOARD_LIMIT']
+    cache = get_leaderboard_cache()
+    leaderboard_data, next_cursor = cache.get_or_compute(
+        cache.make_key(subject_id, start_datetime, end_datetime, min_score_float, page_size, after),
+        lambda: leaderboard_page(subject_id, start_datetime, end_datetime, min_score_float, after=after, limit=page_size))
+
+    # the chart only shows the top of the ranking
+    chart_size = current_app.config['LEADERBOARD_CHART_SIZE']
+    if not after and chart_size <= page_size:
+        chart_data = leaderboard_data[:chart_size]
+    else:
+        chart_data, _ = cache.get_or_compute(
+            cache.make_key(subject_id, start_datetime, end_datetime, min_score_float, chart_size),
+            lambda: leaderboard_page(subject_id, start_datetime, end_datetime, min_score_float, limit=chart_size))
+    user_fullnames = [x['user_fullname'] for x in chart_data]
+    user_total_scores = [x['total_score'] for x in chart_data]
+
+    current_rank = my_rank(current_user.id, subject_id, start_datetime, end_datetime, min_score_float)
+
     # Get all subjects for filter dropdown
     subjects = Subject.query.order_by(Subject.name).all()
     
     return render_template("user/leaderboard.html",
                            leaderboard_data=leaderboard_data,
+                           next_cursor=next_cursor,
+                           is_first_page=after is None,
+                           current_rank=current_rank,
                            user_fullnames=user_fullnames,
                            user_total_scores=user_total_scores,
                            subjects=subjects,
@@ -376,6 +397,7 @@ def select_quiz():
                            subjects=subjects,
                            chapters=chapters,
                            quizzes=quizzes,
+                           stats=stats_for(quiz.id for quiz in quizzes),
                            subject_id=subject_id,
                            chapter_id=chapter_id)
 
@@ -1,7 +1,7 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, DateField, SubmitField, TextAreaField, SelectField, IntegerField, DateTimeLocalField, DecimalField
 from flask_wtf.file import FileField, FileAllowed
-from wtforms.validators import Email, Length, EqualTo, DataRequired
+from wtforms.validators import Email, Length, EqualTo, DataRequired, Optional, NumberRange
 
 class RegisterForm(FlaskForm):
     username = StringField('Email', validators=[DataRequired(), Email()])
@@ -71,6 +71,7 @@ class QuizForm(FlaskForm):
     name = StringField('Name', validators=[DataRequired()])
     date_of_quiz = DateTimeLocalField('Date of Quiz', validators=[DataRequired()])
     time_duration = IntegerField('Time Duration (In seconds)')
+    draw_count = IntegerField('Questions per attempt (empty = all)', validators=[Optional(), NumberRange(min=1)])
     submit = SubmitField('Submit')
 
 class QuestionForm(FlaskForm):
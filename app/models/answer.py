@@ -1,6 +1,11 @@
 from app import db
 
 class Answer(db.Model):
+    __table_args__ = (
+        db.Index('ix_answer_score', 'score_id'),
+        db.Index('ix_answer_question', 'question_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     score_id = db.Column(db.Integer, db.ForeignKey('score.id'), nullable=False)
     question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
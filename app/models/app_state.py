@@ -0,0 +1,9 @@
+from app import db
+
+class AppState(db.Model):
+    """Small key/value store for facts about the database itself, such as the startup fingerprint"""
+    __tablename__ = 'app_state'
+
+    key = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.String(255), nullable=False)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
@@ -1,6 +1,10 @@
 from app import db
 
 class Certificate(db.Model):
+    __table_args__ = (
+        db.Index('ix_certificate_user_quiz_created', 'user_id', 'quiz_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
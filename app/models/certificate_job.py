@@ -0,0 +1,25 @@
+from app import db
+
+class CertificateJob(db.Model):
+    __tablename__ = 'certificate_job'
+    __table_args__ = (
+        # queue recovery and metrics
+        db.Index('ix_certificate_job_status', 'status'),
+        db.Index('ix_certificate_job_user_quiz', 'user_id', 'quiz_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    score_id = db.Column(db.Integer, db.ForeignKey('score.id'), nullable=False)
+    total_awarded = db.Column(db.Float, nullable=False)
+    total_possible = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, done, failed
+    certificate_id = db.Column(db.Integer, db.ForeignKey('certificate.id'), nullable=True)
+    error = db.Column(db.Text)
+    render_ms = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    certificate = db.relationship('Certificate')
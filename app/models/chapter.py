@@ -1,6 +1,10 @@
 from app import db
 
 class Chapter(db.Model):
+    __table_args__ = (
+        db.Index('ix_chapter_subject', 'subject_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
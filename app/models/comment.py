@@ -3,6 +3,10 @@ from datetime import datetime
 
 class Comment(db.Model):
     __tablename__ = 'comment'
+    __table_args__ = (
+        # newest comments of a type, and of one quiz
+        db.Index('ix_comment_type_quiz_created', 'comment_type', 'quiz_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -0,0 +1,16 @@
+from app import db
+
+class DailyScore(db.Model):
+    """Per-day totals of a user's scores in one subject, for date-range leaderboards"""
+    __tablename__ = 'daily_score'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'user_id', 'subject_id', name='uq_daily_score_day_user_subject'),
+        db.Index('ix_daily_score_subject_day', 'subject_id', 'day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    subject_id = db.Column(db.Integer, nullable=False, default=0)  # 0 = quiz without a subject
+    total_score = db.Column(db.Float, nullable=False, default=0.0)
+    score_count = db.Column(db.Integer, nullable=False, default=0)
@@ -2,6 +2,9 @@ from app import db
 
 class Question(db.Model):
     __tablename__ = 'question'
+    __table_args__ = (
+        db.Index('ix_question_quiz', 'quiz_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     question_statement = db.Column(db.String(500), nullable=False)
@@ -1,11 +1,17 @@
 from app import db
 
 class Quiz(db.Model):
+    __table_args__ = (
+        db.Index('ix_quiz_chapter', 'chapter_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     date_of_quiz = db.Column(db.DateTime)
     time_duration = db.Column(db.Integer, default=0)
     chapter_id = db.Column(db.Integer, db.ForeignKey('chapter.id'), nullable=False)
+    draw_count = db.Column(db.Integer, nullable=True)  # questions drawn per attempt; empty serves all
+    question_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bumped on every question edit
 
     questions = db.relationship('Question', backref='quiz', lazy=True)
     scores = db.relationship('Score', backref='quiz', lazy=True)
\ No newline at end of file
@@ -0,0 +1,22 @@
+from app import db
+
+class QuizAttempt(db.Model):
+    __tablename__ = 'quiz_attempt'
+    __table_args__ = (
+        # the user's in-progress attempt at a quiz
+        db.Index('ix_quiz_attempt_user_quiz_status', 'user_id', 'quiz_id', 'status'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    token = db.Column(db.String(32), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    seed = db.Column(db.Integer, nullable=False)
+    question_ids = db.Column(db.Text, nullable=True)  # JSON list of drawn question ids; empty means the whole quiz
+    answers = db.Column(db.Text, nullable=False, default='{}')  # JSON: question id -> shown position
+    status = db.Column(db.String(20), nullable=False, default='in_progress')  # in_progress, submitted
+    score_id = db.Column(db.Integer, db.ForeignKey('score.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    quiz = db.relationship('Quiz')
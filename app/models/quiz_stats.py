@@ -0,0 +1,24 @@
+import math
+from app import db
+
+class QuizStats(db.Model):
+    """Running score statistics of a quiz, updated with every new Score"""
+    __tablename__ = 'quiz_stats'
+
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), primary_key=True)
+    attempt_count = db.Column(db.Integer, nullable=False, default=0)
+    user_count = db.Column(db.Integer, nullable=False, default=0)  # distinct users who attempted
+    mean = db.Column(db.Float, nullable=False, default=0.0)
+    m2 = db.Column(db.Float, nullable=False, default=0.0)  # sum of squared deviations from the mean
+    min_score = db.Column(db.Float)
+    max_score = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    @property
+    def variance(self):
+        """Population variance of the scores"""
+        return self.m2 / self.attempt_count if self.attempt_count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(max(self.variance, 0.0))
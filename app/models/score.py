@@ -1,10 +1,20 @@
 from app import db
 
 class Score(db.Model):
+    __table_args__ = (
+        # a user's attempts at a quiz (results page, retake and stats checks)
+        db.Index('ix_score_quiz_user', 'quiz_id', 'user_id'),
+        # a user's recent scores, newest first
+        db.Index('ix_score_user_timestamp', 'user_id', 'timestamp'),
+        # date-range backfills and exports
+        db.Index('ix_score_timestamp', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     total_scored = db.Column(db.Float, nullable=False)
     timestamp = db.Column(db.DateTime, default=db.func.current_timestamp())
     quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    attempt_token = db.Column(db.String(32), unique=True, nullable=True)  # one Score per rendered attempt
 
     answers = db.relationship('Answer', backref='score', lazy=True)
\ No newline at end of file
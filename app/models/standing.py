@@ -0,0 +1,20 @@
+from app import db
+
+class Standing(db.Model):
+    """Running leaderboard totals of a user, overall (subject_id 0) and per subject"""
+    __tablename__ = 'standing'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'subject_id', name='uq_standing_user_subject'),
+        # matches the leaderboard ordering, so ranked reads walk the index
+        db.Index('ix_standing_rank', 'subject_id', db.desc('total_score'), db.desc('avg_score'), 'user_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    subject_id = db.Column(db.Integer, nullable=False, default=0)  # 0 = all subjects
+    total_score = db.Column(db.Float, nullable=False, default=0.0)
+    avg_score = db.Column(db.Float, nullable=False, default=0.0)
+    attempt_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    user = db.relationship('User')
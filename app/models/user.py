@@ -23,7 +23,8 @@ class User(db.Model, UserMixin):
         return check_password_hash(self.password_hash, password)
     
     @classmethod
-    def get_all_users(cls):
+    def non_admin_filter(cls):
+        """Criteria selecting regular (non-admin) users, usable in any query"""
         admin_username = None
         try:
             if current_app and current_app.config:
@@ -35,4 +36,8 @@ class User(db.Model, UserMixin):
         if not admin_username:
             admin_username = os.getenv('ADMIN_USERNAME', 'admin@quiz.com')
 
-        return cls.query.filter(cls.is_admin.is_(False), cls.username != admin_username).all()
+        return (cls.is_admin.is_(False), cls.username != admin_username)
+
+    @classmethod
+    def get_all_users(cls):
+        return cls.query.filter(*cls.non_admin_filter()).all()
@@ -0,0 +1,10 @@
+"""
+Per-application cache dictionaries.
+"""
+from flask import current_app
+
+
+def app_cache(name):
+    """The dict stored as app.extensions[name] for the current application"""
+    # one cache per application, so several apps in a process never share entries
+    return current_app.extensions.setdefault(name, {})
@@ -0,0 +1,114 @@
+"""
+Server-side in-progress quiz attempts.
+
+Paged attempts, and every attempt of a quiz that draws a random subset of its
+bank, keep their seed, drawn question ids and autosaved answers in a
+QuizAttempt row instead of the browser session. The client batches answer
+changes, and each batch is merged into the row with a single UPDATE;
+unchanged batches do not write at all.
+"""
+import json
+import threading
+from collections import OrderedDict
+from app import db
+from app.models.quiz_attempt import QuizAttempt
+from app.models.score import Score
+from app.services.sampling import draw_question_ids
+from app.services.shuffle import new_attempt
+
+SUBMITTED_CACHE_SIZE = 10000
+
+# attempt token -> (user id, quiz id) of recently finalized attempts
+_submitted = OrderedDict()
+_submitted_lock = threading.Lock()
+
+
+def start_attempt(user_id, quiz):
+    """Resume the user's in-progress attempt for a quiz or start a new one.
+
+    Resuming keeps the drawn subset, so reloading cannot re-roll the draw.
+    """
+    attempt = QuizAttempt.query.filter_by(user_id=user_id, quiz_id=quiz.id, status='in_progress') \
+        .order_by(QuizAttempt.id.desc()).first()
+    if attempt is None:
+        state = new_attempt()
+        question_ids = None
+        if quiz.draw_count:
+            question_ids = json.dumps(draw_question_ids(quiz.id, quiz.draw_count), separators=(',', ':'))
+        attempt = QuizAttempt(token=state['id'], seed=state['seed'], user_id=user_id, quiz_id=quiz.id,
+                              question_ids=question_ids, answers='{}')
+        db.session.add(attempt)
+        db.session.commit()
+    return attempt
+
+
+def attempt_question_ids(attempt):
+    """The drawn question ids of an attempt, or None when it covers the whole quiz"""
+    if attempt is None or not attempt.question_ids:
+        return None
+    return json.loads(attempt.question_ids)
+
+
+def remember_submission(token, user_id, quiz_id):
+    """Record a finalized attempt so retries are answered without a query"""
+    with _submitted_lock:
+        _submitted[token] = (user_id, quiz_id)
+        _submitted.move_to_end(token)
+        while len(_submitted) > SUBMITTED_CACHE_SIZE:
+            _submitted.popitem(last=False)
+
+
+def submitted_quiz_id(token, user_id):
+    """Quiz id if this attempt token was already submitted by the user, else None.
+
+    Retries handled by the same process are answered from memory; otherwise
+    it is one read on the unique Score.attempt_token index.
+    """
+    if not token:
+        return None
+    with _submitted_lock:
+        hit = _submitted.get(token)
+    if hit is not None:
+        return hit[1] if hit[0] == user_id else None
+    quiz_id = db.session.query(Score.quiz_id).filter(Score.attempt_token == token, Score.user_id == user_id).scalar()
+    if quiz_id is not None:
+        remember_submission(token, user_id, quiz_id)
+    return quiz_id
+
+
+def get_attempt(token, user_id):
+    """The in-progress attempt with this token owned by the user, or None"""
+    return QuizAttempt.query.filter_by(token=token, user_id=user_id, status='in_progress').first()
+
+
+def load_answers(attempt):
+    """Saved answers as {question id: shown position}"""
+    return {int(k): v for k, v in json.loads(attempt.answers or '{}').items()}
+
+
+def save_answers(attempt, updates, valid_ids):
+    """Merge a batch of {question id: shown position or None} into the attempt.
+
+    Ids outside `valid_ids` and positions outside 1-4 are ignored. Returns the
+    number of answers that changed; nothing is written when it is zero.
+    """
+    answers = load_answers(attempt)
+    changed = 0
+    for question_id, position in updates.items():
+        try:
+            question_id = int(question_id)
+            position = int(position) if position is not None else None
+        except (TypeError, ValueError):
+            continue
+        if question_id not in valid_ids or (position is not None and not 1 <= position <= 4):
+            continue
+        if answers.get(question_id) != position:
+            if position is None:
+                answers.pop(question_id, None)
+            else:
+                answers[question_id] = position
+            changed += 1
+    if changed:
+        attempt.answers = json.dumps(answers, separators=(',', ':'))
+        db.session.commit()
+    return changed
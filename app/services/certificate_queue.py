@@ -0,0 +1,251 @@
+"""
+Background certificate rendering.
+
+Passing submissions insert a CertificateJob row in the same transaction as
+their Score; a small pool of worker threads renders the PDFs outside the
+request. Jobs live in the database, so anything still pending (or stuck in
+"running" after a crash) is picked up again when the queue starts.
+
+While idle, the workers also sweep the table for jobs persisted by other
+processes. One sweep runs per CERTIFICATE_POLL_SECONDS per queue, however
+many workers time out, and a job id already queued or being rendered in
+this process is not queued again. The stale-job reset only writes when a
+SELECT finds stale rows, so an idle sweep never takes the SQLite write lock.
+
+CERTIFICATE_WORKERS = 0 renders inline inside the request, which is what the
+tests use.
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models.certificate import Certificate
+from app.models.certificate_job import CertificateJob
+from app.models.quiz import Quiz
+from app.models.user import User
+from app.services.certificates import certificate_path, render_certificate
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class CertificateQueue:
+    def __init__(self, app=None):
+        self.app = None
+        self._jobs = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._queued = set()  # job ids queued or being rendered by this process
+        self._last_sweep = None
+        self._rendered = 0
+        self._failed = 0
+        self._render_ms_total = 0.0
+        self._render_ms_max = 0.0
+        self._render_ms_last = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CERTIFICATE_WORKERS', 2)
+        app.config.setdefault('CERTIFICATE_POLL_SECONDS', 30)
+        app.config.setdefault('CERTIFICATE_STALE_SECONDS', 300)
+        app.extensions['certificate_queue'] = self
+        self.app = app
+
+    @property
+    def workers(self):
+        return int(self.app.config['CERTIFICATE_WORKERS'])
+
+    def start(self):
+        """Recover persisted jobs and start the worker threads (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        if self.workers <= 0:
+            return
+        with self.app.app_context():
+            self._sweep()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f'certificate-worker-{i}', daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info("Certificate queue started with %d workers", self.workers)
+
+    def stop(self, timeout=None):
+        """Stop the worker threads once they finish their current job"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+            self._started = False
+        for _ in threads:
+            self._jobs.put(_STOP)
+        for t in threads:
+            t.join(timeout)
+
+    def add_job(self, score, total_awarded, total_possible):
+        """Add a job for `score` to the current transaction; call submit() after commit"""
+        job = CertificateJob(
+            user_id=score.user_id,
+            quiz_id=score.quiz_id,
+            score_id=score.id,
+            total_awarded=total_awarded,
+            total_possible=total_possible,
+            status='pending'
+        )
+        db.session.add(job)
+        return job
+
+    def submit(self, job):
+        """Hand a committed job to the workers, or render it now when running inline"""
+        if self.workers <= 0:
+            self.run_job(job.id)
+            return
+        self.start()
+        self._enqueue(job.id)
+
+    def _enqueue(self, job_id):
+        """Queue a job id unless this process already has it queued or running"""
+        with self._lock:
+            if job_id in self._queued:
+                return False
+            self._queued.add(job_id)
+        self._jobs.put(job_id)
+        return True
+
+    def metrics(self):
+        counts = dict(
+            db.session.query(CertificateJob.status, db.func.count(CertificateJob.id))
+            .group_by(CertificateJob.status).all()
+        )
+        return {
+            'workers': self.workers if self._started else 0,
+            'queue_depth': counts.get('pending', 0),
+            'running': counts.get('running', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'rendered_by_process': self._rendered,
+            'failed_by_process': self._failed,
+            'render_ms_avg': (self._render_ms_total / self._rendered) if self._rendered else None,
+            'render_ms_max': self._render_ms_max if self._rendered else None,
+            'render_ms_last': self._render_ms_last,
+        }
+
+    def run_job(self, job_id):
+        """Claim and render a single job. Returns False if another worker owns it."""
+        claimed = db.session.query(CertificateJob) \
+            .filter(CertificateJob.id == job_id, CertificateJob.status == 'pending') \
+            .update({'status': 'running', 'started_at': datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            return False
+
+        job = db.session.get(CertificateJob, job_id)
+        start = time.perf_counter()
+        try:
+            quiz = db.session.get(Quiz, job.quiz_id)
+            user = db.session.get(User, job.user_id)
+
+            # Get subject and chapter info
+            subject_name = quiz.chapter.subject.name if quiz.chapter and quiz.chapter.subject else "General"
+            chapter_name = quiz.chapter.name if quiz.chapter else "General"
+            percent = (job.total_awarded / job.total_possible * 100) if job.total_possible > 0 else 0
+
+            relative_path, filepath = certificate_path(job.user_id, job.quiz_id, job.score_id)
+            render_certificate(filepath, user.fullname or user.username, subject_name, chapter_name,
+                               quiz.name, job.total_awarded, job.total_possible, percent)
+
+            cert = Certificate(user_id=job.user_id, quiz_id=job.quiz_id, file_path=relative_path)
+            db.session.add(cert)
+            db.session.flush()
+            job.certificate_id = cert.id
+            job.status = 'done'
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(CertificateJob, job_id)
+            job.status = 'failed'
+            job.error = str(e)
+            logger.exception("Certificate job %s failed", job_id)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        job.render_ms = elapsed_ms
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        self._record(job.status == 'done', elapsed_ms)
+        return True
+
+    def _record(self, ok, elapsed_ms):
+        with self._lock:
+            if ok:
+                self._rendered += 1
+                self._render_ms_total += elapsed_ms
+                self._render_ms_max = max(self._render_ms_max, elapsed_ms)
+                self._render_ms_last = elapsed_ms
+            else:
+                self._failed += 1
+
+    def _sweep_due(self):
+        """True for the one idle worker that should sweep now; at most once per poll interval"""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_sweep is not None and now - self._last_sweep < self.app.config['CERTIFICATE_POLL_SECONDS']:
+                return False
+            self._last_sweep = now
+            return True
+
+    def _sweep(self):
+        """Reset jobs left running by a dead worker and queue the pending ones"""
+        with self._lock:
+            self._last_sweep = time.monotonic()
+        self._requeue_persisted()
+
+    def _requeue_persisted(self):
+        """Queue pending jobs and reset jobs left running by a dead worker"""
+        stale_before = datetime.utcnow() - timedelta(seconds=self.app.config['CERTIFICATE_STALE_SECONDS'])
+        stale = [job_id for (job_id,) in db.session.query(CertificateJob.id)
+                 .filter(CertificateJob.status == 'running', CertificateJob.started_at < stale_before)]
+        if stale:
+            db.session.query(CertificateJob) \
+                .filter(CertificateJob.id.in_(stale), CertificateJob.status == 'running') \
+                .update({'status': 'pending'}, synchronize_session=False)
+            db.session.commit()
+        pending = db.session.query(CertificateJob.id) \
+            .filter(CertificateJob.status == 'pending').order_by(CertificateJob.id).all()
+        db.session.remove()
+        for (job_id,) in pending:
+            self._enqueue(job_id)
+
+    def _work(self):
+        while True:
+            try:
+                job_id = self._jobs.get(timeout=self.app.config['CERTIFICATE_POLL_SECONDS'])
+            except queue.Empty:
+                # pick up jobs persisted by other processes
+                if self._sweep_due():
+                    with self.app.app_context():
+                        try:
+                            self._requeue_persisted()
+                        except Exception:
+                            logger.exception("Certificate queue sweep failed")
+                            db.session.remove()
+                continue
+            if job_id is _STOP:
+                return
+            with self.app.app_context():
+                try:
+                    self.run_job(job_id)
+                except Exception:
+                    logger.exception("Certificate worker error on job %s", job_id)
+                finally:
+                    db.session.remove()
+                    with self._lock:
+                        self._queued.discard(job_id)
+
+
+def get_queue():
+    """The current application's CertificateQueue"""
+    return current_app.extensions['certificate_queue']
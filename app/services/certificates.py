@@ -0,0 +1,235 @@
+"""
+PDF certificate rendering.
+
+Styles, colours and the page geometry are computed once per process by
+CertificateTemplate. The static part of the page (title, captions, table grid
+and labels) is kept as a list of canvas operations that is replayed onto each
+new certificate; per-certificate work is limited to stamping the variable
+fields (name, subject, chapter, quiz, score, percentage and date).
+
+Issued certificates are downloaded through send_certificate(), which streams
+the file with a strong content-hash ETag and honours conditional and Range
+requests, or hands the transfer to the front proxy.
+
+reportlab is imported when the first template is built, so processes that
+never render a certificate do not pay for loading it.
+"""
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
+from flask import current_app, request, send_file
+
+CERTIFICATES_DIR = os.path.join('static', 'certificates')
+
+TITLE_COLOR = '#6366f1'
+TEXT_COLOR = '#1e293b'
+MUTED_COLOR = '#64748b'
+LABEL_BG_COLOR = '#f1f5f9'
+GRID_COLOR = '#e2e8f0'
+
+TABLE_LABELS = ('Subject:', 'Chapter:', 'Quiz:', 'Score:', 'Percentage:', 'Date:')
+
+
+def certificate_path(user_id, quiz_id, score_id):
+    """Return (relative_path, absolute_path) for a new certificate file"""
+    # Create certificates directory if it doesn't exist
+    os.makedirs(os.path.join(os.getcwd(), CERTIFICATES_DIR), exist_ok=True)
+
+    # Generate unique filename with timestamp
+    timestamp = int(time.time())
+    filename = f"certificate_{user_id}_{quiz_id}_{score_id}_{timestamp}.pdf"
+    relative_path = os.path.join(CERTIFICATES_DIR, filename).replace('\\', '/')
+    return relative_path, os.path.join(os.getcwd(), relative_path)
+
+
+def _fit_font_size(text, font_name, size, max_width, min_size=8):
+    """Shrink the font size until `text` fits into `max_width`"""
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    while size > min_size and stringWidth(text, font_name, size) > max_width:
+        size -= 1
+    return size
+
+
+class CertificateTemplate:
+    """A4 certificate page; layout is computed once and reused for every render"""
+
+    def __init__(self, pagesize=None, margin=None):
+        from reportlab.lib.colors import HexColor
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import inch
+        if pagesize is None:
+            pagesize = A4
+        if margin is None:
+            margin = inch
+        self.pagesize = pagesize
+        width, height = pagesize
+        self.center_x = width / 2
+        self.text_color = HexColor(TEXT_COLOR)
+        self.text_width = width - 2 * margin
+
+        # vertical rhythm matches the old flowable story (spacers + spaceAfter)
+        y = height - margin - 6 - 1.5 * inch  # 6pt frame padding
+        self.title_y = y - 24
+        y = self.title_y - 30 - 0.5 * inch
+        self.intro_y = y - 12
+        y = self.intro_y - 15 - 0.3 * inch
+        self.name_y = y - 18
+        y = self.name_y - 20 - 0.3 * inch
+        self.completed_y = y - 12
+        y = self.completed_y - 15 - 0.5 * inch
+
+        # information table: two columns, one row per label
+        self.label_width = 2 * inch
+        self.value_width = 4 * inch
+        self.padding = 6
+        self.row_height = 12 * 1.2 + 24
+        self.table_x = self.center_x - (self.label_width + self.value_width) / 2
+        self.table_top = y
+        self.row_baselines = [
+            self.table_top - (i + 1) * self.row_height + 12 + 0.2 * 12
+            for i in range(len(TABLE_LABELS))
+        ]
+        table_bottom = self.table_top - len(TABLE_LABELS) * self.row_height
+        self.footer_y = table_bottom - 0.5 * inch - 12
+
+        self.background = self._build_background()
+
+    def _build_background(self):
+        """Canvas operations for everything that is identical on every certificate"""
+        from reportlab.lib.colors import HexColor
+        ops = []
+        table_height = len(TABLE_LABELS) * self.row_height
+        table_width = self.label_width + self.value_width
+        table_bottom = self.table_top - table_height
+
+        ops.append(('setFillColor', (HexColor(TITLE_COLOR),)))
+        ops.append(('setFont', ('Helvetica-Bold', 24)))
+        ops.append(('drawCentredString', (self.center_x, self.title_y, "CERTIFICATE OF ACHIEVEMENT")))
+
+        ops.append(('setFillColor', (HexColor(MUTED_COLOR),)))
+        ops.append(('setFont', ('Helvetica', 12)))
+        ops.append(('drawCentredString', (self.center_x, self.intro_y, "This is to certify that")))
+        ops.append(('drawCentredString', (self.center_x, self.completed_y, "has successfully completed the quiz")))
+        ops.append(('drawCentredString', (self.center_x, self.footer_y, "Congratulations on your achievement!")))
+
+        # label column background and grid
+        ops.append(('setFillColor', (HexColor(LABEL_BG_COLOR),)))
+        ops.append(('rect', (self.table_x, table_bottom, self.label_width, table_height), {'stroke': 0, 'fill': 1}))
+        ops.append(('setStrokeColor', (HexColor(GRID_COLOR),)))
+        ops.append(('setLineWidth', (1,)))
+        ops.append(('rect', (self.table_x, table_bottom, table_width, table_height), {'stroke': 1, 'fill': 0}))
+        for i in range(1, len(TABLE_LABELS)):
+            row_y = self.table_top - i * self.row_height
+            ops.append(('line', (self.table_x, row_y, self.table_x + table_width, row_y)))
+        ops.append(('line', (self.table_x + self.label_width, table_bottom,
+                             self.table_x + self.label_width, self.table_top)))
+
+        ops.append(('setFillColor', (HexColor(TEXT_COLOR),)))
+        ops.append(('setFont', ('Helvetica-Bold', 12)))
+        for label, baseline in zip(TABLE_LABELS, self.row_baselines):
+            ops.append(('drawString', (self.table_x + self.padding, baseline, label)))
+        return tuple(ops)
+
+    def render(self, filepath, fields):
+        """Write a certificate to `filepath` (a path or binary file object).
+
+        `fields` holds fullname, subject, chapter, quiz, score, percentage and date.
+        """
+        from reportlab.pdfgen.canvas import Canvas
+        c = Canvas(filepath, pagesize=self.pagesize)
+        c.setTitle("Certificate of Achievement")
+        for op in self.background:
+            getattr(c, op[0])(*op[1], **(op[2] if len(op) > 2 else {}))
+
+        fullname = fields['fullname']
+        c.setFillColor(self.text_color)
+        c.setFont('Helvetica-Bold', _fit_font_size(fullname, 'Helvetica-Bold', 18, self.text_width))
+        c.drawCentredString(self.center_x, self.name_y, fullname)
+
+        value_x = self.table_x + self.label_width + self.padding
+        max_value_width = self.value_width - 2 * self.padding
+        values = (fields['subject'], fields['chapter'], fields['quiz'],
+                  fields['score'], fields['percentage'], fields['date'])
+        for value, baseline in zip(values, self.row_baselines):
+            value = str(value)
+            c.setFont('Helvetica', _fit_font_size(value, 'Helvetica', 12, max_value_width))
+            c.drawString(value_x, baseline, value)
+
+        c.showPage()
+        c.save()
+
+
+_template = None
+_template_lock = threading.Lock()
+
+
+def get_template():
+    """Process-wide CertificateTemplate, built on first use"""
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = CertificateTemplate()
+    return _template
+
+
+def render_certificate(filepath, fullname, subject_name, chapter_name, quiz_name, total_awarded, total_possible, percent):
+    """Build the certificate PDF at `filepath`"""
+    get_template().render(filepath, {
+        'fullname': fullname,
+        'subject': subject_name,
+        'chapter': chapter_name,
+        'quiz': quiz_name,
+        'score': f"{total_awarded:.2f} / {total_possible:.2f}",
+        'percentage': f"{percent:.2f}%",
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+    })
+
+
+@lru_cache(maxsize=4096)
+def _content_etag(filepath, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_etag(filepath):
+    """Strong ETag from the file content, hashed once per (path, mtime, size)"""
+    st = os.stat(filepath)
+    return _content_etag(filepath, st.st_mtime_ns, st.st_size)
+
+
+def send_certificate(cert):
+    """Response for downloading `cert`.
+
+    With CERTIFICATE_ACCEL_REDIRECT set (e.g. "/protected/certificates/") the
+    body is left to nginx through X-Accel-Redirect; USE_X_SENDFILE makes
+    send_file emit X-Sendfile instead. Otherwise the file is streamed in
+    chunks by send_file, which also answers If-None-Match and Range requests.
+    """
+    filepath = os.path.join(os.getcwd(), cert.file_path)
+    if not os.path.isfile(filepath):
+        return None
+    etag = file_etag(filepath)
+    download_name = os.path.basename(filepath)
+
+    accel_prefix = current_app.config.get('CERTIFICATE_ACCEL_REDIRECT')
+    if accel_prefix:
+        response = current_app.response_class(mimetype='application/pdf')
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + download_name
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        response.set_etag(etag)
+        response = response.make_conditional(request)
+    else:
+        response = send_file(filepath, mimetype='application/pdf', as_attachment=True,
+                             download_name=download_name, etag=etag, conditional=True,
+                             last_modified=os.path.getmtime(filepath))
+
+    # certificates are per-user, so only the browser may cache them
+    response.cache_control.private = True
+    response.cache_control.max_age = current_app.config.get('CERTIFICATE_MAX_AGE', 3600)
+    return response
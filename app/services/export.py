@@ -0,0 +1,105 @@
+"""
+Streaming exports of scores, answers and certificates.
+
+Each dataset is a single Core SELECT, filtered by quiz, subject and date range
+and executed with yield_per, so rows are fetched from the database in
+batches as the consumer asks for them. The CSV and JSON Lines writers are
+generators that emit one chunk per batch; memory stays constant however many
+rows are exported, and the first bytes go out before the query is finished.
+"""
+import csv
+import io
+import json
+from sqlalchemy import select
+from app import db
+from app.models.answer import Answer
+from app.models.certificate import Certificate
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.models.score import Score
+from app.models.subject import Subject
+from app.models.user import User
+
+FETCH_SIZE = 5000
+FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+
+def _scores():
+    return select(
+        Score.id.label('score_id'), Score.timestamp, Score.user_id, User.username, User.fullname,
+        Score.quiz_id, Quiz.name.label('quiz_name'), Chapter.name.label('chapter_name'),
+        Subject.id.label('subject_id'), Subject.name.label('subject_name'), Score.total_scored
+    ).join(User, Score.user_id == User.id) \
+        .join(Quiz, Score.quiz_id == Quiz.id) \
+        .join(Chapter, Quiz.chapter_id == Chapter.id) \
+        .join(Subject, Chapter.subject_id == Subject.id) \
+        .order_by(Score.id), Score.timestamp
+
+
+def _answers():
+    return select(
+        Answer.id.label('answer_id'), Answer.score_id, Score.timestamp, Score.user_id, Score.quiz_id,
+        Chapter.subject_id, Answer.question_id, Answer.selected_option, Answer.is_correct, Answer.points_awarded
+    ).join(Score, Answer.score_id == Score.id) \
+        .join(Quiz, Score.quiz_id == Quiz.id) \
+        .join(Chapter, Quiz.chapter_id == Chapter.id) \
+        .order_by(Answer.id), Score.timestamp
+
+
+def _certificates():
+    return select(
+        Certificate.id.label('certificate_id'), Certificate.created_at, Certificate.user_id, User.username,
+        User.fullname, Certificate.quiz_id, Quiz.name.label('quiz_name'), Chapter.subject_id, Certificate.file_path
+    ).join(User, Certificate.user_id == User.id) \
+        .join(Quiz, Certificate.quiz_id == Quiz.id) \
+        .join(Chapter, Quiz.chapter_id == Chapter.id) \
+        .order_by(Certificate.id), Certificate.created_at
+
+
+DATASETS = {
+    'scores': _scores,
+    'answers': _answers,
+    'certificates': _certificates,
+}
+
+
+def export_batches(dataset, quiz_id=None, subject_id=None, start=None, end=None):
+    """(column names, iterator of row batches) for a dataset; batches are fetched lazily"""
+    stmt, timestamp = DATASETS[dataset]()
+    if quiz_id:
+        stmt = stmt.where(Quiz.id == int(quiz_id))
+    if subject_id:
+        stmt = stmt.where(Chapter.subject_id == int(subject_id))
+    if start:
+        stmt = stmt.where(timestamp >= start)
+    if end:
+        stmt = stmt.where(timestamp <= end)
+    columns = [c.name for c in stmt.selected_columns]
+
+    def batches():
+        result = db.session.execute(stmt.execution_options(yield_per=FETCH_SIZE))
+        yield from result.partitions()
+    return columns, batches()
+
+
+def iter_csv(columns, batches):
+    """CSV text, a header chunk then one chunk per batch of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+
+def iter_jsonl(columns, batches):
+    """JSON Lines text, one object per row, one chunk per batch of rows"""
+    for batch in batches:
+        yield ''.join(json.dumps(dict(zip(columns, row)), default=str) + '\n' for row in batch)
+
+
+def iter_export(fmt, columns, batches):
+    return iter_csv(columns, batches) if fmt == 'csv' else iter_jsonl(columns, batches)
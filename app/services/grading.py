@@ -0,0 +1,77 @@
+"""
+Set-based grading of quiz submissions.
+
+The answer key of a quiz is loaded as flat, index-aligned tuples (question id,
+correct option, points), a submission is scored in one pass over those arrays
+and the Score plus all of its Answer rows are written in a single transaction
+with one bulk INSERT for the answers.
+"""
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import insert
+from app import db
+from app.models.answer import Answer
+from app.models.question import Question
+from app.models.score import Score
+from app.services import quiz_stats
+from app.services.standings import record_score
+
+AnswerKey = namedtuple('AnswerKey', ['question_ids', 'correct_options', 'points'])
+GradedSubmission = namedtuple('GradedSubmission', ['selected', 'correct', 'awarded', 'total_awarded', 'total_possible'])
+
+
+def load_answer_key(quiz_id):
+    """Load the answer key of a quiz without materializing Question objects"""
+    rows = db.session.query(Question.id, Question.correct_option, Question.points) \
+        .filter(Question.quiz_id == quiz_id).order_by(Question.id).all()
+    return AnswerKey(
+        question_ids=tuple(r[0] for r in rows),
+        correct_options=tuple(r[1] for r in rows),
+        points=tuple(float(r[2] or 0.0) for r in rows)
+    )
+
+
+def grade(answer_key, selected):
+    """Score a submission.
+
+    `selected` holds the original option number chosen for each question
+    (None when unanswered), aligned with `answer_key.question_ids`.
+    """
+    correct = tuple(s is not None and s == c for s, c in zip(selected, answer_key.correct_options))
+    awarded = tuple(p if ok else 0.0 for p, ok in zip(answer_key.points, correct))
+    return GradedSubmission(
+        selected=tuple(selected),
+        correct=correct,
+        awarded=awarded,
+        total_awarded=sum(awarded),
+        total_possible=sum(answer_key.points)
+    )
+
+
+def save_submission(quiz_id, user_id, answer_key, graded, attempt_token=None):
+    """Add the Score, all Answer rows and the derived statistics to the current transaction.
+
+    The caller commits, so anything else belonging to the submission (such as
+    a certificate job) lands in the same transaction.
+    """
+    score = Score(total_scored=graded.total_awarded, quiz_id=quiz_id, user_id=user_id,
+                  attempt_token=attempt_token, timestamp=datetime.utcnow())
+    db.session.add(score)
+    db.session.flush()  # get id
+
+    rows = [
+        {
+            'score_id': score.id,
+            'question_id': question_id,
+            'selected_option': selected,
+            'is_correct': correct,
+            'points_awarded': awarded
+        }
+        for question_id, selected, correct, awarded in zip(
+            answer_key.question_ids, graded.selected, graded.correct, graded.awarded)
+    ]
+    if rows:
+        db.session.execute(insert(Answer), rows)
+    record_score(user_id, quiz_id, graded.total_awarded, score.timestamp.date())
+    quiz_stats.record_score(score)
+    return score
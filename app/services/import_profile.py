@@ -0,0 +1,88 @@
+"""
+Cold-start import profile.
+
+profile() runs a fresh interpreter with `-X importtime` that builds the
+application (or runs other given code), then parses the per-module timings
+Python writes to stderr. Each module appears once, on its first import, so
+the self times add up to the total import cost; by_package() folds them into
+top-level packages, which is what usually matters when deciding what to load
+lazily. The child also reports its peak resident memory.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+ImportTiming = namedtuple('ImportTiming', ['module', 'self_us', 'cumulative_us', 'depth'])
+StartupProfile = namedtuple('StartupProfile', ['timings', 'wall_ms', 'max_rss_kb'])
+
+DEFAULT_TARGET = 'from app import create_app; create_app()'
+
+# "import time:       535 |      62605 |   app.services.item_analysis"
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+_RSS = '__max_rss_kb__='
+_RSS_PROBE = (
+    "\ntry:\n"
+    "    import resource\n"
+    f"    print({_RSS!r} + str(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))\n"
+    "except ImportError:\n"
+    "    pass\n"
+)
+
+
+def parse_importtime(lines):
+    """Yield an ImportTiming for every `-X importtime` line in `lines`"""
+    for line in lines:
+        m = _LINE.match(line)
+        if m:
+            yield ImportTiming(m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2)
+
+
+def profile(code=DEFAULT_TARGET, cwd=None):
+    """Run `code` in a new interpreter and return its StartupProfile"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code + _RSS_PROBE],
+                          capture_output=True, text=True, cwd=cwd or os.getcwd())
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit status {proc.returncode}")
+    max_rss_kb = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(_RSS):
+            max_rss_kb = int(line[len(_RSS):])
+    return StartupProfile(list(parse_importtime(proc.stderr.splitlines())), wall_ms, max_rss_kb)
+
+
+def by_package(timings):
+    """[(top-level package, self us, module count)], most expensive first"""
+    totals = {}
+    for t in timings:
+        package = t.module.split('.', 1)[0]
+        self_us, count = totals.get(package, (0, 0))
+        totals[package] = (self_us + t.self_us, count + 1)
+    return sorted(((p, us, n) for p, (us, n) in totals.items()), key=lambda row: -row[1])
+
+
+def slowest(timings, top=15):
+    """The `top` modules with the largest self time"""
+    return sorted(timings, key=lambda t: -t.self_us)[:top]
+
+
+def format_profile(report, top=15):
+    """Text summary of a StartupProfile"""
+    total_us = sum(t.self_us for t in report.timings)
+    lines = [f"{len(report.timings)} modules imported in {total_us / 1000:.1f}ms "
+             f"(process wall time {report.wall_ms:.0f}ms"
+             + (f", peak RSS {report.max_rss_kb / 1024:.1f} MiB)" if report.max_rss_kb else ")"),
+             "",
+             f"{'package':<32} {'self ms':>9} {'share':>7} {'modules':>8}"]
+    for package, self_us, count in by_package(report.timings)[:top]:
+        share = self_us / total_us * 100 if total_us else 0.0
+        lines.append(f"{package:<32} {self_us / 1000:>9.1f} {share:>6.1f}% {count:>8}")
+    lines += ["", f"{'module':<48} {'self ms':>9} {'cumul ms':>9}"]
+    for t in slowest(report.timings, top):
+        lines.append(f"{t.module:<48} {t.self_us / 1000:>9.1f} {t.cumulative_us / 1000:>9.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,135 @@
+"""
+Item analysis of quiz questions.
+
+For every question of a quiz this computes
+  - difficulty (p-value): the share of responses that are correct,
+  - discrimination index: p-value in the top 27% of submissions minus the
+    p-value in the bottom 27%, ranked by the number of correct answers,
+  - distractor frequencies: the share of responses choosing each option,
+    with unanswered responses counted separately.
+
+(score_id, question_id, selected_option, is_correct) are streamed from the
+Answer table in large partitions straight into NumPy arrays, and all
+statistics are computed with bincount over those arrays; no ORM objects are
+built. Results are cached per quiz and reused until the quiz receives a new
+submission (QuizStats.attempt_count) or its questions change
+(Quiz.question_version).
+"""
+import threading
+from collections import namedtuple
+import numpy as np
+from sqlalchemy import select
+from app import db
+from app.models.answer import Answer
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.models.quiz_stats import QuizStats
+from app.services.app_cache import app_cache
+
+GROUP_FRACTION = 0.27
+FETCH_SIZE = 50000
+OPTIONS = 4
+
+ItemStats = namedtuple('ItemStats', ['responses', 'p_value', 'discrimination', 'option_counts', 'option_freq', 'unanswered'])
+QuizAnalysis = namedtuple('QuizAnalysis', ['quiz_id', 'submissions', 'items'])
+
+_lock = threading.Lock()
+
+
+def _load_responses(quiz_id):
+    """(score ids, question ids, selected options with 0 for unanswered, correct flags) arrays"""
+    result = db.session.execute(
+        select(Answer.score_id, Answer.question_id, db.func.coalesce(Answer.selected_option, 0),
+               db.func.coalesce(Answer.is_correct, False))
+        .join(Question, Answer.question_id == Question.id)
+        .where(Question.quiz_id == quiz_id)
+        .execution_options(yield_per=FETCH_SIZE)
+    )
+    chunks = [np.array(rows, dtype=np.int64).reshape(-1, 4) for rows in result.partitions()]
+    data = np.concatenate(chunks) if chunks else np.empty((0, 4), dtype=np.int64)
+    return data[:, 0], data[:, 1], data[:, 2], data[:, 3].astype(bool)
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.maximum(denominator, 1), np.nan)
+
+
+def compute(question_ids, score_ids, answer_question_ids, selected, correct):
+    """Item statistics for `question_ids` from flat, row-aligned response arrays"""
+    question_ids = np.asarray(sorted(question_ids), dtype=np.int64)
+    n_questions = len(question_ids)
+    if n_questions == 0 or len(score_ids) == 0:
+        return 0, {int(q): ItemStats(0, None, None, (0,) * OPTIONS, (None,) * OPTIONS, 0) for q in question_ids}
+
+    # responses to questions no longer in the quiz are ignored
+    q_idx = np.searchsorted(question_ids, answer_question_ids)
+    q_idx = np.minimum(q_idx, n_questions - 1)
+    known = question_ids[q_idx] == answer_question_ids
+    q_idx, score_ids, selected, correct = q_idx[known], score_ids[known], selected[known], correct[known]
+
+    submissions, s_idx = np.unique(score_ids, return_inverse=True)
+    n_submissions = len(submissions)
+    weights = correct.astype(np.float64)
+
+    responses = np.bincount(q_idx, minlength=n_questions)
+    p_values = _ratio(np.bincount(q_idx, weights=weights, minlength=n_questions), responses)
+
+    # upper and lower groups by number of correct answers (ties broken by order)
+    totals = np.bincount(s_idx, weights=weights, minlength=n_submissions)
+    group_size = max(1, int(round(n_submissions * GROUP_FRACTION)))
+    ranked = np.argsort(totals, kind='stable')
+    group = np.zeros(n_submissions, dtype=np.int8)
+    if n_submissions >= 2:
+        group[ranked[:group_size]] = -1
+        group[ranked[-group_size:]] = 1
+    answer_group = group[s_idx]
+    p_group = {}
+    for g in (-1, 1):
+        mask = answer_group == g
+        p_group[g] = _ratio(np.bincount(q_idx[mask], weights=weights[mask], minlength=n_questions),
+                            np.bincount(q_idx[mask], minlength=n_questions))
+    discrimination = p_group[1] - p_group[-1]
+
+    # option 0 holds unanswered responses
+    counts = np.bincount(q_idx * (OPTIONS + 1) + np.clip(selected, 0, OPTIONS),
+                         minlength=n_questions * (OPTIONS + 1)).reshape(n_questions, OPTIONS + 1)
+    freqs = _ratio(counts, responses[:, None])
+
+    def value(x):
+        return None if np.isnan(x) else float(x)
+
+    items = {}
+    for i, question_id in enumerate(question_ids):
+        items[int(question_id)] = ItemStats(
+            responses=int(responses[i]),
+            p_value=value(p_values[i]),
+            discrimination=value(discrimination[i]),
+            option_counts=tuple(int(c) for c in counts[i, 1:]),
+            option_freq=tuple(value(f) for f in freqs[i, 1:]),
+            unanswered=int(counts[i, 0]),
+        )
+    return n_submissions, items
+
+
+def analyze_quiz(quiz_id):
+    """QuizAnalysis for a quiz, recomputed only when it has new submissions or question changes"""
+    watermark = db.session.query(Quiz.question_version, QuizStats.attempt_count) \
+        .outerjoin(QuizStats, QuizStats.quiz_id == Quiz.id).filter(Quiz.id == quiz_id).one()
+    watermark = (watermark[0] or 0, watermark[1] or 0)
+    cache = app_cache('item_analysis_cache')
+    cached = cache.get(quiz_id)
+    if cached is not None and cached[0] == watermark:
+        return cached[1]
+
+    question_ids = [qid for (qid,) in db.session.query(Question.id).filter(Question.quiz_id == quiz_id)]
+    submissions, items = compute(question_ids, *_load_responses(quiz_id))
+    analysis = QuizAnalysis(quiz_id, submissions, items)
+    with _lock:
+        cache[quiz_id] = (watermark, analysis)
+    return analysis
+
+
+def evict(quiz_id):
+    with _lock:
+        app_cache('item_analysis_cache').pop(quiz_id, None)
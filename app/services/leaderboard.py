@@ -0,0 +1,146 @@
+"""
+Leaderboard queries.
+
+Without a date range the leaderboard is an ordered, indexed read of the
+materialized Standing rows (see app.services.standings). Date ranges are whole
+days, so those views run one grouped query over the DailyScore rollups: the
+rollup rows of regular users are joined with the subject and day filters in
+the join condition, summed per user, filtered on the aggregate in HAVING,
+then ordered and limited by the database. That touches at most one row per
+user, subject and day in the range, however many attempts it holds.
+
+Both are ranked by (total_score desc, avg_score desc, user_id) and paged with
+keyset pagination: a page starts after the cursor of the previous page's
+last row instead of at an OFFSET, so deep pages cost the same as the first.
+"""
+from sqlalchemy import and_, or_
+from app import db
+from app.models.daily_score import DailyScore
+from app.models.standing import Standing
+from app.models.user import User
+from app.services.standings import ALL_SUBJECTS
+
+USER_COLUMNS = (User.id, User.fullname, User.avatar)
+
+
+def _entry(user_id, fullname, avatar, total, avg, count):
+    # plain values only, so entries can be cached beyond the session
+    return {
+        "user_id": user_id,
+        "user_fullname": fullname,
+        "avatar": avatar,
+        "total_score": total,
+        "avg_score": avg,
+        "quiz_count": count
+    }
+
+
+def encode_cursor(entry):
+    """Cursor of a leaderboard entry, for the `after` parameter of the next page"""
+    return f"{entry['total_score']!r}:{entry['avg_score']!r}:{entry['user_id']}"
+
+
+def decode_cursor(value):
+    """(total, avg, user_id) from a cursor string, or None if it is malformed"""
+    try:
+        total, avg, user_id = value.split(':')
+        return float(total), float(avg), int(user_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _ranked_after(keys, cursor):
+    """Rows ranked below `cursor`"""
+    total, avg, user_id = keys
+    t, a, u = cursor
+    # the leading bound lets the database range-scan the ranking index
+    return and_(total <= t, or_(total < t, and_(total == t, avg < a), and_(total == t, avg == a, user_id > u)))
+
+
+def _ranked_before(keys, cursor):
+    """Rows ranked above `cursor`"""
+    total, avg, user_id = keys
+    t, a, u = cursor
+    return and_(total >= t, or_(total > t, and_(total == t, avg > a), and_(total == t, avg == a, user_id < u)))
+
+
+def _standing_query(subject_id, min_score):
+    query = db.session.query(*USER_COLUMNS, Standing.total_score, Standing.avg_score, Standing.attempt_count) \
+        .join(Standing, Standing.user_id == User.id) \
+        .filter(Standing.subject_id == (int(subject_id) if subject_id else ALL_SUBJECTS),
+                *User.non_admin_filter())
+    if subject_id:
+        query = query.filter(Standing.total_score != 0)
+    if min_score:
+        query = query.filter(Standing.total_score >= min_score)
+    return query, (Standing.total_score, Standing.avg_score, Standing.user_id), query.filter
+
+
+def _daily_query(subject_id, start, end, min_score):
+    rollup_filters = [DailyScore.user_id == User.id]
+    if subject_id:
+        rollup_filters.append(DailyScore.subject_id == int(subject_id))
+    if start:
+        rollup_filters.append(DailyScore.day >= start.date())
+    if end:
+        rollup_filters.append(DailyScore.day <= end.date())
+
+    total_score = db.func.sum(DailyScore.total_score)
+    quiz_count = db.func.sum(DailyScore.score_count)
+    avg_score = total_score / quiz_count
+
+    query = db.session.query(*USER_COLUMNS, total_score, avg_score, quiz_count) \
+        .join(DailyScore, and_(*rollup_filters)) \
+        .filter(*User.non_admin_filter()) \
+        .group_by(User.id)
+    if subject_id:
+        query = query.having(total_score != 0)
+    if min_score:
+        query = query.having(total_score >= min_score)
+    return query, (total_score, avg_score, User.id), query.having
+
+
+def _ranking(subject_id, start, end, min_score):
+    """(query, ranking keys, function applying a condition on the keys)"""
+    if start or end:
+        return _daily_query(subject_id, start, end, min_score)
+    return _standing_query(subject_id, min_score)
+
+
+def leaderboard_page(subject_id=None, start=None, end=None, min_score=None, after=None, limit=None):
+    """One page of the ranking as (entries, cursor of the next page or None).
+
+    Only users with at least one score in the selected scope are ranked.
+    `min_score` keeps users whose total reaches it; `after` is a decoded
+    cursor of the last entry of the previous page.
+    """
+    query, keys, where = _ranking(subject_id, start, end, min_score)
+    if after:
+        query = where(_ranked_after(keys, after))
+    total, avg, user_id = keys
+    query = query.order_by(total.desc(), avg.desc(), user_id)
+    if limit:
+        query = query.limit(limit + 1)
+    entries = [_entry(*row) for row in query]
+    if limit and len(entries) > limit:
+        entries = entries[:limit]
+        return entries, encode_cursor(entries[-1])
+    return entries, None
+
+
+def my_rank(user_id, subject_id=None, start=None, end=None, min_score=None):
+    """{'rank', 'ranked', 'entry'} for a user in the selected ranking, or None if unranked.
+
+    The rank is one count of the users ranked above; nothing else is loaded.
+    """
+    query, keys, where = _ranking(subject_id, start, end, min_score)
+    row = query.filter(User.id == user_id).first()
+    if row is None:
+        return None
+    entry = _entry(*row)
+    cursor = (entry['total_score'], entry['avg_score'], entry['user_id'])
+    return {
+        'rank': where(_ranked_before(keys, cursor)).count() + 1,
+        'ranked': query.count(),
+        'entry': entry,
+    }
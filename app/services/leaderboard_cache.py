@@ -0,0 +1,104 @@
+"""
+Response cache for leaderboard views.
+
+Leaderboard pages are cached per normalized filter tuple (subject, date range,
+minimum score, page size and cursor) in a small LRU with a short TTL. New scores in this
+process clear the cache right after they commit; the TTL bounds how long a
+view can lag behind scores written by other processes.
+
+Each application gets its own cache in app.extensions['leaderboard_cache'].
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+
+class LeaderboardCache:
+    def __init__(self, app=None):
+        self.app = None
+        self._entries = OrderedDict()  # key -> (expires_at, rows)
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by invalidate(), so racing computes are not stored
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('LEADERBOARD_CACHE_SIZE', 128)
+        app.config.setdefault('LEADERBOARD_CACHE_TTL', 30)
+        app.extensions['leaderboard_cache'] = self
+        self.app = app
+
+    @staticmethod
+    def make_key(subject_id, start, end, min_score, limit, after=None):
+        """Normalize filter values so equivalent requests share an entry"""
+        return (
+            int(subject_id) if subject_id else None,
+            start.isoformat() if start else None,
+            end.isoformat() if end else None,
+            float(min_score) if min_score else None,
+            int(limit) if limit else None,
+            tuple(after) if after else None,
+        )
+
+    def get_or_compute(self, key, compute):
+        """Cached value for `key`, calling compute() on a miss or expired entry"""
+        ttl = self.app.config['LEADERBOARD_CACHE_TTL']
+        size = self.app.config['LEADERBOARD_CACHE_SIZE']
+        if ttl <= 0 or size <= 0:
+            return compute()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        rows = compute()
+        with self._lock:
+            if generation != self._generation:
+                return rows
+            self._entries[key] = (time.monotonic() + ttl, rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return rows
+
+    def invalidate(self):
+        """Drop every entry; call after committing new scores"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def metrics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.app.config['LEADERBOARD_CACHE_SIZE'],
+                'ttl_seconds': self.app.config['LEADERBOARD_CACHE_TTL'],
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / lookups) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+def get_cache():
+    return current_app.extensions['leaderboard_cache']
@@ -0,0 +1,89 @@
+"""
+Process-level cache of compiled quiz question sets.
+
+A QuestionSet is an immutable, compact snapshot of a quiz: the questions as
+plain tuples plus the answer key used for grading. Every change to a quiz's
+questions must call bump_version() in the same transaction; the version is
+stored on Quiz.question_version, so workers in other processes notice the
+change on their next lookup and recompile.
+"""
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+from app import db
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.services.app_cache import app_cache
+from app.services.grading import AnswerKey
+
+CompiledQuestion = namedtuple('CompiledQuestion', ['id', 'question_statement', 'options', 'correct_option', 'points', 'image_path'])
+QuestionSet = namedtuple('QuestionSet', ['quiz_id', 'version', 'questions', 'answer_key', 'index'])
+
+_lock = threading.Lock()
+
+
+def _query_questions(*criteria):
+    rows = db.session.query(
+        Question.id, Question.question_statement,
+        Question.option1, Question.option2, Question.option3, Question.option4,
+        Question.correct_option, Question.points, Question.image_path
+    ).filter(*criteria).order_by(Question.id).all()
+    return tuple(
+        CompiledQuestion(r[0], r[1], (r[2], r[3], r[4], r[5]), r[6], float(r[7] or 0.0), r[8])
+        for r in rows
+    )
+
+
+def _build(quiz_id, version, questions):
+    answer_key = AnswerKey(
+        question_ids=tuple(q.id for q in questions),
+        correct_options=tuple(q.correct_option for q in questions),
+        points=tuple(q.points for q in questions)
+    )
+    index = MappingProxyType({q.id: i for i, q in enumerate(questions)})
+    return QuestionSet(quiz_id, version, questions, answer_key, index)
+
+
+def get_question_set(quiz, question_ids=None):
+    """Return the compiled question set for `quiz`, recompiling if it is stale.
+
+    With `question_ids` (the subset drawn for an attempt) only those questions
+    are returned; they come from the cached full set when it is current and
+    are loaded by id otherwise, so drawing from a large bank never loads it.
+    """
+    version = quiz.question_version or 0
+    cache = app_cache('question_cache')
+    cached = cache.get(quiz.id)
+    if cached is not None and cached.version != version:
+        cached = None
+
+    if question_ids is not None:
+        if cached is not None:
+            questions = tuple(cached.questions[cached.index[i]] for i in question_ids if i in cached.index)
+        else:
+            questions = _query_questions(Question.quiz_id == quiz.id, Question.id.in_(list(question_ids)))
+        return _build(quiz.id, version, questions)
+
+    if cached is not None:
+        return cached
+    compiled = _build(quiz.id, version, _query_questions(Question.quiz_id == quiz.id))
+    with _lock:
+        cache[quiz.id] = compiled
+    return compiled
+
+
+def bump_version(quiz_id):
+    """Invalidate the question set of a quiz; call before committing the edit"""
+    db.session.query(Quiz).filter(Quiz.id == quiz_id) \
+        .update({Quiz.question_version: db.func.coalesce(Quiz.question_version, 0) + 1}, synchronize_session=False)
+    evict(quiz_id)
+
+
+def evict(quiz_id):
+    with _lock:
+        app_cache('question_cache').pop(quiz_id, None)
+
+
+def clear():
+    with _lock:
+        app_cache('question_cache').clear()
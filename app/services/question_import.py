@@ -0,0 +1,202 @@
+"""
+Streaming question import.
+
+Question text files (blocks of six lines separated by blank lines, see
+scripts/import_questions.py) are read lazily line by line, parsed with the
+same parser as config.auto_init, and inserted in bulk batches. Every batch is
+committed on its own, together with a question-version bump of the quiz, so
+memory stays bounded by the batch size and a bad block or a failed batch only
+costs its own rows: invalid blocks are reported and skipped, and a batch the
+database rejects is retried row by row to isolate the offending rows.
+
+import_manifest() imports many files at once: worker processes read, parse
+and validate whole files in parallel (no database access), and the calling
+process is the single writer that bulk-inserts the validated rows as files
+complete. Parsing scales with cores; SQLite only ever sees one writer.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.services.question_cache import bump_version
+from config.auto_init import iter_question_blocks, parse_block_to_question
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ImportReport:
+    """Running totals of an import; `errors` holds (line number, message, block)"""
+
+    def __init__(self, source=None):
+        self.source = source
+        self.blocks = 0
+        self.created = 0
+        self.errors = []
+
+    @property
+    def skipped(self):
+        return len(self.errors)
+
+    def error(self, line, message, block):
+        self.errors.append((line, str(message), block))
+
+    def __str__(self):
+        prefix = f'{self.source}: ' if self.source else ''
+        return f'{prefix}{self.blocks} blocks, {self.created} imported, {self.skipped} skipped'
+
+
+def iter_question_rows(lines, quiz_id, report):
+    """Yield (line number, insert row) for each valid block; invalid blocks go to `report`"""
+    for line, block in iter_question_blocks(lines):
+        report.blocks += 1
+        try:
+            data = parse_block_to_question(block)
+        except ValueError as e:
+            report.error(line, e, block)
+            continue
+        data['quiz_id'] = quiz_id
+        yield line, data
+
+
+def write_batch(quiz_id, batch, report):
+    """Insert one batch of (line number, row) and commit it with a question-version bump"""
+    try:
+        db.session.execute(insert(Question), [row for _, row in batch])
+        bump_version(quiz_id)
+        db.session.commit()
+        report.created += len(batch)
+        return
+    except SQLAlchemyError:
+        db.session.rollback()
+
+    # isolate the rows the database rejects
+    for line, row in batch:
+        try:
+            db.session.execute(insert(Question), [row])
+            db.session.commit()
+            report.created += 1
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            block = [row['question_statement'], row['option1'], row['option2'],
+                     row['option3'], row['option4'], str(row['correct_option'])]
+            report.error(line, getattr(e, 'orig', None) or e, block)
+    bump_version(quiz_id)
+    db.session.commit()
+
+
+def import_questions(lines, quiz_id, batch_size=DEFAULT_BATCH_SIZE, progress=None, report=None):
+    """Import question blocks from an iterable of lines into a quiz.
+
+    `progress`, if given, is called with the report after every committed batch
+    and once more at the end for anything not reported yet.
+    Returns the ImportReport.
+    """
+    report = report or ImportReport()
+    batch = []
+    reported_blocks = 0
+    for item in iter_question_rows(lines, quiz_id, report):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            write_batch(quiz_id, batch, report)
+            batch = []
+            if progress:
+                progress(report)
+                reported_blocks = report.blocks
+    if batch:
+        write_batch(quiz_id, batch, report)
+    if progress and report.blocks != reported_blocks:
+        progress(report)
+    return report
+
+
+def read_manifest(path):
+    """[(file path, quiz id)] from a manifest of "path,quiz_id" lines.
+
+    Relative paths are resolved against the manifest's directory; blank lines,
+    "#" comments and a "path,quiz_id" header are ignored.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, ln in enumerate(f, start=1):
+            ln = ln.strip()
+            if not ln or ln.startswith('#') or ln.replace(' ', '').lower() == 'path,quiz_id':
+                continue
+            file_path, sep, quiz_id = ln.rpartition(',')
+            try:
+                quiz_id = int(quiz_id)
+            except ValueError:
+                sep = ''
+            if not sep or not file_path.strip():
+                raise ValueError(f'{path}:{number}: expected "path,quiz_id"')
+            entries.append((os.path.join(base, file_path.strip()), quiz_id))
+    return entries
+
+
+def parse_file(path, quiz_id):
+    """Parse and validate a whole question file; runs in a worker process.
+
+    Returns (path, quiz id, [(line number, insert row)], report).
+    """
+    report = ImportReport(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = list(iter_question_rows(f, quiz_id, report))
+    return path, quiz_id, rows, report
+
+
+def _write_rows(quiz_id, rows, batch_size, report):
+    for i in range(0, len(rows), batch_size):
+        write_batch(quiz_id, rows[i:i + batch_size], report)
+
+
+def import_manifest(entries, workers=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Import [(file path, quiz id)] with parallel parsing and a single writer.
+
+    `workers` is the number of parser processes (default: CPU count; 0 parses
+    in this process). Files whose quiz does not exist or cannot be read are
+    reported with line 0. `progress` is called with each file's report once
+    it is written. Returns the reports in manifest order.
+    """
+    known = {qid for (qid,) in db.session.query(Quiz.id).filter(Quiz.id.in_({q for _, q in entries}))}
+    reports = [ImportReport(path) for path, _ in entries]
+    pending = []
+    for i, (path, quiz_id) in enumerate(entries):
+        if quiz_id in known:
+            pending.append(i)
+        else:
+            reports[i].error(0, f'Quiz with id {quiz_id} not found', [])
+
+    def write(i, result):
+        _, quiz_id, rows, report = result
+        _write_rows(quiz_id, rows, batch_size, report)
+        reports[i] = report
+
+    def parsed():
+        """(entry index, parse result or OSError) as files finish parsing"""
+        if workers == 0:
+            for i in pending:
+                try:
+                    yield i, parse_file(*entries[i])
+                except OSError as e:
+                    yield i, e
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(parse_file, *entries[i]): i for i in pending}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except OSError as e:
+                    yield futures[future], e
+
+    if pending:
+        for i, result in parsed():
+            if isinstance(result, OSError):
+                reports[i].error(0, result, [])
+            else:
+                write(i, result)
+            if progress:
+                progress(reports[i])
+    return reports
@@ -0,0 +1,71 @@
+"""
+Per-quiz score statistics.
+
+QuizStats keeps the attempt count, distinct user count, mean, min, max and the
+sum of squared deviations (M2) of each quiz's scores. record_score() folds a
+new score in with Welford's update, written as one UPDATE whose SET clauses
+all read the old row, so concurrent submissions cannot interleave:
+
+    n' = n + 1,  mean' = mean + (x - mean) / n',  M2' = M2 + (x - mean) * (x - mean')
+
+recompute() rebuilds the table from the Score history in two passes (mean
+first, then the squared deviations from it), which is just as stable.
+"""
+from sqlalchemy import case, exists, insert, select
+from app import db
+from app.models.quiz_stats import QuizStats
+from app.models.score import Score
+
+
+def record_score(score):
+    """Fold a flushed Score into its quiz's statistics in the current transaction"""
+    x = score.total_scored
+    returning_user = db.session.query(exists().where(
+        Score.quiz_id == score.quiz_id, Score.user_id == score.user_id, Score.id != score.id)).scalar()
+
+    new_mean = QuizStats.mean + (x - QuizStats.mean) / (QuizStats.attempt_count + 1)
+    updated = db.session.query(QuizStats).filter(QuizStats.quiz_id == score.quiz_id).update({
+        QuizStats.attempt_count: QuizStats.attempt_count + 1,
+        QuizStats.user_count: QuizStats.user_count + (0 if returning_user else 1),
+        QuizStats.mean: new_mean,
+        QuizStats.m2: QuizStats.m2 + (x - QuizStats.mean) * (x - new_mean),
+        QuizStats.min_score: case((QuizStats.min_score <= x, QuizStats.min_score), else_=x),
+        QuizStats.max_score: case((QuizStats.max_score >= x, QuizStats.max_score), else_=x),
+        QuizStats.updated_at: db.func.current_timestamp(),
+    }, synchronize_session=False)
+    if not updated:
+        db.session.add(QuizStats(quiz_id=score.quiz_id, attempt_count=1, user_count=1,
+                                 mean=x, m2=0.0, min_score=x, max_score=x))
+        db.session.flush()
+
+
+def stats_for(quiz_ids):
+    """{quiz id: QuizStats} for the given quizzes, in one query"""
+    quiz_ids = list(quiz_ids)
+    if not quiz_ids:
+        return {}
+    return {s.quiz_id: s for s in QuizStats.query.filter(QuizStats.quiz_id.in_(quiz_ids))}
+
+
+def recompute():
+    """Rebuild every quiz's statistics from the Score table and commit. Returns the row count."""
+    db.session.query(QuizStats).delete(synchronize_session=False)
+    first_pass = select(
+        Score.quiz_id.label('quiz_id'),
+        db.func.count(Score.id).label('attempt_count'),
+        db.func.count(db.distinct(Score.user_id)).label('user_count'),
+        db.func.avg(Score.total_scored).label('mean'),
+        db.func.min(Score.total_scored).label('min_score'),
+        db.func.max(Score.total_scored).label('max_score'),
+    ).group_by(Score.quiz_id).subquery()
+    deviation = Score.total_scored - first_pass.c.mean
+    second_pass = select(
+        first_pass.c.quiz_id, first_pass.c.attempt_count, first_pass.c.user_count, first_pass.c.mean,
+        db.func.sum(deviation * deviation), first_pass.c.min_score, first_pass.c.max_score,
+    ).join(first_pass, Score.quiz_id == first_pass.c.quiz_id).group_by(
+        first_pass.c.quiz_id, first_pass.c.attempt_count, first_pass.c.user_count, first_pass.c.mean,
+        first_pass.c.min_score, first_pass.c.max_score)
+    db.session.execute(insert(QuizStats).from_select(
+        ['quiz_id', 'attempt_count', 'user_count', 'mean', 'm2', 'min_score', 'max_score'], second_pass))
+    db.session.commit()
+    return db.session.query(db.func.count(QuizStats.quiz_id)).scalar()
@@ -0,0 +1,50 @@
+"""
+Draw a random subset of questions from a large quiz bank.
+
+Instead of ORDER BY RANDOM() (which reads and sorts the whole bank), random
+ids are drawn from the quiz's id range and checked against the index in one
+IN query per round. Banks whose ids are too sparse for that fall back to
+reading only the id column.
+"""
+import random
+from app import db
+from app.models.question import Question
+
+MIN_DENSITY = 0.2
+MAX_ROUNDS = 4
+
+
+def draw_question_ids(quiz_id, n, rng=None):
+    """Return `n` distinct random question ids of the quiz, sorted"""
+    rng = rng or random.Random()
+    lo, hi, count = db.session.query(
+        db.func.min(Question.id), db.func.max(Question.id), db.func.count(Question.id)
+    ).filter(Question.quiz_id == quiz_id).one()
+    if not count:
+        return []
+    if n >= count:
+        return _all_ids(quiz_id)
+
+    span = hi - lo + 1
+    density = count / span
+    picked = set()
+    if density >= MIN_DENSITY:
+        for _ in range(MAX_ROUNDS):
+            need = n - len(picked)
+            # oversample so one round is usually enough
+            k = min(span, int(need / density * 1.5) + 8)
+            candidates = set(rng.sample(range(lo, hi + 1), k)) - picked
+            found = [row[0] for row in db.session.query(Question.id).filter(
+                Question.quiz_id == quiz_id, Question.id.in_(candidates)).all()]
+            rng.shuffle(found)
+            picked.update(found[:need])
+            if len(picked) >= n:
+                return sorted(picked)
+
+    remaining = [qid for qid in _all_ids(quiz_id) if qid not in picked]
+    picked.update(rng.sample(remaining, n - len(picked)))
+    return sorted(picked)
+
+
+def _all_ids(quiz_id):
+    return [row[0] for row in db.session.query(Question.id).filter(Question.quiz_id == quiz_id).order_by(Question.id).all()]
@@ -0,0 +1,132 @@
+"""
+In-place upgrade of existing databases.
+
+db.create_all() builds missing tables but never changes a table that already
+exists, and the repo has no runnable Alembic environment. Every column added
+to an existing table is therefore listed here and applied with an idempotent
+check at schema init, the way add_points_manually.py added question.points.
+Tables that do not exist yet are left to create_all, which builds them with
+the current columns. Indexes declared on the models are created on existing
+tables the same way. The files in migrations/versions describe the same
+changes for Alembic.
+
+Tables derived from the Score history start out empty on an existing
+database; they are rebuilt once when they are empty and scores exist.
+
+upgrade() runs after create_all() whenever the startup fingerprint changes,
+and on demand through `flask db upgrade`.
+"""
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+from app import db
+from app.models.daily_score import DailyScore
+from app.models.quiz_stats import QuizStats
+from app.models.score import Score
+from app.models.standing import Standing
+from app.services import quiz_stats, standings
+
+logger = logging.getLogger(__name__)
+
+# (table, column, column definition for ALTER TABLE ... ADD COLUMN)
+COLUMNS = (
+    ('quiz', 'question_version', 'INTEGER NOT NULL DEFAULT 0'),
+    ('quiz', 'draw_count', 'INTEGER'),
+    # quiz_attempt predates the column only where it was created before draws
+    ('quiz_attempt', 'question_ids', 'TEXT'),
+    ('score', 'attempt_token', 'VARCHAR(32)'),
+)
+
+# (index, table, columns, unique) for indexes that go with the columns above;
+# SQLite cannot add a UNIQUE column, so uniqueness comes from the index
+INDEXES = (
+    ('ix_score_attempt_token', 'score', ('attempt_token',), True),
+)
+
+
+# (table derived from the Score history, function rebuilding it and committing)
+ROLLUPS = (
+    (Standing, standings.rebuild),
+    (DailyScore, standings.backfill_daily),
+    (QuizStats, quiz_stats.recompute),
+)
+
+
+def digest():
+    """Text describing every upgrade step; part of the startup fingerprint"""
+    return repr((COLUMNS, INDEXES, [model.__tablename__ for model, _ in ROLLUPS]))
+
+
+def add_columns(conn):
+    """Add the listed columns missing from existing tables; returns the columns added"""
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    added = []
+    for table, column, definition in COLUMNS:
+        if table not in tables:
+            continue
+        if column in {c['name'] for c in inspector.get_columns(table)}:
+            continue
+        conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {definition}'))
+        added.append(f'{table}.{column}')
+    return added
+
+
+def add_indexes(conn):
+    """Create the listed indexes missing from existing tables; returns the indexes created"""
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    created = []
+    for name, table, columns, unique in INDEXES:
+        if table not in tables:
+            continue
+        if name in {i['name'] for i in inspector.get_indexes(table)}:
+            continue
+        conn.execute(text(f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS {name} '
+                          f'ON "{table}" ({", ".join(columns)})'))
+        created.append(name)
+    return created
+
+
+def add_declared_indexes(conn):
+    """Create the indexes declared on the models that existing tables lack; returns their names"""
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {i['name'] for i in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name in existing:
+                continue
+            conn.execute(CreateIndex(index, if_not_exists=True))
+            created.append(index.name)
+    if created and conn.dialect.name == 'sqlite':
+        # refresh planner statistics so the new indexes are chosen straight away
+        conn.execute(text('ANALYZE'))
+    return created
+
+
+def backfill_rollups():
+    """Rebuild the empty derived tables of a database that has scores; returns the tables filled"""
+    if db.session.query(Score.id).first() is None:
+        return []
+    filled = []
+    for model, rebuild in ROLLUPS:
+        if db.session.query(model).first() is None:
+            rebuild()
+            filled.append(model.__tablename__)
+    return filled
+
+
+def upgrade():
+    """Bring an existing database up to the current models; returns the steps applied"""
+    with db.engine.begin() as conn:
+        applied = add_columns(conn)
+        applied += add_indexes(conn)
+        applied += add_declared_indexes(conn)
+    applied += [f'{table} (backfilled)' for table in backfill_rollups()]
+    for step in applied:
+        logger.info("Schema upgrade: applied %s", step)
+    return applied
@@ -0,0 +1,37 @@
+"""
+Deterministic, seed-driven shuffling for quiz attempts.
+
+Only the attempt id and its seed are kept in the session; the question order
+and every option permutation are rebuilt from the seed when the attempt is
+graded, so the session payload does not grow with the size of the quiz.
+"""
+import random
+import secrets
+import uuid
+
+
+def new_attempt():
+    """Return the session state for a fresh attempt: an id and a shuffle seed"""
+    return {'id': uuid.uuid4().hex, 'seed': secrets.randbits(32)}
+
+
+def shuffle_questions(questions, seed):
+    """Return the questions in the order they are shown for this seed"""
+    ordered = sorted(questions, key=lambda q: q.id)
+    random.Random(seed).shuffle(ordered)
+    return ordered
+
+
+def option_order(seed, question_id):
+    """Original option numbers (1-4) in the order they are shown"""
+    order = [1, 2, 3, 4]
+    # str seeds are hashed with sha512, so this is stable across processes
+    random.Random(f'{seed}:{question_id}').shuffle(order)
+    return order
+
+
+def original_option(seed, question_id, position):
+    """Map a shown position (1-4) back to the original option number"""
+    if position is None or not 1 <= position <= 4:
+        return None
+    return option_order(seed, question_id)[position - 1]
@@ -0,0 +1,101 @@
+"""
+Materialized leaderboard standings and daily rollups.
+
+Every Score adds its points to two Standing rows of its user: the overall row
+(subject_id 0) and the row of the quiz's subject. It also adds them to the
+DailyScore row of its day, user and subject, which date-range leaderboards
+sum instead of scanning the score history. record_score() runs inside the
+submission transaction, so all of these commit together with the score.
+
+rebuild() and backfill_daily() recompute the tables from the Score history,
+for data written around record_score() (seeding, imports, manual fixes).
+"""
+from sqlalchemy import insert, literal, select
+from app import db
+from app.models.chapter import Chapter
+from app.models.daily_score import DailyScore
+from app.models.quiz import Quiz
+from app.models.score import Score
+from app.models.standing import Standing
+
+ALL_SUBJECTS = 0
+
+
+def record_score(user_id, quiz_id, total_scored, day):
+    """Add a new score, taken on `day`, to the user's standings and daily rollup"""
+    subject_id = db.session.query(Chapter.subject_id) \
+        .join(Quiz, Quiz.chapter_id == Chapter.id).filter(Quiz.id == quiz_id).scalar()
+    _add(user_id, ALL_SUBJECTS, total_scored)
+    if subject_id:
+        _add(user_id, subject_id, total_scored)
+    _add_daily(day, user_id, subject_id or 0, total_scored)
+
+
+def _add(user_id, subject_id, points):
+    # SET expressions read the old row values, so this is one atomic increment
+    updated = db.session.query(Standing) \
+        .filter(Standing.user_id == user_id, Standing.subject_id == subject_id) \
+        .update({
+            Standing.total_score: Standing.total_score + points,
+            Standing.attempt_count: Standing.attempt_count + 1,
+            Standing.avg_score: (Standing.total_score + points) / (Standing.attempt_count + 1),
+            Standing.updated_at: db.func.current_timestamp(),
+        }, synchronize_session=False)
+    if not updated:
+        db.session.add(Standing(user_id=user_id, subject_id=subject_id, total_score=points,
+                                avg_score=points, attempt_count=1))
+        db.session.flush()
+
+
+def _add_daily(day, user_id, subject_id, points):
+    updated = db.session.query(DailyScore) \
+        .filter(DailyScore.day == day, DailyScore.user_id == user_id, DailyScore.subject_id == subject_id) \
+        .update({
+            DailyScore.total_score: DailyScore.total_score + points,
+            DailyScore.score_count: DailyScore.score_count + 1,
+        }, synchronize_session=False)
+    if not updated:
+        db.session.add(DailyScore(day=day, user_id=user_id, subject_id=subject_id,
+                                  total_score=points, score_count=1))
+        db.session.flush()
+
+
+def rebuild():
+    """Recompute every standing from the Score table and commit. Returns the row count."""
+    db.session.query(Standing).delete(synchronize_session=False)
+    columns = ['user_id', 'subject_id', 'total_score', 'avg_score', 'attempt_count']
+    totals = (db.func.sum(Score.total_scored), db.func.avg(Score.total_scored), db.func.count(Score.id))
+
+    overall = select(Score.user_id, literal(ALL_SUBJECTS), *totals).group_by(Score.user_id)
+    per_subject = select(Score.user_id, Chapter.subject_id, *totals) \
+        .join(Quiz, Score.quiz_id == Quiz.id) \
+        .join(Chapter, Quiz.chapter_id == Chapter.id) \
+        .group_by(Score.user_id, Chapter.subject_id)
+    db.session.execute(insert(Standing).from_select(columns, overall))
+    db.session.execute(insert(Standing).from_select(columns, per_subject))
+    db.session.commit()
+    return db.session.query(db.func.count(Standing.id)).scalar()
+
+
+def backfill_daily(since=None):
+    """Recompute the daily rollups from the Score table, from `since` (a date) on, and commit.
+
+    Returns the number of rollup rows written.
+    """
+    day = db.func.date(Score.timestamp)
+    deleted = db.session.query(DailyScore)
+    if since:
+        deleted = deleted.filter(DailyScore.day >= since)
+    deleted.delete(synchronize_session=False)
+
+    rollup = select(day, Score.user_id, db.func.coalesce(Chapter.subject_id, 0),
+                    db.func.sum(Score.total_scored), db.func.count(Score.id)) \
+        .join(Quiz, Score.quiz_id == Quiz.id) \
+        .outerjoin(Chapter, Quiz.chapter_id == Chapter.id) \
+        .group_by(day, Score.user_id, db.func.coalesce(Chapter.subject_id, 0))
+    if since:
+        rollup = rollup.where(Score.timestamp >= since)
+    result = db.session.execute(insert(DailyScore).from_select(
+        ['day', 'user_id', 'subject_id', 'total_score', 'score_count'], rollup))
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,166 @@
+"""
+Fingerprinted startup.
+
+Every boot used to run create_all() twice and auto_initialize(), which costs a
+PRAGMA per table plus one query per sample question even when nothing changed.
+The fingerprint is a hash of the table definitions (as CREATE statements), of
+the in-place upgrade steps in schema_upgrade, and of the seed inputs (the seed
+files and the admin username). It is stored in the app_state table once a full
+initialization succeeds; while it matches, create_all(), the upgrades and the
+seeding are skipped. STARTUP_FINGERPRINT = False always does the full
+initialization.
+"""
+import hashlib
+import logging
+import os
+import time
+from contextlib import contextmanager
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app import db
+from app.services import schema_upgrade
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_KEY = 'schema_seed_fingerprint'
+# bump when auto_initialize starts seeding something new
+SEED_VERSION = 1
+
+
+class StartupTimer:
+    """Wall-clock time of the named startup phases"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - start) * 1000))
+
+    def skip(self, name):
+        self.phases.append((name, None))
+
+    def summary(self):
+        parts = [f"{name} skipped" if ms is None else f"{name} {ms:.1f}ms" for name, ms in self.phases]
+        total = (time.perf_counter() - self.started) * 1000
+        return ", ".join(parts + [f"total {total:.1f}ms"])
+
+
+def schema_digest(metadata, dialect, upgrades=''):
+    """Hash of the CREATE TABLE / CREATE INDEX statements of every table and of the upgrade steps"""
+    digest = hashlib.sha256(upgrades.encode())
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ''):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+def seed_digest(seed_files, admin_username):
+    """Hash of the inputs auto_initialize seeds from"""
+    digest = hashlib.sha256(f"{SEED_VERSION}:{admin_username}".encode())
+    for path in seed_files:
+        digest.update(path.encode())
+        if not os.path.exists(path):
+            digest.update(b'\0missing')
+            continue
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(app):
+    """Schema and seed fingerprint of `app`; computed once per application"""
+    state = app.extensions.setdefault('startup', {})
+    if 'fingerprint' not in state:
+        schema = schema_digest(db.metadata, db.engine.dialect, schema_upgrade.digest())
+        seed = seed_digest(app.config['STARTUP_SEED_FILES'], app.config.get('ADMIN_USERNAME', ''))
+        state['fingerprint'] = f"{schema[:32]}{seed[:32]}"
+    return state['fingerprint']
+
+
+def stored_fingerprint():
+    """The fingerprint saved by the last full initialization, or None"""
+    try:
+        return db.session.execute(
+            text("SELECT value FROM app_state WHERE key = :key"), {'key': FINGERPRINT_KEY}
+        ).scalar()
+    except SQLAlchemyError:
+        # a fresh database has no app_state table yet
+        db.session.rollback()
+        return None
+
+
+def store_fingerprint(value):
+    from app.models.app_state import AppState
+    db.session.merge(AppState(key=FINGERPRINT_KEY, value=value))
+    db.session.commit()
+
+
+def init_app(app):
+    app.config.setdefault('STARTUP_FINGERPRINT', True)
+    app.config.setdefault('STARTUP_SEED_FILES', ['sample_questions.txt'])
+    app.extensions.setdefault('startup', {})['timer'] = StartupTimer()
+
+
+def is_current(app):
+    """True when the database was fully initialized for this exact schema and seed.
+
+    Must run inside an app context; the answer is kept for the rest of startup.
+    """
+    state = app.extensions['startup']
+    if 'current' not in state:
+        with state['timer'].phase('fingerprint'):
+            state['current'] = bool(app.config['STARTUP_FINGERPRINT']) \
+                and stored_fingerprint() == fingerprint(app)
+    return state['current']
+
+
+def ensure_schema(app):
+    """create_all() and the in-place upgrades unless the fingerprint says the schema is current"""
+    state = app.extensions['startup']
+    if state.get('schema_ready'):
+        return False
+    if is_current(app):
+        state['timer'].skip('create_all')
+        state['schema_ready'] = True
+        return False
+    with state['timer'].phase('create_all'):
+        db.create_all()
+    # create_all never changes existing tables; a failure here is retried by initialize()
+    with state['timer'].phase('schema_upgrade'):
+        schema_upgrade.upgrade()
+    state['schema_ready'] = True
+    return True
+
+
+def initialize(app, seed):
+    """Make sure the schema exists and run `seed`, unless nothing changed.
+
+    The fingerprint is only stored once `seed` succeeds (it returns False on
+    failure), so a failed or interrupted initialization is redone on the
+    next start.
+    """
+    timer = app.extensions['startup']['timer']
+    ensure_schema(app)
+    if is_current(app):
+        timer.skip('seed')
+        return False
+    with timer.phase('seed'):
+        seeded = seed()
+    if seeded is False:
+        return True
+    store_fingerprint(fingerprint(app))
+    app.extensions['startup']['current'] = True
+    return True
+
+
+def log_summary(app):
+    logger.info("Startup: %s", app.extensions['startup']['timer'].summary())
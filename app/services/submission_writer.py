@@ -0,0 +1,221 @@
+"""
+Group-commit writer for quiz submissions.
+
+SQLite admits one writer at a time, so when many students submit at once
+every attempt_quiz POST queues for the write lock with its own transaction
+and its own commit. With SUBMISSION_WRITER enabled, request threads grade
+the submission and hand it to a single writer thread instead. The writer
+collects submissions for up to SUBMISSION_BATCH_WAIT_MS after the first one
+(or until SUBMISSION_BATCH_SIZE are waiting) and stores the whole group in
+one transaction. Each request waits on a Future that is resolved once its
+group is committed, so a response still implies a durable result.
+
+Attempt tokens already stored, or repeated within a group, are rejected
+with DuplicateSubmission before the group is written. If the group commit
+fails anyway (e.g. a duplicate from another process), the group is
+rolled back and written again one submission per transaction, so only the
+failing submission sees the error.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from flask import current_app
+from app import db
+from app.models.quiz_attempt import QuizAttempt
+from app.models.score import Score
+from app.services.certificate_queue import get_queue as get_certificate_queue
+from app.services.grading import save_submission
+
+logger = logging.getLogger(__name__)
+
+PendingSubmission = namedtuple('PendingSubmission', [
+    'quiz_id', 'user_id', 'answer_key', 'graded', 'attempt_token', 'attempt_id', 'certificate', 'future'])
+SavedSubmission = namedtuple('SavedSubmission', ['score_id', 'job_id'])
+
+_STOP = object()
+
+
+class DuplicateSubmission(Exception):
+    """The attempt token already has a stored Score"""
+
+
+class SubmissionWriter:
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._written = 0
+        self._rejected = 0
+        self._fallbacks = 0
+        self._largest_batch = 0
+        self._commit_ms_total = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SUBMISSION_WRITER', False)
+        app.config.setdefault('SUBMISSION_BATCH_SIZE', 50)
+        app.config.setdefault('SUBMISSION_BATCH_WAIT_MS', 50)
+        app.config.setdefault('SUBMISSION_WRITER_TIMEOUT', 30)
+        app.extensions['submission_writer'] = self
+        self.app = app
+
+    @property
+    def enabled(self):
+        return bool(self.app.config['SUBMISSION_WRITER'])
+
+    def start(self):
+        """Start the writer thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._work, name='submission-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Write everything already queued, then stop the thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def save(self, quiz_id, user_id, answer_key, graded, attempt_token=None, attempt_id=None, certificate=None):
+        """Queue a graded submission; the Future resolves to a SavedSubmission once committed.
+
+        `attempt_id` marks that QuizAttempt as submitted, and `certificate`
+        (total awarded, total possible) adds a certificate job to the same
+        transaction.
+
+        The caller's session is committed first, which hands its connection
+        back to the pool; otherwise enough waiting requests would hold every
+        pooled connection and starve the writer.
+        """
+        db.session.commit()
+        future = Future()
+        self.start()
+        self._queue.put(PendingSubmission(quiz_id, user_id, answer_key, graded, attempt_token,
+                                          attempt_id, certificate, future))
+        return future
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'running': self._thread is not None and self._thread.is_alive(),
+                'queue_depth': self._queue.qsize(),
+                'batches': self._batches,
+                'written': self._written,
+                'rejected': self._rejected,
+                'fallbacks': self._fallbacks,
+                'avg_batch': (self._written / self._batches) if self._batches else None,
+                'max_batch': self._largest_batch,
+                'commit_ms_avg': (self._commit_ms_total / self._batches) if self._batches else None,
+            }
+
+    def _next_batch(self):
+        """Block for one submission, then gather more until the size or time limit; None to stop"""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        size = int(self.app.config['SUBMISSION_BATCH_SIZE'])
+        deadline = time.monotonic() + self.app.config['SUBMISSION_BATCH_WAIT_MS'] / 1000
+        while len(batch) < size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # finish this batch, then stop
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            with self.app.app_context():
+                try:
+                    self.write(batch)
+                except Exception as e:
+                    logger.exception("Submission writer failed on a batch of %d", len(batch))
+                    for item in batch:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+                finally:
+                    db.session.remove()
+
+    def _add(self, item):
+        score = save_submission(item.quiz_id, item.user_id, item.answer_key, item.graded,
+                                attempt_token=item.attempt_token)
+        if item.attempt_id is not None:
+            db.session.query(QuizAttempt).filter(QuizAttempt.id == item.attempt_id) \
+                .update({'status': 'submitted', 'score_id': score.id}, synchronize_session=False)
+        job = None
+        if item.certificate is not None:
+            job = get_certificate_queue().add_job(score, *item.certificate)
+            db.session.flush()
+        return SavedSubmission(score.id, job.id if job is not None else None)
+
+    def write(self, batch):
+        """Store a group of submissions in one transaction and resolve their futures"""
+        start = time.perf_counter()
+        tokens = [item.attempt_token for item in batch if item.attempt_token]
+        taken = set()
+        if tokens:
+            taken = {token for (token,) in db.session.query(Score.attempt_token)
+                     .filter(Score.attempt_token.in_(tokens))}
+        accepted = []
+        for item in batch:
+            if item.attempt_token in taken:
+                item.future.set_exception(DuplicateSubmission(item.attempt_token))
+                continue
+            if item.attempt_token:
+                taken.add(item.attempt_token)
+            accepted.append(item)
+
+        try:
+            results = [self._add(item) for item in accepted]
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.warning("Group commit of %d submissions failed, writing them one by one", len(accepted))
+            results = None
+
+        if results is not None:
+            for item, result in zip(accepted, results):
+                item.future.set_result(result)
+        else:
+            for item in accepted:
+                try:
+                    result = self._add(item)
+                    db.session.commit()
+                    item.future.set_result(result)
+                except Exception as e:
+                    db.session.rollback()
+                    item.future.set_exception(e)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._batches += 1
+            self._written += sum(1 for item in accepted if item.future.exception() is None)
+            self._rejected += len(batch) - len(accepted)
+            self._fallbacks += results is None
+            self._largest_batch = max(self._largest_batch, len(batch))
+            self._commit_ms_total += elapsed_ms
+
+
+def get_writer():
+    """The current application's SubmissionWriter"""
+    return current_app.extensions['submission_writer']
@@ -9,23 +9,30 @@ from app.models.subject import Subject
 from app.models.chapter import Chapter
 from app.models.quiz import Quiz
 from app.models.question import Question
+from app.services.question_cache import bump_version
 
 
-def parse_question_blocks(lines):
-    """Parse question blocks from text file"""
-    blocks = []
+def iter_question_blocks(lines):
+    """Lazily yield (first line number, block) for each question block of a text file"""
     current = []
-    for ln in lines:
+    start = None
+    for number, ln in enumerate(lines, start=1):
         s = ln.rstrip('\n')
         if s.strip() == "":
             if current:
-                blocks.append(current)
+                yield start, current
                 current = []
         else:
+            if not current:
+                start = number
             current.append(s)
     if current:
-        blocks.append(current)
-    return blocks
+        yield start, current
+
+
+def parse_question_blocks(lines):
+    """Parse question blocks from text file"""
+    return [block for _, block in iter_question_blocks(lines)]
 
 
 def parse_block_to_question(block):
@@ -182,6 +189,8 @@ def create_test_quiz_from_file(txt_file_path='sample_questions.txt'):
                 print(f"⚠ Skipping block {i}: {e}")
                 continue
         
+        if created:
+            bump_version(quiz.id)
         db.session.commit()
         print(f"✓ Imported {created} questions into quiz")
     else:
@@ -191,7 +200,10 @@ def create_test_quiz_from_file(txt_file_path='sample_questions.txt'):
 
 
 def auto_initialize():
-    """Main function to auto-initialize admin, test user, and quiz"""
+    """Main function to auto-initialize admin, test user, and quiz.
+
+    Returns False if initialization failed.
+    """
     print("=" * 50)
     print("Auto-initializing database...")
     print("=" * 50)
@@ -209,10 +221,12 @@ def auto_initialize():
         print("=" * 50)
         print("✓ Auto-initialization completed successfully!")
         print("=" * 50)
+        return True
         
     except Exception as e:
         print(f"✗ Error during auto-initialization: {e}")
         import traceback
         traceback.print_exc()
         db.session.rollback()
+        return False
 
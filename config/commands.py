@@ -1,7 +1,10 @@
 import os
+import click
 from app import db
 from config.seed import seed_database
 from app.models.user import User
+from app.services import import_profile, quiz_stats, schema_upgrade, standings
+from app.services.export import DATASETS, FORMATS, export_batches, iter_export
 
 def create_admin():
     admin = User.query.filter_by(username=os.getenv('ADMIN_USERNAME')).first()
@@ -30,7 +33,71 @@ def register_commands(app):
         create_admin()
         print("Database created!")
 
+    @db_group.command('upgrade')
+    def upgrade_db():
+        """Create missing tables and upgrade existing ones in place"""
+        db.create_all()
+        applied = schema_upgrade.upgrade()
+        print(f"Database upgraded ({', '.join(applied) if applied else 'already up to date'})")
+
     @db_group.command('seed')
     def seed_db():
         seed_database()
-        print("Database seeded successfully!")
\ No newline at end of file
+        print("Database seeded successfully!")
+
+    @app.cli.group('leaderboard')
+    def leaderboard_group():
+        pass
+
+    @leaderboard_group.command('rebuild')
+    def rebuild_leaderboard():
+        rows = standings.rebuild()
+        print(f"Leaderboard standings rebuilt ({rows} rows)")
+
+    @leaderboard_group.command('backfill')
+    @click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Only recompute days from this date (YYYY-MM-DD) on.')
+    def backfill_leaderboard(since):
+        rows = standings.backfill_daily(since.date() if since else None)
+        print(f"Daily score rollups backfilled ({rows} rows)")
+
+    @app.cli.group('stats')
+    def stats_group():
+        pass
+
+    @stats_group.command('recompute')
+    def recompute_stats():
+        rows = quiz_stats.recompute()
+        print(f"Quiz statistics recomputed ({rows} quizzes)")
+
+    @app.cli.command('export')
+    @click.argument('dataset', type=click.Choice(sorted(DATASETS)))
+    @click.option('--format', 'fmt', type=click.Choice(sorted(FORMATS)), default='csv', show_default=True)
+    @click.option('--quiz-id', type=int, default=None)
+    @click.option('--subject-id', type=int, default=None)
+    @click.option('--start', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='First day (YYYY-MM-DD).')
+    @click.option('--end', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Last day (YYYY-MM-DD).')
+    @click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', help='File to write, stdout by default.')
+    def export(dataset, fmt, quiz_id, subject_id, start, end, output):
+        """Stream scores, answers or certificates as CSV or JSON Lines"""
+        if end:
+            end = end.replace(hour=23, minute=59, second=59, microsecond=999999)
+        columns, batches = export_batches(dataset, quiz_id, subject_id, start, end)
+        for chunk in iter_export(fmt, columns, batches):
+            output.write(chunk)
+
+    @app.cli.group('perf')
+    def perf_group():
+        pass
+
+    @perf_group.command('startup')
+    @click.option('--top', type=int, default=15, show_default=True, help='Packages and modules to list.')
+    @click.option('--code', default=import_profile.DEFAULT_TARGET, show_default=True,
+                  help='Python code to profile in a fresh interpreter.')
+    def perf_startup(top, code):
+        """Per-module import time of a cold start, like -X importtime but summarized"""
+        try:
+            report = import_profile.profile(code)
+        except RuntimeError as e:
+            raise click.ClickException(f"Profiled process failed: {e}")
+        print(import_profile.format_profile(report, top))
@@ -6,6 +6,7 @@ from app.models.quiz import Quiz
 from app.models.score import Score
 from app.models.subject import Subject
 from app.models.user import User
+from app.services import quiz_stats, standings
 
 # Sample data
 users_data = [
@@ -341,3 +342,6 @@ def seed_database():
         db.session.add(attempt)
     
     db.session.commit()
+    standings.rebuild()
+    standings.backfill_daily()
+    quiz_stats.recompute()
@@ -6,3 +6,17 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI', 'sqlite:///' + os.path.join(BASE_DIR, 'quiz_master.db'))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     ADMIN_USERNAME = os.getenv('ADMIN_USERNAME', 'admin@quiz.com')
+    # Quizzes with more questions than this are delivered page by page
+    PAGED_ATTEMPT_THRESHOLD = int(os.getenv('PAGED_ATTEMPT_THRESHOLD', 100))
+    ATTEMPT_PAGE_SIZE = int(os.getenv('ATTEMPT_PAGE_SIZE', 10))
+    # Rows per leaderboard page, and users shown in the leaderboard chart
+    LEADERBOARD_LIMIT = int(os.getenv('LEADERBOARD_LIMIT', 100))
+    LEADERBOARD_CHART_SIZE = int(os.getenv('LEADERBOARD_CHART_SIZE', 10))
+    # Skip create_all and seeding at startup while the stored schema/seed fingerprint matches
+    STARTUP_FINGERPRINT = os.getenv('STARTUP_FINGERPRINT', '1').lower() not in ('0', 'false', 'no')
+    # SQLite pragmas applied to every connection: 'production' (WAL, tuned) or 'default'
+    SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'production')
+    # Hand graded submissions to one writer thread that commits them in groups
+    SUBMISSION_WRITER = os.getenv('SUBMISSION_WRITER', '0').lower() in ('1', 'true', 'yes')
+    SUBMISSION_BATCH_SIZE = int(os.getenv('SUBMISSION_BATCH_SIZE', 50))
+    SUBMISSION_BATCH_WAIT_MS = int(os.getenv('SUBMISSION_BATCH_WAIT_MS', 50))
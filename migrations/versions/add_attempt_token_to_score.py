@@ -0,0 +1,19 @@
+"""add attempt_token to score
+
+Revision ID: add_attempt_token_to_score
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_attempt_token_to_score'
+down_revision = 'add_question_draw'
+
+def upgrade():
+    # One Score per rendered attempt; retried submissions hit the unique index
+    if 'attempt_token' not in {c['name'] for c in sa.inspect(op.get_bind()).get_columns('score')}:
+        op.add_column('score', sa.Column('attempt_token', sa.String(length=32), nullable=True))
+        op.create_index('ix_score_attempt_token', 'score', ['attempt_token'], unique=True, if_not_exists=True)
+
+def downgrade():
+    op.drop_index('ix_score_attempt_token', table_name='score')
+    op.drop_column('score', 'attempt_token')
@@ -0,0 +1,43 @@
+"""add indexes for hot query paths
+
+Revision ID: add_hot_path_indexes
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_hot_path_indexes'
+down_revision = 'add_attempt_token_to_score'
+
+# (index name, table, columns); the same set is declared on the models
+INDEXES = (
+    ('ix_score_quiz_user', 'score', ['quiz_id', 'user_id']),
+    ('ix_score_user_timestamp', 'score', ['user_id', 'timestamp']),
+    ('ix_score_timestamp', 'score', ['timestamp']),
+    ('ix_answer_score', 'answer', ['score_id']),
+    ('ix_answer_question', 'answer', ['question_id']),
+    ('ix_comment_type_quiz_created', 'comment', ['comment_type', 'quiz_id', 'created_at']),
+    ('ix_question_quiz', 'question', ['quiz_id']),
+    ('ix_certificate_user_quiz_created', 'certificate', ['user_id', 'quiz_id', 'created_at']),
+    ('ix_certificate_job_status', 'certificate_job', ['status']),
+    ('ix_certificate_job_user_quiz', 'certificate_job', ['user_id', 'quiz_id']),
+    ('ix_quiz_attempt_user_quiz_status', 'quiz_attempt', ['user_id', 'quiz_id', 'status']),
+    ('ix_quiz_chapter', 'quiz', ['chapter_id']),
+    ('ix_chapter_subject', 'chapter', ['subject_id']),
+)
+
+def upgrade():
+    # certificate_job and quiz_attempt have no revision of their own; where
+    # db.create_all() built them they already carry these indexes
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for name, table, columns in INDEXES:
+        if table in existing:
+            op.create_index(name, table, columns, if_not_exists=True)
+    if op.get_bind().dialect.name == 'sqlite':
+        # refresh planner statistics so the new indexes are chosen straight away
+        op.execute('ANALYZE')
+
+def downgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for name, table, _ in reversed(INDEXES):
+        if table in existing:
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,26 @@
+"""add draw_count to quiz and question_ids to quiz_attempt
+
+Revision ID: add_question_draw
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_question_draw'
+down_revision = 'add_question_version_to_quiz'
+
+def _has_column(inspector, table, column):
+    return column in {c['name'] for c in inspector.get_columns(table)}
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # Number of questions drawn per attempt; NULL serves the whole quiz
+    if not _has_column(inspector, 'quiz', 'draw_count'):
+        op.add_column('quiz', sa.Column('draw_count', sa.Integer(), nullable=True))
+    # JSON list of the question ids drawn for an attempt; no revision creates
+    # quiz_attempt, so a missing table is left to db.create_all()
+    if inspector.has_table('quiz_attempt') and not _has_column(inspector, 'quiz_attempt', 'question_ids'):
+        op.add_column('quiz_attempt', sa.Column('question_ids', sa.Text(), nullable=True))
+
+def downgrade():
+    op.drop_column('quiz_attempt', 'question_ids')
+    op.drop_column('quiz', 'draw_count')
@@ -0,0 +1,21 @@
+"""add question_version to quiz
+
+Revision ID: add_question_version_to_quiz
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_question_version_to_quiz'
+down_revision = 'add_points_to_questions'
+
+def upgrade():
+    # Databases built by create_all after the model change already have it
+    if 'question_version' in {c['name'] for c in sa.inspect(op.get_bind()).get_columns('quiz')}:
+        return
+    # Bumped on every question change; invalidates cached question sets
+    op.add_column('quiz',
+        sa.Column('question_version', sa.Integer(), nullable=False, server_default='0')
+    )
+
+def downgrade():
+    op.drop_column('quiz', 'question_version')
@@ -14,12 +14,13 @@ try:
     from app import create_app, db
     from config.commands import register_commands
     from config.auto_init import auto_initialize
+    from app.services import startup
 except ImportError as e:
     logger.error(f"Failed to import required modules: {e}")
     sys.exit(1)
 
 def init_database(app):
-    """Initialize database tables"""
+    """Initialize database tables and seed data, unless the stored fingerprint matches"""
     with app.app_context():
         try:
             # Import all models here to ensure SQLAlchemy knows about them
@@ -31,8 +32,17 @@ def init_database(app):
             from app.models.score import Score
             from app.models.answer import Answer
             from app.models.certificate import Certificate
-            db.create_all()
-            logger.info("Database tables created successfully")
+            from app.models.certificate_job import CertificateJob
+            from app.models.quiz_attempt import QuizAttempt
+            from app.models.standing import Standing
+            from app.models.daily_score import DailyScore
+            from app.models.quiz_stats import QuizStats
+            from app.models.app_state import AppState
+            # Auto-initialize admin, test user, and quiz
+            if startup.initialize(app, auto_initialize):
+                logger.info("Database tables created successfully")
+            else:
+                logger.info("Database schema and seed data unchanged, skipping initialization")
         except Exception as e:
             logger.error(f"Failed to create database tables: {e}")
             raise
@@ -43,12 +53,12 @@ def create_application():
         app = create_app()
         register_commands(app)
         
-        # Always initialize DB to ensure tables exist
         init_database(app)
-        
-        # Auto-initialize admin, test user, and quiz
-        with app.app_context():
-            auto_initialize()
+
+        # Resume persisted certificate jobs left over from a previous run
+        with app.extensions['startup']['timer'].phase('certificate_queue'):
+            app.extensions['certificate_queue'].start()
+        startup.log_summary(app)
         
         # Register error handlers
         app.register_error_handler(404, not_found_error)
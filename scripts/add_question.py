@@ -20,6 +20,7 @@ from app.models.question import Question
 from app.models.quiz import Quiz
 from app.models.chapter import Chapter
 from app.models.subject import Subject
+from app.services.question_cache import bump_version
 
 
 def prompt_if_none(val, prompt_text):
@@ -81,6 +82,7 @@ def main():
             quiz_id=args.quiz
         )
         db.session.add(question)
+        bump_version(args.quiz)
         db.session.commit()
         print(f'Question added with id {question.id} to quiz id {args.quiz}')
 
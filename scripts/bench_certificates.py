@@ -0,0 +1,91 @@
+"""
+Micro-benchmark for certificate rendering: certificates per second with the
+previous per-certificate flowable story vs the cached CertificateTemplate.
+
+Usage:
+python -m scripts.bench_certificates [--count 200]
+"""
+
+import argparse
+import io
+import time
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER
+from app.services.certificates import render_certificate
+
+
+def render_story(filepath, fullname, subject_name, chapter_name, quiz_name, total_awarded, total_possible, percent):
+    """The previous implementation: styles, table style and story rebuilt every time"""
+    doc = SimpleDocTemplate(filepath, pagesize=A4)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24,
+                                 textColor=colors.HexColor('#6366f1'), spaceAfter=30,
+                                 alignment=TA_CENTER, fontName='Helvetica-Bold')
+    heading_style = ParagraphStyle('CustomHeading', parent=styles['Heading2'], fontSize=18,
+                                   textColor=colors.HexColor('#1e293b'), spaceAfter=20,
+                                   alignment=TA_CENTER, fontName='Helvetica-Bold')
+    normal_style = ParagraphStyle('CustomNormal', parent=styles['Normal'], fontSize=12,
+                                  textColor=colors.HexColor('#64748b'), spaceAfter=15,
+                                  alignment=TA_CENTER, fontName='Helvetica')
+    story = [
+        Spacer(1, 1.5*inch),
+        Paragraph("CERTIFICATE OF ACHIEVEMENT", title_style),
+        Spacer(1, 0.5*inch),
+        Paragraph("This is to certify that", normal_style),
+        Spacer(1, 0.3*inch),
+        Paragraph(fullname, heading_style),
+        Spacer(1, 0.3*inch),
+        Paragraph("has successfully completed the quiz", normal_style),
+        Spacer(1, 0.5*inch),
+    ]
+    data = [
+        ['Subject:', subject_name],
+        ['Chapter:', chapter_name],
+        ['Quiz:', quiz_name],
+        ['Score:', f"{total_awarded:.2f} / {total_possible:.2f}"],
+        ['Percentage:', f"{percent:.2f}%"],
+        ['Date:', time.strftime('%Y-%m-%d %H:%M:%S')]
+    ]
+    table = Table(data, colWidths=[2*inch, 4*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f1f5f9')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1e293b')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('TOPPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e2e8f0')),
+    ]))
+    story += [table, Spacer(1, 0.5*inch), Paragraph("Congratulations on your achievement!", normal_style)]
+    doc.build(story)
+
+
+def certificates_per_second(render, count):
+    args = ('Test Student', 'Biologiya', 'Hujayra', 'Hujayra Testi', 27.0, 30.0, 90.0)
+    render(io.BytesIO(), *args)  # warm-up: font metrics, cached template
+    start = time.perf_counter()
+    for _ in range(count):
+        render(io.BytesIO(), *args)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark certificate rendering')
+    parser.add_argument('--count', type=int, default=200)
+    args = parser.parse_args()
+
+    before = certificates_per_second(render_story, args.count)
+    after = certificates_per_second(render_certificate, args.count)
+    print(f'flowable story:       {before:8.1f} certificates/s')
+    print(f'cached template:      {after:8.1f} certificates/s')
+    print(f'speedup:              {after / before:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark a submission burst: one transaction per request vs the group-commit writer.
+
+Usage:
+python -m scripts.bench_group_commit [--threads 16] [--submissions 25] [--questions 50]
+                                     [--batch-size 50] [--wait-ms 50] [--modes direct grouped]
+
+Every thread submits its share as fast as it can, so all submissions land at
+once. Latency is measured from the start of grading until the submission is
+committed (for "grouped", until the writer resolves its future). Each mode
+runs in its own interpreter against a fresh SQLite file in a temporary
+directory, so the real quiz_master.db is never touched.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+
+if __name__ == '__main__' and '--child' in sys.argv:
+    _tmpdir = tempfile.mkdtemp(prefix='quiz_bench_')
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(_tmpdir, 'bench.db')
+
+import random
+from scripts.bench_sqlite_profile import create_fixture, run_burst, submit, summarize
+
+
+def submit_grouped(quiz_id, user_id):
+    """Grade in the request thread, then wait for the writer to commit it"""
+    from app import db
+    from app.models.quiz import Quiz
+    from app.services.grading import grade
+    from app.services.question_cache import get_question_set
+    from app.services.submission_writer import get_writer
+    quiz = db.session.get(Quiz, quiz_id)
+    answer_key = get_question_set(quiz).answer_key
+    graded = grade(answer_key, [random.randint(1, 4) for _ in answer_key.question_ids])
+    get_writer().save(quiz_id, user_id, answer_key, graded, attempt_token=uuid.uuid4().hex).result(timeout=60)
+
+
+def child(args):
+    from app import create_app
+    from app.services.submission_writer import get_writer
+    app = create_app()
+    app.config['CERTIFICATE_WORKERS'] = 0
+    app.config['SUBMISSION_WRITER'] = args.mode == 'grouped'
+    app.config['SUBMISSION_BATCH_SIZE'] = args.batch_size
+    app.config['SUBMISSION_BATCH_WAIT_MS'] = args.wait_ms
+    with app.app_context():
+        quiz_id, user_ids = create_fixture(args.questions, args.threads * 4)
+    submit_fn = submit_grouped if args.mode == 'grouped' else submit
+    result = summarize(run_burst(app, quiz_id, user_ids, args.threads, args.submissions, submit_fn=submit_fn))
+    with app.app_context():
+        result['avg_batch'] = get_writer().metrics()['avg_batch']
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark group-commit submission writes')
+    parser.add_argument('--modes', nargs='+', choices=['direct', 'grouped'], default=['direct', 'grouped'])
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent submitting threads.')
+    parser.add_argument('--submissions', type=int, default=25, help='Submissions per thread.')
+    parser.add_argument('--questions', type=int, default=50, help='Questions per quiz.')
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--wait-ms', type=int, default=50)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print(f'{"mode":>8} {"ok":>6} {"locked":>7} {"subm/s":>8} {"p50 ms":>8} {"p99 ms":>9} {"batch":>6}')
+    for mode in args.modes:
+        cmd = [sys.executable, '-m', 'scripts.bench_group_commit', '--child', '--mode', mode,
+               '--threads', str(args.threads), '--submissions', str(args.submissions),
+               '--questions', str(args.questions), '--batch-size', str(args.batch_size),
+               '--wait-ms', str(args.wait_ms)]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f'{mode:>8} failed: {proc.stderr.strip().splitlines()[-1]}')
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        batch = f'{r["avg_batch"]:.1f}' if r['avg_batch'] else '-'
+        print(f'{mode:>8} {r["ok"]:>6} {r["locked"]:>7} {r["per_second"]:>8.1f} '
+              f'{r["p50_ms"]:>8.1f} {r["p99_ms"]:>9.1f} {batch:>6}')
+
+
+if __name__ == '__main__':
+    main()
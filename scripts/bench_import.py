@@ -0,0 +1,77 @@
+"""
+Benchmark multi-file question import: questions/s by number of parser processes.
+
+Usage:
+python -m scripts.bench_import [--files 16] [--questions 5000] [--workers 0 1 2 4]
+
+Question files and a throwaway SQLite database are created in a temporary
+directory, so the real quiz_master.db is never touched. Each run imports the
+same manifest into fresh quizzes; workers=0 parses in the writer process.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix='quiz_bench_')
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(_tmpdir, 'bench.db')
+
+from app import create_app, db
+from app.models.subject import Subject
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.services.question_import import import_manifest
+
+
+def write_files(count, questions):
+    paths = []
+    for n in range(count):
+        path = os.path.join(_tmpdir, f'bank_{n}.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(questions):
+                f.write(f'Bank {n} question {i}: which option is right?\n'
+                        f'option a {i}\noption b {i}\noption c {i}\noption d {i}\n{random.randint(1, 4)}\n\n')
+        paths.append(path)
+    return paths
+
+
+def create_quizzes(count):
+    subject = Subject(name=f'Bench {time.time()}')
+    db.session.add(subject)
+    db.session.flush()
+    chapter = Chapter(name='Bench', subject_id=subject.id)
+    db.session.add(chapter)
+    db.session.flush()
+    quizzes = [Quiz(name=f'Bench {n}', chapter_id=chapter.id) for n in range(count)]
+    db.session.add_all(quizzes)
+    db.session.commit()
+    return [q.id for q in quizzes]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=16)
+    parser.add_argument('--questions', type=int, default=5000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    args = parser.parse_args()
+
+    paths = write_files(args.files, args.questions)
+    total = args.files * args.questions
+    print(f'{args.files} files x {args.questions} questions, {os.cpu_count()} CPUs')
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        for workers in args.workers:
+            entries = list(zip(paths, create_quizzes(args.files)))
+            start = time.perf_counter()
+            reports = import_manifest(entries, workers=workers)
+            elapsed = time.perf_counter() - start
+            assert sum(r.created for r in reports) == total
+            print(f'workers={workers:<2} {elapsed:7.2f}s  {total / elapsed:10.0f} questions/s')
+
+
+if __name__ == '__main__':
+    main()
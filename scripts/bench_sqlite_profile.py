@@ -0,0 +1,203 @@
+"""
+Benchmark concurrent quiz submissions under each SQLite engine profile.
+
+Usage:
+python -m scripts.bench_sqlite_profile [--profiles default production] [--threads 8]
+                                       [--submissions 50] [--questions 50] [--readers 2]
+
+Each profile runs in its own interpreter against a fresh SQLite file in a
+temporary directory, so the real quiz_master.db is never touched. Writer
+threads grade and commit submissions through save_submission, as the
+attempt_quiz POST does, while reader threads keep loading results pages'
+queries. "locked" counts submissions that failed with "database is locked".
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+if __name__ == '__main__' and '--child' in sys.argv:
+    _tmpdir = tempfile.mkdtemp(prefix='quiz_bench_')
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(_tmpdir, 'bench.db')
+
+from sqlalchemy.exc import OperationalError
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def create_fixture(questions, users):
+    """A quiz with `questions` questions and `users` students; returns (quiz id, user ids)"""
+    from app import db
+    from app.models.user import User
+    from app.models.subject import Subject
+    from app.models.chapter import Chapter
+    from app.models.quiz import Quiz
+    from app.models.question import Question
+    subject = Subject(name='Bench')
+    db.session.add(subject)
+    db.session.flush()
+    chapter = Chapter(name='Bench', subject_id=subject.id)
+    db.session.add(chapter)
+    db.session.flush()
+    quiz = Quiz(name='Bench', chapter_id=chapter.id)
+    db.session.add(quiz)
+    db.session.flush()
+    db.session.add_all([
+        Question(question_statement=f'q{i}', option1='a', option2='b', option3='c', option4='d',
+                 correct_option=random.randint(1, 4), points=1, quiz_id=quiz.id)
+        for i in range(questions)
+    ])
+    students = [User(username=f'student{i}@quiz.com', fullname=f'Student {i}', password_hash='-') for i in range(users)]
+    db.session.add_all(students)
+    db.session.commit()
+    return quiz.id, [u.id for u in students]
+
+
+def submit(quiz_id, user_id):
+    """Grade and commit one random submission, as the attempt_quiz POST does"""
+    from app import db
+    from app.models.quiz import Quiz
+    from app.services.grading import grade, save_submission
+    from app.services.question_cache import get_question_set
+    quiz = db.session.get(Quiz, quiz_id)
+    answer_key = get_question_set(quiz).answer_key
+    graded = grade(answer_key, [random.randint(1, 4) for _ in answer_key.question_ids])
+    save_submission(quiz_id, user_id, answer_key, graded, attempt_token=uuid.uuid4().hex)
+    db.session.commit()
+
+
+def read_results(quiz_id, user_id):
+    """The queries of a results page: latest score and its answers"""
+    from app.models.score import Score
+    score = Score.query.filter_by(user_id=user_id, quiz_id=quiz_id).order_by(Score.id.desc()).first()
+    if score is not None:
+        len(score.answers)
+
+
+def run_burst(app, quiz_id, user_ids, threads, per_thread, readers=0, submit_fn=submit):
+    """Submit `per_thread` times from each of `threads` threads at once.
+
+    Returns the wall time, per-submission latencies in ms, locked failures
+    and the number of reads the reader threads completed meanwhile.
+    """
+    from app import db
+    latencies = []
+    locked = []
+    reads = []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(threads + readers + 1)
+    done = threading.Event()
+
+    def writer(n):
+        own, failed = [], 0
+        start_gate.wait()
+        for i in range(per_thread):
+            user_id = user_ids[(n * per_thread + i) % len(user_ids)]
+            with app.app_context():
+                t0 = time.perf_counter()
+                try:
+                    submit_fn(quiz_id, user_id)
+                    own.append((time.perf_counter() - t0) * 1000)
+                except OperationalError as e:
+                    db.session.rollback()
+                    if 'locked' not in str(e):
+                        raise
+                    failed += 1
+        with lock:
+            latencies.extend(own)
+            locked.append(failed)
+
+    def reader(n):
+        count = 0
+        start_gate.wait()
+        while not done.is_set():
+            with app.app_context():
+                try:
+                    read_results(quiz_id, user_ids[(n + count) % len(user_ids)])
+                    count += 1
+                except OperationalError:
+                    db.session.rollback()
+        with lock:
+            reads.append(count)
+
+    workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    others = [threading.Thread(target=reader, args=(n,), daemon=True) for n in range(readers)]
+    for t in workers + others:
+        t.start()
+    start_gate.wait()
+    started = time.perf_counter()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for t in others:
+        t.join()
+    return {'seconds': elapsed, 'latencies': latencies, 'locked': sum(locked), 'reads': sum(reads)}
+
+
+def summarize(result):
+    latencies = result['latencies']
+    return {
+        'ok': len(latencies),
+        'locked': result['locked'],
+        'per_second': len(latencies) / result['seconds'] if result['seconds'] else 0.0,
+        'p50_ms': statistics.median(latencies) if latencies else 0.0,
+        'p99_ms': percentile(latencies, 99),
+        'reads_per_second': result['reads'] / result['seconds'] if result['seconds'] else 0.0,
+    }
+
+
+def child(args):
+    from app import create_app, db
+    app = create_app()
+    app.config['CERTIFICATE_WORKERS'] = 0
+    with app.app_context():
+        quiz_id, user_ids = create_fixture(args.questions, args.threads * 4)
+        journal_mode = db.session.connection().exec_driver_sql('PRAGMA journal_mode').scalar()
+    result = summarize(run_burst(app, quiz_id, user_ids, args.threads, args.submissions, args.readers))
+    result['journal_mode'] = journal_mode
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent submissions per SQLite profile')
+    parser.add_argument('--profiles', nargs='+', default=['default', 'production'])
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent submitting threads.')
+    parser.add_argument('--submissions', type=int, default=50, help='Submissions per thread.')
+    parser.add_argument('--questions', type=int, default=50, help='Questions per quiz.')
+    parser.add_argument('--readers', type=int, default=2, help='Threads reading results meanwhile.')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print(f'{"profile":>12} {"journal":>8} {"ok":>6} {"locked":>7} {"subm/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"reads/s":>8}')
+    for profile in args.profiles:
+        cmd = [sys.executable, '-m', 'scripts.bench_sqlite_profile', '--child',
+               '--threads', str(args.threads), '--submissions', str(args.submissions),
+               '--questions', str(args.questions), '--readers', str(args.readers)]
+        proc = subprocess.run(cmd, capture_output=True, text=True, env=dict(os.environ, SQLITE_PROFILE=profile))
+        if proc.returncode != 0:
+            print(f'{profile:>12} failed: {proc.stderr.strip().splitlines()[-1]}')
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f'{profile:>12} {r["journal_mode"]:>8} {r["ok"]:>6} {r["locked"]:>7} {r["per_second"]:>8.1f} '
+              f'{r["p50_ms"]:>8.1f} {r["p99_ms"]:>8.1f} {r["reads_per_second"]:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark quiz submission latency: per-row ORM grading vs set-based bulk grading.
+
+Both paths write everything a submission writes today, each in one
+transaction: the Score, one Answer per question, the user's two Standing
+rows, the DailyScore rollup and the quiz's QuizStats row. They differ only in
+how the answers are graded and the Answer rows inserted, so the derived
+writes are a fixed cost on top of both.
+
+Usage:
+python -m scripts.bench_submission [--sizes 10 100 1000] [--repeat 20]
+
+A throwaway SQLite database is created in a temporary directory, so the real
+quiz_master.db is never touched.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+_tmpdir = tempfile.mkdtemp(prefix='quiz_bench_')
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(_tmpdir, 'bench.db')
+
+from app import create_app, db
+from app.models.user import User
+from app.models.subject import Subject
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.models.question import Question
+from app.models.score import Score
+from app.models.answer import Answer
+from app.services import quiz_stats
+from app.services.grading import load_answer_key, grade, save_submission
+from app.services.standings import record_score
+
+
+def create_quiz(user, size):
+    subject = Subject(name=f'Bench {size}')
+    db.session.add(subject)
+    db.session.flush()
+    chapter = Chapter(name=f'Bench {size}', subject_id=subject.id)
+    db.session.add(chapter)
+    db.session.flush()
+    quiz = Quiz(name=f'Bench {size}', chapter_id=chapter.id)
+    db.session.add(quiz)
+    db.session.flush()
+    db.session.add_all([
+        Question(question_statement=f'q{i}', option1='a', option2='b', option3='c', option4='d',
+                 correct_option=random.randint(1, 4), points=1, quiz_id=quiz.id)
+        for i in range(size)
+    ])
+    db.session.commit()
+    return quiz
+
+
+def submit_orm(quiz, user, answers):
+    """The previous implementation: one Answer object per question"""
+    quiz = db.session.get(Quiz, quiz.id)
+    total_awarded = 0.0
+    user_score = Score(total_scored=0.0, quiz_id=quiz.id, user_id=user.id, timestamp=datetime.utcnow())
+    db.session.add(user_score)
+    db.session.flush()
+    for question in quiz.questions:
+        sel = answers.get(question.id)
+        is_correct = sel == question.correct_option
+        awarded = float(question.points or 0.0) if is_correct else 0.0
+        total_awarded += awarded
+        db.session.add(Answer(score_id=user_score.id, question_id=question.id, selected_option=sel,
+                              is_correct=is_correct, points_awarded=awarded))
+    user_score.total_scored = total_awarded
+    db.session.flush()
+    # the standings, daily rollup and statistics writes save_submission() also makes
+    record_score(user.id, quiz.id, total_awarded, user_score.timestamp.date())
+    quiz_stats.record_score(user_score)
+    db.session.commit()
+
+
+def submit_bulk(quiz, user, answers):
+    answer_key = load_answer_key(quiz.id)
+    graded = grade(answer_key, [answers.get(qid) for qid in answer_key.question_ids])
+    save_submission(quiz.id, user.id, answer_key, graded)
+    db.session.commit()
+
+
+def measure(fn, quiz, user, answers, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.expire_all()
+        start = time.perf_counter()
+        fn(quiz, user, answers)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark quiz submission latency')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        user = User(username='bench@quiz.com', fullname='Bench User')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.commit()
+
+        print(f'{"questions":>10} {"orm ms":>10} {"bulk ms":>10} {"speedup":>8}')
+        for size in args.sizes:
+            quiz = create_quiz(user, size)
+            answers = {q.id: random.randint(1, 4) for q in quiz.questions}
+            orm_ms = measure(submit_orm, quiz, user, answers, args.repeat)
+            bulk_ms = measure(submit_bulk, quiz, user, answers, args.repeat)
+            print(f'{size:>10} {orm_ms:>10.2f} {bulk_ms:>10.2f} {orm_ms / bulk_ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
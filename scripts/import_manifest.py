@@ -0,0 +1,76 @@
+"""
+Bulk question importer for many files at once.
+
+The manifest lists one question file per line with the quiz it goes into:
+
+# path,quiz_id
+biology/cells.txt,3
+biology/genetics.txt,4
+chemistry/atoms.txt,7
+
+Relative paths are resolved against the manifest's directory. Files use the
+block format of scripts/import_questions.py. Worker processes parse and
+validate the files in parallel; this process inserts the validated questions
+in bulk batches as each file completes.
+
+Usage:
+& .venv\Scripts\python.exe scripts\import_manifest.py <manifest> [--workers N] [--batch-size N] [--errors rejected_dir]
+"""
+
+import argparse
+import os
+import sys
+import time
+from app import create_app, db
+# Import all related models so SQLAlchemy can configure relationships
+from app.models.user import User
+from app.models.score import Score
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.models.chapter import Chapter
+from app.models.subject import Subject
+from app.services.question_import import DEFAULT_BATCH_SIZE, import_manifest, read_manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import question files listed in a manifest')
+    parser.add_argument('manifest', help='file of "path,quiz_id" lines')
+    parser.add_argument('--workers', type=int, default=None, help='parser processes (default: CPU count, 0: no pool)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='questions per insert and commit')
+    parser.add_argument('--errors', help='write the rejected blocks of each file into this directory')
+    args = parser.parse_args()
+
+    try:
+        entries = read_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(e)
+        sys.exit(2)
+
+    def progress(report):
+        for line, message, _ in report.errors:
+            where = f'{report.source}:{line}' if line else report.source
+            print(f'Skipping {where}: {message}', file=sys.stderr)
+        print(f'... {report}', flush=True)
+
+    app = create_app()
+    with app.app_context():
+        start = time.perf_counter()
+        reports = import_manifest(entries, workers=args.workers, batch_size=args.batch_size, progress=progress)
+        elapsed = time.perf_counter() - start
+
+    created = sum(r.created for r in reports)
+    skipped = sum(r.skipped for r in reports)
+    if args.errors and skipped:
+        os.makedirs(args.errors, exist_ok=True)
+        for report in reports:
+            blocks = [block for _, _, block in report.errors if block]
+            if blocks:
+                name = os.path.splitext(os.path.basename(report.source))[0] + '.rejected.txt'
+                with open(os.path.join(args.errors, name), 'w', encoding='utf-8') as f:
+                    f.write(''.join('\n'.join(block) + '\n\n' for block in blocks))
+        print(f'Rejected blocks written to {args.errors}')
+    print(f'Imported {created} questions from {len(reports)} files in {elapsed:.2f}s ({skipped} skipped)')
+
+
+if __name__ == '__main__':
+    main()
@@ -20,11 +20,15 @@ What is 2+2?
 4
 
 Usage:
-& .venv\Scripts\python.exe scripts\import_questions.py <path-to-file> <quiz_id>
+& .venv\Scripts\python.exe scripts\import_questions.py <path-to-file> <quiz_id> [--batch-size N] [--errors rejected.txt]
 
-This script will create questions for the given quiz id.
+This script will create questions for the given quiz id. The file is read
+lazily and inserted in batches, each committed on its own; blocks that fail
+to parse are reported with their line number (and written to --errors, ready
+to be fixed and imported again) without stopping the import.
 """
 
+import argparse
 import sys
 from app import create_app, db
 # Import all related models so SQLAlchemy can configure relationships
@@ -34,95 +38,47 @@ from app.models.question import Question
 from app.models.quiz import Quiz
 from app.models.chapter import Chapter
 from app.models.subject import Subject
+from app.services.question_import import DEFAULT_BATCH_SIZE, ImportReport, import_questions
 
 
-def parse_blocks(lines):
-    blocks = []
-    current = []
-    for ln in lines:
-        s = ln.rstrip('\n')
-        if s.strip() == "":
-            if current:
-                blocks.append(current)
-                current = []
-        else:
-            current.append(s)
-    if current:
-        blocks.append(current)
-    return blocks
-
-
-def parse_block_to_question(block):
-    # Accept blocks with at least 6 lines; extra lines will be ignored
-    if len(block) < 6:
-        raise ValueError('Block must have at least 6 non-empty lines')
-    q_stmt = block[0].strip()
-    opt1 = block[1].strip()
-    opt2 = block[2].strip()
-    opt3 = block[3].strip()
-    opt4 = block[4].strip()
-    correct_raw = block[5].strip()
-    try:
-        correct = int(correct_raw)
-    except ValueError:
-        raise ValueError('Correct option must be an integer 1-4')
-    if correct < 1 or correct > 4:
-        raise ValueError('Correct option must be 1-4')
-    return {
-        'question_statement': q_stmt,
-        'option1': opt1,
-        'option2': opt2,
-        'option3': opt3,
-        'option4': opt4,
-        'correct_option': correct
-    }
+def write_errors(path, report):
+    with open(path, 'w', encoding='utf-8') as f:
+        for line, message, block in report.errors:
+            f.write('\n'.join(block) + '\n\n')
 
 
 def main():
-    if len(sys.argv) != 3:
-        print('Usage: import_questions.py <path-to-txt> <quiz_id>')
-        sys.exit(2)
-    path = sys.argv[1]
-    quiz_id = None
-    try:
-        quiz_id = int(sys.argv[2])
-    except ValueError:
-        print('quiz_id must be an integer')
-        sys.exit(2)
+    parser = argparse.ArgumentParser(description='Import question blocks from a text file into a quiz')
+    parser.add_argument('path', help='text file with question blocks')
+    parser.add_argument('quiz_id', type=int)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='questions per insert and commit')
+    parser.add_argument('--errors', help='write rejected blocks to this file')
+    args = parser.parse_args()
 
     app = create_app()
     with app.app_context():
-        quiz = Quiz.query.get(quiz_id)
+        quiz = db.session.get(Quiz, args.quiz_id)
         if not quiz:
-            print(f'Quiz with id {quiz_id} not found')
+            print(f'Quiz with id {args.quiz_id} not found')
             sys.exit(1)
 
-        with open(path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        blocks = parse_blocks(lines)
-        print(f'Found {len(blocks)} question blocks in file')
-
-        created = 0
-        for i, b in enumerate(blocks, start=1):
-            try:
-                qdata = parse_block_to_question(b)
-            except Exception as e:
-                print(f'Skipping block {i}: parse error: {e}')
-                continue
-            question = Question(
-                question_statement=qdata['question_statement'],
-                option1=qdata['option1'],
-                option2=qdata['option2'],
-                option3=qdata['option3'],
-                option4=qdata['option4'],
-                correct_option=qdata['correct_option'],
-                quiz_id=quiz_id
-            )
-            db.session.add(question)
-            created += 1
-        db.session.commit()
-        print(f'Imported {created} questions into quiz id {quiz_id}')
+        report = ImportReport(args.path)
+        reported = 0
+
+        def progress(report):
+            nonlocal reported
+            for line, message, _ in report.errors[reported:]:
+                print(f'Skipping block at line {line}: {message}', file=sys.stderr)
+            reported = len(report.errors)
+            print(f'... {report}', flush=True)
+
+        with open(args.path, 'r', encoding='utf-8') as f:
+            import_questions(f, args.quiz_id, batch_size=args.batch_size, progress=progress, report=report)
+
+        if args.errors and report.errors:
+            write_errors(args.errors, report)
+            print(f'Rejected blocks written to {args.errors}')
+        print(f'Imported {report.created} questions into quiz id {args.quiz_id} ({report.skipped} skipped)')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,124 @@
+import os
+import statistics
+from flask import template_rendered
+from sqlalchemy import event
+from app import create_app, db
+from app.models.user import User
+from app.models.subject import Subject
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.models.score import Score
+from app.models.quiz_stats import QuizStats
+from app.services import quiz_stats
+
+
+def setup_app():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CERTIFICATE_WORKERS'] = 0
+    return app
+
+
+def test_admin_dashboard_query_count_is_constant():
+    app = setup_app()
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        admin = User(username='boss@example.com', fullname='Boss', is_admin=True)
+        admin.set_password('password123')
+        students = []
+        for i in range(4):
+            student = User(username=f's{i}@example.com', fullname=f'Student {i}')
+            student.set_password('pass')
+            students.append(student)
+        db.session.add_all([admin] + students)
+        subject = Subject(name='S1')
+        db.session.add(subject); db.session.commit()
+        chapter = Chapter(name='C1', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+
+        def add_quizzes(n):
+            for _ in range(n):
+                quiz = Quiz(name=f'Quiz {Quiz.query.count() + 1}', chapter_id=chapter.id)
+                db.session.add(quiz); db.session.flush()
+                # student 0 attempts twice; completion counts distinct users
+                db.session.add_all([Score(total_scored=4.0, quiz_id=quiz.id, user_id=students[0].id),
+                                    Score(total_scored=6.0, quiz_id=quiz.id, user_id=students[0].id),
+                                    Score(total_scored=8.0, quiz_id=quiz.id, user_id=students[1].id)])
+            db.session.commit()
+            quiz_stats.recompute()
+
+        client.post('/login', data={'username': 'boss@example.com', 'password': 'password123'})
+
+        statements = []
+        def count(*args):
+            statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', count)
+
+        contexts = []
+        def record(sender, template, context, **extra):
+            contexts.append(context)
+        template_rendered.connect(record, app)
+
+        def queries_for_dashboard():
+            statements.clear()
+            rv = client.get('/admin/dashboard')
+            assert rv.status_code == 200
+            return len(statements), contexts[-1]
+
+        add_quizzes(2)
+        db.session.add(Quiz(name='Unattempted', chapter_id=chapter.id)); db.session.commit()
+        small, _ = queries_for_dashboard()
+        add_quizzes(30)
+        large, context = queries_for_dashboard()
+        event.remove(db.engine, 'before_cursor_execute', count)
+        template_rendered.disconnect(record, app)
+
+        assert small == large
+        assert len(context['quiz_names']) == 33 and context['quiz_names'][2] == 'Unattempted'
+        assert context['average_scores'][0] == 6.0 and context['average_scores'][2] == 0
+        # 2 of 4 students attempted each quiz
+        assert context['completion_rates'][0] == 50.0 and context['completion_rates'][2] == 0
+
+        db.drop_all()
+
+
+def test_quiz_stats_streaming_matches_recompute():
+    app = setup_app()
+
+    with app.app_context():
+        db.create_all()
+        users = [User(username=f'u{i}@example.com', fullname=f'U{i}', password_hash='x') for i in range(3)]
+        subject = Subject(name='S1')
+        db.session.add_all(users + [subject]); db.session.commit()
+        chapter = Chapter(name='C1', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+        quiz = Quiz(name='Q1', chapter_id=chapter.id)
+        db.session.add(quiz); db.session.commit()
+
+        # large offset, small spread: the naive sum-of-squares formula loses this variance
+        values = [1e9 + v for v in (4.0, 7.0, 13.0, 16.0, 4.0, 10.0)]
+        for i, value in enumerate(values):
+            score = Score(total_scored=value, quiz_id=quiz.id, user_id=users[i % 3].id)
+            db.session.add(score); db.session.flush()
+            quiz_stats.record_score(score)
+        db.session.commit()
+
+        stats = db.session.get(QuizStats, quiz.id)
+        assert (stats.attempt_count, stats.user_count) == (6, 3)
+        assert (stats.min_score, stats.max_score) == (min(values), max(values))
+        assert abs(stats.mean - statistics.fmean(values)) < 1e-6
+        assert abs(stats.std - statistics.pstdev(values)) < 1e-6
+
+        streamed = (stats.attempt_count, stats.user_count, stats.mean, stats.m2, stats.min_score, stats.max_score)
+        assert quiz_stats.recompute() == 1
+        db.session.expire_all()
+        stats = db.session.get(QuizStats, quiz.id)
+        recomputed = (stats.attempt_count, stats.user_count, stats.mean, stats.m2, stats.min_score, stats.max_score)
+        assert recomputed[:2] == streamed[:2] and recomputed[4:] == streamed[4:]
+        assert abs(recomputed[2] - streamed[2]) < 1e-6 and abs(recomputed[3] - streamed[3]) < 1e-3
+
+        db.drop_all()
@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+import os
+from app import create_app, db
+from app.models.user import User
+from app.models.subject import Subject
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.models.question import Question
+from app.models.score import Score
+from app.models.answer import Answer
+from app.services import export
+from config.commands import register_commands
+
+
+def setup_app():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CERTIFICATE_WORKERS'] = 0
+    return app
+
+
+def test_streaming_exports():
+    app = setup_app()
+    register_commands(app)
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        admin = User(username='boss@example.com', fullname='Boss', is_admin=True)
+        admin.set_password('password123')
+        student = User(username='s@example.com', fullname='Student', password_hash='x')
+        s1, s2 = Subject(name='S1'), Subject(name='S2')
+        db.session.add_all([admin, student, s1, s2]); db.session.commit()
+        c1, c2 = Chapter(name='C1', subject_id=s1.id), Chapter(name='C2', subject_id=s2.id)
+        db.session.add_all([c1, c2]); db.session.commit()
+        q1, q2 = Quiz(name='Q1', chapter_id=c1.id), Quiz(name='Q2', chapter_id=c2.id)
+        db.session.add_all([q1, q2]); db.session.commit()
+        question = Question(question_statement='x', option1='a', option2='b', option3='c', option4='d',
+                            correct_option=1, quiz_id=q1.id)
+        db.session.add(question); db.session.commit()
+        for i in range(7):
+            score = Score(total_scored=float(i), quiz_id=(q1 if i % 2 == 0 else q2).id, user_id=student.id)
+            db.session.add(score); db.session.flush()
+            if score.quiz_id == q1.id:
+                db.session.add(Answer(score_id=score.id, question_id=question.id, selected_option=1, is_correct=True))
+        db.session.commit()
+
+        # small fetch batches so the export spans several chunks
+        export.FETCH_SIZE = 2
+        try:
+            client.post('/login', data={'username': 'boss@example.com', 'password': 'password123'})
+            rv = client.get(f'/admin/export/scores.csv?subject_id={s1.id}')
+            assert rv.status_code == 200 and rv.is_streamed
+            assert rv.headers['Content-Disposition'] == 'attachment; filename="scores.csv"'
+            rows = list(csv.DictReader(io.StringIO(rv.get_data(as_text=True))))
+            assert [float(r['total_scored']) for r in rows] == [0.0, 2.0, 4.0, 6.0]
+            assert {r['subject_name'] for r in rows} == {'S1'}
+
+            rv = client.get(f'/admin/export/answers.jsonl?quiz_id={q1.id}&start_date=2000-01-01')
+            answers = [json.loads(line) for line in rv.get_data(as_text=True).splitlines()]
+            assert len(answers) == 4 and all(a['is_correct'] for a in answers)
+
+            assert client.get('/admin/export/passwords.csv').status_code == 404
+            assert client.get('/admin/export/scores.csv?start_date=yesterday').status_code == 400
+
+            result = app.test_cli_runner().invoke(args=['export', 'scores', '--format', 'jsonl', '--quiz-id', str(q2.id)])
+            assert result.exit_code == 0
+            assert [json.loads(line)['total_scored'] for line in result.output.splitlines()] == [1.0, 3.0, 5.0]
+        finally:
+            export.FETCH_SIZE = 5000
+
+        db.drop_all()
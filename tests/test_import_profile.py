@@ -0,0 +1,34 @@
+import os
+from app.services import import_profile
+
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 |     sqlalchemy.sql
+import time:       600 |       1500 |   sqlalchemy
+import time:       535 |        535 | app.services.grading
+not an importtime line
+"""
+
+
+def test_parse_and_summarize():
+    timings = list(import_profile.parse_importtime(SAMPLE.splitlines()))
+    assert [t.module for t in timings] == ['_io', 'sqlalchemy.sql', 'sqlalchemy', 'app.services.grading']
+    assert [t.depth for t in timings] == [1, 2, 1, 0]
+    assert timings[1].self_us == 300 and timings[1].cumulative_us == 900
+
+    assert import_profile.by_package(timings)[0] == ('sqlalchemy', 900, 2)
+    assert [t.module for t in import_profile.slowest(timings, 2)] == ['sqlalchemy', 'app.services.grading']
+
+    report = import_profile.StartupProfile(timings, 12.0, 2048)
+    text = import_profile.format_profile(report)
+    assert '4 modules imported in 1.6ms' in text and 'peak RSS 2.0 MiB' in text
+
+
+def test_create_app_does_not_load_heavy_dependencies():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    report = import_profile.profile(cwd=root)
+    packages = {t.module.split('.', 1)[0] for t in report.timings}
+    assert 'app' in packages
+    assert not packages & {'reportlab', 'PIL', 'numpy'}
@@ -0,0 +1,83 @@
+import os
+import numpy as np
+from app import create_app, db
+from app.models.user import User
+from app.models.subject import Subject
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.models.question import Question
+from app.models.score import Score
+from app.models.answer import Answer
+from app.services import item_analysis, quiz_stats
+
+
+def setup_app():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CERTIFICATE_WORKERS'] = 0
+    return app
+
+
+def test_compute_item_statistics():
+    # (score, question, selected option or 0 for blank, correct); question 99 left the quiz
+    rows = np.array([
+        (1, 10, 1, 1), (1, 20, 2, 1),
+        (2, 10, 1, 1), (2, 20, 3, 0),
+        (3, 10, 2, 0), (3, 20, 0, 0),
+        (4, 10, 1, 1), (4, 20, 2, 1),
+        (4, 99, 1, 1),
+    ])
+    submissions, items = item_analysis.compute([20, 10], rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3].astype(bool))
+
+    assert submissions == 4
+    assert items[10].p_value == 0.75 and items[20].p_value == 0.5
+    # top group is submission 4, bottom group submission 3
+    assert items[10].discrimination == 1.0 and items[20].discrimination == 1.0
+    assert items[10].option_counts == (3, 1, 0, 0) and items[10].unanswered == 0
+    assert items[20].option_counts == (0, 2, 1, 0) and items[20].unanswered == 1
+    assert items[20].option_freq == (0.0, 0.5, 0.25, 0.0)
+
+
+def test_manage_questions_shows_cached_analysis():
+    app = setup_app()
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        admin = User(username='boss@example.com', fullname='Boss', is_admin=True)
+        admin.set_password('password123')
+        student = User(username='s@example.com', fullname='Student', password_hash='x')
+        subject = Subject(name='S1')
+        db.session.add_all([admin, student, subject]); db.session.commit()
+        chapter = Chapter(name='C1', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+        quiz = Quiz(name='Q1', chapter_id=chapter.id)
+        db.session.add(quiz); db.session.commit()
+        question = Question(question_statement='2+2', option1='3', option2='4', option3='5', option4='6',
+                            correct_option=2, quiz_id=quiz.id)
+        db.session.add(question); db.session.commit()
+
+        def submit(selected):
+            score = Score(total_scored=float(selected == 2), quiz_id=quiz.id, user_id=student.id)
+            db.session.add(score); db.session.flush()
+            db.session.add(Answer(score_id=score.id, question_id=question.id, selected_option=selected,
+                                  is_correct=selected == 2))
+            quiz_stats.record_score(score)
+            db.session.commit()
+
+        submit(2); submit(1)
+        client.post('/login', data={'username': 'boss@example.com', 'password': 'password123'})
+        html = client.get(f'/admin/quiz/{quiz.id}/questions').get_data(as_text=True)
+        assert 'based on 2 submissions' in html
+        assert '<strong>50%</strong>' in html
+
+        first = item_analysis.analyze_quiz(quiz.id)
+        assert item_analysis.analyze_quiz(quiz.id) is first
+        submit(2)
+        second = item_analysis.analyze_quiz(quiz.id)
+        assert second is not first
+        assert second.submissions == 3 and abs(second.items[question.id].p_value - 2 / 3) < 1e-9
+
+        db.drop_all()
@@ -0,0 +1,127 @@
+import json
+import os
+from app import create_app, db
+from app.models.user import User
+from app.models.subject import Subject
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.models.question import Question
+from app.models.score import Score
+from app.models.quiz_attempt import QuizAttempt
+from app.services import certificates
+
+
+def setup_app():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CERTIFICATE_WORKERS'] = 0
+    app.config['ATTEMPT_PAGE_SIZE'] = 2
+    return app
+
+
+def test_paged_attempt_autosave_and_submit(monkeypatch, tmp_path):
+    # a full score renders a certificate; keep it out of static/certificates
+    monkeypatch.setattr(certificates, 'CERTIFICATES_DIR', str(tmp_path))
+    app = setup_app()
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        subject = Subject(name='Math')
+        db.session.add(subject); db.session.commit()
+        chapter = Chapter(name='Algebra', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+        quiz = Quiz(name='Quiz1', chapter_id=chapter.id, time_duration=0)
+        db.session.add(quiz); db.session.commit()
+        questions = [
+            Question(question_statement=f'q{i}', option1='a', option2='b', option3='c', option4='d',
+                     correct_option=(i % 4) + 1, quiz_id=quiz.id, points=1)
+            for i in range(3)
+        ]
+        db.session.add_all(questions); db.session.commit()
+
+        client.post('/register', data={'username': 'pager@example.com', 'password': 'password123', 'confirm_password': 'password123',
+                                       'fullname': 'Pager', 'qualification': '', 'dob': '1990-01-01', 'avatar': 'person-circle'})
+        client.post('/login', data={'username': 'pager@example.com', 'password': 'password123'})
+
+        rv = client.get(f'/attempt_quiz/{quiz.id}?mode=paged')
+        assert rv.status_code == 302 and rv.headers['Location'].endswith(f'/attempt_quiz/{quiz.id}/paged')
+        assert client.get(f'/attempt_quiz/{quiz.id}/paged').status_code == 200
+        # reloading resumes the same attempt
+        assert client.get(f'/attempt_quiz/{quiz.id}/paged').status_code == 200
+        assert QuizAttempt.query.count() == 1
+        token = QuizAttempt.query.one().token
+
+        first = client.get(f'/attempts/{token}/questions?offset=0').get_json()
+        second = client.get(f'/attempts/{token}/questions?offset=2').get_json()
+        assert first['total'] == 3
+        assert len(first['questions']) == 2 and len(second['questions']) == 1
+        shown = first['questions'] + second['questions']
+        assert sorted(q['id'] for q in shown) == sorted(q.id for q in questions)
+
+        def correct_position(item):
+            question = db.session.get(Question, item['id'])
+            correct_text = (question.option1, question.option2, question.option3, question.option4)[question.correct_option - 1]
+            return item['options'].index(correct_text) + 1
+
+        # two answers autosaved, the last one only arrives with the final submit
+        saved = client.post(f'/attempts/{token}/answers', json={'answers': {str(q['id']): correct_position(q) for q in shown[:2]}})
+        assert saved.get_json() == {'saved': 2}
+        # unchanged batches do not count as writes
+        assert client.post(f'/attempts/{token}/answers', json={'answers': {str(shown[0]['id']): correct_position(shown[0])}}).get_json() == {'saved': 0}
+
+        rv = client.post(f'/attempts/{token}/submit', data={f"question_{shown[2]['id']}": str(correct_position(shown[2]))})
+        assert rv.status_code == 302
+
+        score = Score.query.one()
+        assert score.total_scored == 3.0
+        attempt = QuizAttempt.query.one()
+        assert attempt.status == 'submitted' and attempt.score_id == score.id
+
+        db.drop_all()
+
+
+def test_draw_count_serves_and_grades_only_the_drawn_subset(monkeypatch, tmp_path):
+    monkeypatch.setattr(certificates, 'CERTIFICATES_DIR', str(tmp_path))
+    app = setup_app()
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        subject = Subject(name='Bio')
+        db.session.add(subject); db.session.commit()
+        chapter = Chapter(name='Cells', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+        quiz = Quiz(name='Bank', chapter_id=chapter.id, time_duration=0, draw_count=5)
+        db.session.add(quiz); db.session.commit()
+        db.session.add_all([
+            Question(question_statement=f'q{i}', option1='a', option2='b', option3='c', option4='d',
+                     correct_option=1, quiz_id=quiz.id, points=1)
+            for i in range(60)
+        ])
+        db.session.commit()
+
+        client.post('/register', data={'username': 'drawer@example.com', 'password': 'password123', 'confirm_password': 'password123',
+                                       'fullname': 'Drawer', 'qualification': '', 'dob': '1990-01-01', 'avatar': 'person-circle'})
+        client.post('/login', data={'username': 'drawer@example.com', 'password': 'password123'})
+
+        assert client.get(f'/attempt_quiz/{quiz.id}').status_code == 200
+        # reloading keeps the same draw
+        assert client.get(f'/attempt_quiz/{quiz.id}').status_code == 200
+        attempt = QuizAttempt.query.one()
+        drawn = json.loads(attempt.question_ids)
+        assert len(drawn) == 5 and len(set(drawn)) == 5
+
+        with client.session_transaction() as sess:
+            state = sess[f'quiz_attempt_{quiz.id}']
+        assert state['id'] == attempt.token
+        rv = client.post(f'/attempt_quiz/{quiz.id}', data={'attempt_id': attempt.token})
+        assert rv.status_code == 302
+
+        score = Score.query.one()
+        assert sorted(a.question_id for a in score.answers) == sorted(drawn)
+        assert QuizAttempt.query.one().status == 'submitted'
+
+        db.drop_all()
@@ -0,0 +1,201 @@
+import importlib.util
+import os
+import re
+import shutil
+from datetime import datetime, timedelta
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, event, inspect
+from app import create_app, db
+from app.models.user import User
+from app.models.subject import Subject
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.models.question import Question
+from app.models.score import Score
+from app.models.answer import Answer
+from app.models.certificate import Certificate
+from app.models.certificate_job import CertificateJob
+from app.models.comment import Comment
+from app.models.quiz_attempt import QuizAttempt
+from app.services import quiz_stats, standings
+
+# tables that grow with usage; hot paths must reach them through an index
+HOT_TABLES = {'score', 'answer', 'comment', 'question', 'certificate', 'certificate_job', 'quiz_attempt'}
+SCAN = re.compile(r'^SCAN (\w+)')
+
+MIGRATION = os.path.join(os.path.dirname(__file__), '..', 'migrations', 'versions', 'add_hot_path_indexes.py')
+SHIPPED_DB = os.path.join(os.path.dirname(__file__), '..', 'quiz_master.db')
+
+
+def setup_app():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CERTIFICATE_WORKERS'] = 0
+    return app
+
+
+def populate():
+    users = []
+    for i in range(20):
+        user = User(username=f'u{i}@example.com', fullname=f'User {i}')
+        user.set_password('password123')
+        users.append(user)
+    admin = User(username='boss@example.com', fullname='Boss', is_admin=True)
+    admin.set_password('password123')
+    db.session.add_all(users + [admin])
+    subject = Subject(name='Math')
+    db.session.add(subject); db.session.flush()
+    chapter = Chapter(name='Algebra', subject_id=subject.id)
+    db.session.add(chapter); db.session.flush()
+    quizzes = []
+    for i in range(5):
+        quiz = Quiz(name=f'Quiz {i}', chapter_id=chapter.id, time_duration=0, draw_count=3 if i == 1 else None)
+        db.session.add(quiz); db.session.flush()
+        questions = [Question(question_statement=f'q{i}.{n}', option1='a', option2='b', option3='c', option4='d',
+                              correct_option=1, quiz_id=quiz.id, points=1) for n in range(5)]
+        db.session.add_all(questions); db.session.flush()
+        quizzes.append((quiz, questions))
+
+    start = datetime(2024, 1, 1)
+    for n, user in enumerate(users):
+        for quiz, questions in quizzes:
+            score = Score(total_scored=n % 5, quiz_id=quiz.id, user_id=user.id, timestamp=start + timedelta(hours=n))
+            db.session.add(score); db.session.flush()
+            db.session.add_all([Answer(score_id=score.id, question_id=q.id, selected_option=1, is_correct=True,
+                                       points_awarded=1.0) for q in questions])
+            db.session.add(Certificate(user_id=user.id, quiz_id=quiz.id, file_path='static/certificates/x.pdf'))
+            db.session.add(CertificateJob(user_id=user.id, quiz_id=quiz.id, score_id=score.id,
+                                          total_awarded=1.0, total_possible=5.0, status='done'))
+            db.session.add(Comment(user_id=user.id, content='nice', comment_type='quiz', quiz_id=quiz.id))
+        db.session.add(Comment(user_id=user.id, content='hello', comment_type='app'))
+        db.session.add(QuizAttempt(token=f'done{n}', user_id=user.id, quiz_id=quizzes[1][0].id, seed=n,
+                                   answers='{}', status='submitted'))
+    db.session.commit()
+    standings.rebuild()
+    standings.backfill_daily()
+    quiz_stats.recompute()
+    return users[0], admin, [quiz for quiz, _ in quizzes]
+
+
+def record(client, engine, requests):
+    """Run the requests and return {label: [(statement, parameters)]} of the SELECTs each issued"""
+    captured = {}
+    current = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            current.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        for label, call in requests:
+            current.clear()
+            response = call(client)
+            assert response.status_code in (200, 302), (label, response.status_code)
+            captured[label] = list(current)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    return captured
+
+
+def full_scans(statement, parameters):
+    plan = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    return [row[3] for row in plan if (m := SCAN.match(row[3])) and m.group(1) in HOT_TABLES]
+
+
+def test_hot_queries_use_indexes():
+    app = setup_app()
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        user, admin, quizzes = populate()
+        user_id, quiz_id, drawn_id = user.id, quizzes[0].id, quizzes[1].id
+        answers = {f'question_{q.id}': '1' for q in quizzes[0].questions}
+        engine = db.engine
+
+    # requests run in their own sessions, as in production, so nothing is served from the identity map
+    client.post('/login', data={'username': 'u0@example.com', 'password': 'password123'})
+    page = client.get(f'/attempt_quiz/{quiz_id}').get_data(as_text=True)
+    token = re.search(r'name="attempt_id" value="([^"]+)"', page).group(1)
+    captured = record(client, engine, [
+        ('home', lambda c: c.get('/')),
+        ('dashboard', lambda c: c.get('/dashboard')),
+        ('select quiz', lambda c: c.get('/select-quiz')),
+        ('attempt', lambda c: c.get(f'/attempt_quiz/{quiz_id}')),
+        ('attempt drawn', lambda c: c.get(f'/attempt_quiz/{drawn_id}')),
+        ('submit', lambda c: c.post(f'/attempt_quiz/{quiz_id}', data=dict(answers, attempt_id=token))),
+        ('resubmit', lambda c: c.post(f'/attempt_quiz/{quiz_id}', data=dict(answers, attempt_id=token))),
+        ('results', lambda c: c.get(f'/quiz_results/{quiz_id}')),
+        ('profile', lambda c: c.get(f'/profile/{user_id}')),
+        ('leaderboard', lambda c: c.get('/leaderboard')),
+        ('comment', lambda c: c.post('/comment/add', data={'content': 'hi', 'comment_type': 'quiz',
+                                                            'quiz_id': quiz_id})),
+    ])
+    client.get('/logout')
+    client.post('/login', data={'username': 'boss@example.com', 'password': 'password123'})
+    captured.update(record(client, engine, [
+        ('manage questions', lambda c: c.get(f'/admin/quiz/{quiz_id}/questions')),
+    ]))
+
+    with app.app_context():
+        assert all(captured.values()), [label for label, statements in captured.items() if not statements]
+        failures = []
+        for label, statements in captured.items():
+            for statement, parameters in statements:
+                for detail in full_scans(statement, parameters):
+                    failures.append(f"{label}: {detail}\n    {' '.join(statement.split())}")
+        assert not failures, "full table scans on hot paths:\n" + "\n".join(failures)
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location('add_hot_path_indexes', MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    return migration
+
+
+def index_names(conn):
+    inspector = inspect(conn)
+    return {ix['name'] for table in inspector.get_table_names() for ix in inspector.get_indexes(table)}
+
+
+def test_index_migration_round_trip(tmp_path):
+    migration = load_migration()
+    expected = {name for name, _, _ in migration.INDEXES}
+    # the committed database predates the indexes (and certificate_job / quiz_attempt)
+    path = tmp_path / 'quiz_master.db'
+    shutil.copy(SHIPPED_DB, path)
+    engine = create_engine('sqlite:///' + str(path))
+
+    with engine.begin() as conn:
+        assert not expected & index_names(conn)
+        present = {name for name, table, _ in migration.INDEXES if inspect(conn).has_table(table)}
+        with Operations.context(MigrationContext.configure(conn)):
+            migration.upgrade()
+            assert index_names(conn) & expected == present
+            # running it again, as on a database built by create_all, is harmless
+            migration.upgrade()
+            migration.downgrade()
+            assert not expected & index_names(conn)
+    engine.dispose()
+
+    # the models declare the same indexes the migration creates
+    declared = {ix.name for table in db.metadata.tables.values() for ix in table.indexes}
+    assert expected <= declared
+
+
+def test_index_migration_on_a_create_all_database():
+    app = setup_app()
+    migration = load_migration()
+
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as conn:
+            with Operations.context(MigrationContext.configure(conn)):
+                migration.upgrade()
+            assert {name for name, _, _ in migration.INDEXES} <= index_names(conn)
+        db.drop_all()
@@ -0,0 +1,49 @@
+import os
+from app import create_app, db
+from app.models.subject import Subject
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.models.question import Question
+from app.services import question_cache
+
+
+def setup_app():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+def test_question_set_is_cached_until_version_bump():
+    app = setup_app()
+
+    with app.app_context():
+        db.create_all()
+        subject = Subject(name='Math')
+        db.session.add(subject); db.session.commit()
+        chapter = Chapter(name='Algebra', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+        quiz = Quiz(name='Quiz1', chapter_id=chapter.id)
+        db.session.add(quiz); db.session.commit()
+        q1 = Question(question_statement='q1', option1='a', option2='b', option3='c', option4='d', correct_option=3, quiz_id=quiz.id, points=2)
+        db.session.add(q1); db.session.commit()
+
+        first = question_cache.get_question_set(quiz)
+        assert first.answer_key.question_ids == (q1.id,)
+        assert first.answer_key.correct_options == (3,)
+        assert first.questions[0].options == ('a', 'b', 'c', 'd')
+        # same object while the version is unchanged
+        assert question_cache.get_question_set(quiz) is first
+
+        q2 = Question(question_statement='q2', option1='a', option2='b', option3='c', option4='d', correct_option=1, quiz_id=quiz.id, points=1)
+        db.session.add(q2)
+        question_cache.bump_version(quiz.id)
+        db.session.commit()
+
+        second = question_cache.get_question_set(quiz)
+        assert second is not first
+        assert second.version == first.version + 1
+        assert second.answer_key.question_ids == (q1.id, q2.id)
+        assert second.answer_key.points == (2.0, 1.0)
+
+        db.drop_all()
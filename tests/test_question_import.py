@@ -0,0 +1,102 @@
+import os
+from app import create_app, db
+from app.models.subject import Subject
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.models.question import Question
+from app.services.question_import import import_questions, import_manifest, read_manifest
+
+
+def setup_app():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CERTIFICATE_WORKERS'] = 0
+    return app
+
+
+def block(i, correct='2'):
+    return [f'Question {i}?', 'a', 'b', 'c', 'd', correct, '']
+
+
+def test_import_streams_batches_and_reports_bad_blocks():
+    app = setup_app()
+
+    with app.app_context():
+        db.create_all()
+        subject = Subject(name='S1')
+        db.session.add(subject); db.session.commit()
+        chapter = Chapter(name='C1', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+        quiz = Quiz(name='Q1', chapter_id=chapter.id)
+        db.session.add(quiz); db.session.commit()
+
+        lines = []
+        for i in range(1, 8):
+            lines += block(i, correct='7' if i == 3 else '2')
+        lines += ['Too short', 'a', '']
+        consumed = []
+
+        def stream():
+            # the importer must not read ahead of what it has inserted
+            for ln in lines:
+                consumed.append(ln)
+                yield ln + '\n'
+
+        progress = []
+        def on_progress(report):
+            progress.append((report.created, report.skipped, len(consumed), Question.query.count()))
+
+        report = import_questions(stream(), quiz.id, batch_size=2, progress=on_progress)
+
+        assert (report.blocks, report.created, report.skipped) == (8, 6, 2)
+        assert [(line, message) for line, message, _ in report.errors] == [
+            (15, 'Correct option must be 1-4'), (50, 'Block must have at least 6 non-empty lines')]
+        # each batch is committed before the next one is read
+        assert [p[:2] for p in progress] == [(2, 0), (4, 1), (6, 1), (6, 2)]
+        assert progress[0][2] < len(lines) and progress[0][3] == 2
+        assert [q.question_statement for q in Question.query.order_by(Question.id)] == \
+            [f'Question {i}?' for i in (1, 2, 4, 5, 6, 7)]
+        assert db.session.get(Quiz, quiz.id).question_version == 3
+
+        db.drop_all()
+
+
+def test_manifest_import_parses_in_parallel_and_writes_once(tmp_path):
+    app = setup_app()
+
+    with app.app_context():
+        db.create_all()
+        subject = Subject(name='S1')
+        db.session.add(subject); db.session.commit()
+        chapter = Chapter(name='C1', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+        quizzes = [Quiz(name=f'Q{i}', chapter_id=chapter.id) for i in range(2)]
+        db.session.add_all(quizzes); db.session.commit()
+
+        (tmp_path / 'banks').mkdir()
+        (tmp_path / 'banks' / 'a.txt').write_text('\n'.join(block(1) + block(2)), encoding='utf-8')
+        (tmp_path / 'banks' / 'b.txt').write_text('\n'.join(block(3) + block(4, correct='x') + block(5)), encoding='utf-8')
+        manifest = tmp_path / 'manifest.csv'
+        manifest.write_text('path,quiz_id\n# comment\n\n'
+                            f'banks/a.txt,{quizzes[0].id}\n'
+                            f'banks/b.txt,{quizzes[1].id}\n'
+                            'banks/missing.txt,{0}\n'
+                            'banks/a.txt,999\n'.format(quizzes[1].id), encoding='utf-8')
+
+        entries = read_manifest(str(manifest))
+        assert entries[0] == (str(tmp_path / 'banks' / 'a.txt'), quizzes[0].id)
+
+        for workers in (0, 2):
+            Question.query.delete(); db.session.commit()
+            reports = import_manifest(entries, workers=workers, batch_size=1)
+            assert [(r.created, r.skipped) for r in reports] == [(2, 0), (2, 1), (0, 1), (0, 1)]
+            assert reports[1].errors[0][:2] == (8, 'Correct option must be an integer 1-4')
+            assert 'No such file' in reports[2].errors[0][1]
+            assert reports[3].errors[0][1] == 'Quiz with id 999 not found'
+            by_quiz = {q.id: sorted(x.question_statement for x in Question.query.filter_by(quiz_id=q.id)) for q in quizzes}
+            assert by_quiz == {quizzes[0].id: ['Question 1?', 'Question 2?'],
+                               quizzes[1].id: ['Question 3?', 'Question 5?']}
+
+        db.drop_all()
@@ -0,0 +1,112 @@
+import os
+import shutil
+import sqlite3
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import inspect
+from app import create_app, db
+from app.models.quiz import Quiz
+from app.models.quiz_attempt import QuizAttempt
+from app.models.score import Score
+from app.models.daily_score import DailyScore
+from app.models.quiz_stats import QuizStats
+from app.models.standing import Standing
+from app.models.user import User
+from app.services import schema_upgrade
+
+SHIPPED_DB = os.path.join(os.path.dirname(__file__), '..', 'quiz_master.db')
+
+
+def setup_app(monkeypatch, path):
+    # a copy of the committed database, which predates every column added since;
+    # Config is imported late so the other tests still see the in-memory URI
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    from config.settings import Config
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', 'sqlite:///' + str(path))
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CERTIFICATE_WORKERS'] = 0
+    return app
+
+
+def test_shipped_database_is_upgraded_in_place(monkeypatch, tmp_path):
+    path = tmp_path / 'quiz_master.db'
+    shutil.copy(SHIPPED_DB, path)
+    app = setup_app(monkeypatch, path)
+    with app.app_context():
+        columns = {table: {c['name'] for c in inspect(db.engine).get_columns(table)}
+                   for table, _, _ in schema_upgrade.COLUMNS}
+        for table, column, _ in schema_upgrade.COLUMNS:
+            assert column in columns[table]
+        quizzes = Quiz.query.all()
+        assert quizzes and {q.question_version for q in quizzes} == {0}
+        assert {q.draw_count for q in quizzes} == {None}
+        # quiz_attempt did not exist, so create_all built it with every column
+        assert QuizAttempt.query.count() == 0
+
+        # derived tables are rebuilt from the existing score history
+        assert Standing.query.count() > 0
+        assert DailyScore.query.count() > 0
+        stats = {s.quiz_id: s for s in QuizStats.query}
+        assert stats and all(s.attempt_count == Score.query.filter_by(quiz_id=quiz_id).count()
+                             for quiz_id, s in stats.items())
+        viewer = User(username='viewer@example.com', fullname='Viewer')
+        viewer.set_password('password123')
+        db.session.add(viewer); db.session.commit()
+
+        # retried submissions still hit a unique attempt_token
+        score = Score.query.first()
+        assert score.attempt_token is None
+        score.attempt_token = 'tok'
+        db.session.commit()
+        twin = Score.query.filter(Score.id != score.id).first()
+        twin.attempt_token = 'tok'
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+        # tables that already existed gain the indexes declared on the models
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            names = {i['name'] for i in inspector.get_indexes(table.name)}
+            assert {ix.name for ix in table.indexes} <= names, table.name
+
+        # running it again changes nothing
+        assert schema_upgrade.upgrade() == []
+
+    # the leaderboard lists the users who already had scores
+    client = app.test_client()
+    client.post('/login', data={'username': 'viewer@example.com', 'password': 'password123'})
+    page = client.get('/leaderboard').get_data(as_text=True)
+    assert 'Someone' in page and 'Nurali' in page
+    # date ranges are answered from the daily rollups
+    page = client.get('/leaderboard?start_date=2025-11-01&end_date=2025-11-30').get_data(as_text=True)
+    assert 'Someone' in page and 'Nurali' in page
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_existing_attempt_table_gains_new_columns(monkeypatch, tmp_path):
+    path = tmp_path / 'quiz_master.db'
+    shutil.copy(SHIPPED_DB, path)
+    conn = sqlite3.connect(path)
+    # quiz_attempt as created before questions were drawn per attempt
+    conn.execute("""CREATE TABLE quiz_attempt (
+        id INTEGER PRIMARY KEY, token VARCHAR(32) NOT NULL UNIQUE,
+        user_id INTEGER NOT NULL REFERENCES user (id), quiz_id INTEGER NOT NULL REFERENCES quiz (id),
+        seed INTEGER NOT NULL, answers TEXT NOT NULL, status VARCHAR(20) NOT NULL,
+        score_id INTEGER REFERENCES score (id), created_at DATETIME, updated_at DATETIME)""")
+    conn.execute("INSERT INTO quiz_attempt (token, user_id, quiz_id, seed, answers, status) "
+                 "VALUES ('old', 1, 1, 7, '{}', 'in_progress')")
+    conn.commit()
+    conn.close()
+
+    app = setup_app(monkeypatch, path)
+    with app.app_context():
+        attempt = QuizAttempt.query.filter_by(token='old').one()
+        assert attempt.question_ids is None and attempt.seed == 7
+        db.session.remove()
+        db.engine.dispose()
@@ -1,6 +1,9 @@
 import os
+import re
 import tempfile
+import threading
 import time
+from datetime import datetime
 from app import create_app, db
 from app.models.user import User
 from app.models.subject import Subject
@@ -10,6 +13,14 @@ from app.models.question import Question
 from app.models.score import Score
 from app.models.answer import Answer
 from app.models.certificate import Certificate
+from app.models.certificate_job import CertificateJob
+from app.models.daily_score import DailyScore
+from app.models.standing import Standing
+from app.services import standings
+from app.services.certificate_queue import get_queue
+from app.services.leaderboard import leaderboard_page, my_rank, decode_cursor
+from app.services.shuffle import option_order
+from sqlalchemy import event
 
 
 def setup_app():
@@ -18,6 +29,8 @@ def setup_app():
     app = create_app()
     app.config['TESTING'] = True
     app.config['WTF_CSRF_ENABLED'] = False
+    # render certificates inside the request instead of on worker threads
+    app.config['CERTIFICATE_WORKERS'] = 0
     # override again to be safe
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
     return app
@@ -78,10 +91,19 @@ def test_scoring_and_certificate_generation(tmp_path):
         get = client.get(f'/attempt_quiz/{quiz.id}')
         assert get.status_code == 200
 
-        # post answers: correct both -> total_awarded = 10 -> percent 100
+        # only the attempt id and seed are kept in the session
+        with client.session_transaction() as sess:
+            attempt = sess[f'quiz_attempt_{quiz.id}']
+        assert set(attempt) == {'id', 'seed'}
+
+        # post answers as shown positions: correct both -> total_awarded = 10 -> percent 100
+        def shown_position(question_id, original):
+            return str(option_order(attempt['seed'], question_id).index(original) + 1)
+
         post_data = {
-            f'question_{q1.id}': '1',
-            f'question_{q2.id}': '2'
+            'attempt_id': attempt['id'],
+            f'question_{q1.id}': shown_position(q1.id, 1),
+            f'question_{q2.id}': shown_position(q2.id, 2)
         }
         rv2 = client.post(f'/attempt_quiz/{quiz.id}', data=post_data, follow_redirects=True)
         assert b'Quiz completed' in rv2.get_data()
@@ -95,8 +117,25 @@ def test_scoring_and_certificate_generation(tmp_path):
         assert len(answers) == 2
         for a in answers:
             assert a.is_correct is True
+            assert a.selected_option == a.question.correct_option
             assert a.points_awarded in (3.0, 7.0)
 
+        # standings were updated in the submission transaction, overall and per subject
+        rows = {(st.subject_id, st.total_score, st.attempt_count) for st in Standing.query.filter_by(user_id=test_user.id)}
+        assert rows == {(0, 10.0, 1), (quiz.chapter.subject_id, 10.0, 1)}
+        standings.rebuild()
+        assert {(st.subject_id, st.total_score, st.attempt_count) for st in Standing.query.filter_by(user_id=test_user.id)} == rows
+        daily = [(d.day, d.subject_id, d.total_score, d.score_count) for d in DailyScore.query.filter_by(user_id=test_user.id)]
+        assert daily == [(sc.timestamp.date(), quiz.chapter.subject_id, 10.0, 1)]
+        standings.backfill_daily()
+        assert [(d.day, d.subject_id, d.total_score, d.score_count) for d in DailyScore.query.filter_by(user_id=test_user.id)] == daily
+
+        # a retried POST of the same attempt returns the stored result without writing again
+        rv3 = client.post(f'/attempt_quiz/{quiz.id}', data=post_data, follow_redirects=True)
+        assert b'already submitted' in rv3.get_data()
+        assert Score.query.filter_by(user_id=test_user.id, quiz_id=quiz.id).count() == 1
+        assert Answer.query.count() == 2
+
         # certificate should be created for >=86%
         cert = Certificate.query.filter_by(user_id=test_user.id, quiz_id=quiz.id).first()
         assert cert is not None
@@ -104,6 +143,17 @@ def test_scoring_and_certificate_generation(tmp_path):
         file_path = os.path.join(os.getcwd(), cert.file_path)
         assert os.path.exists(file_path)
 
+        # download is streamed with a strong ETag and honours conditional/Range requests
+        dl = client.get(f'/certificates/{cert.id}/download')
+        assert dl.status_code == 200
+        assert dl.mimetype == 'application/pdf'
+        etag = dl.headers['ETag']
+        assert not etag.startswith('W/')
+        assert client.get(f'/certificates/{cert.id}/download', headers={'If-None-Match': etag}).status_code == 304
+        partial = client.get(f'/certificates/{cert.id}/download', headers={'Range': 'bytes=0-3'})
+        assert partial.status_code == 206
+        assert partial.get_data() == b'%PDF'
+
         # cleanup created certificate file
         try:
             os.remove(file_path)
@@ -113,6 +163,77 @@ def test_scoring_and_certificate_generation(tmp_path):
         db.drop_all()
 
 
+def test_each_app_has_its_own_certificate_queue():
+    first, second = setup_app(), setup_app()
+    second.config['CERTIFICATE_WORKERS'] = 3
+    with first.app_context():
+        queue = get_queue()
+        assert queue.app is first and queue.workers == 0
+        queue.start()
+    with second.app_context():
+        # a queue started for another app does not leave this one started
+        assert get_queue() is not queue and get_queue().app is second
+        assert get_queue().workers == 3 and not get_queue()._started
+
+
+def test_idle_workers_sweep_once_and_never_requeue_a_queued_job():
+    app = setup_app()
+    app.config['CERTIFICATE_WORKERS'] = 2
+    app.config['CERTIFICATE_POLL_SECONDS'] = 0.05
+    with app.app_context():
+        db.create_all()
+        user = User(username='user@example.com', fullname='Test User', password_hash='-')
+        subject = Subject(name='Math')
+        db.session.add_all([user, subject]); db.session.commit()
+        chapter = Chapter(name='Algebra', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+        quiz = Quiz(name='Quiz1', chapter_id=chapter.id, time_duration=0)
+        db.session.add(quiz); db.session.commit()
+        score = Score(total_scored=1.0, quiz_id=quiz.id, user_id=user.id)
+        db.session.add(score); db.session.commit()
+        # persisted by another process, still pending
+        job = CertificateJob(user_id=user.id, quiz_id=quiz.id, score_id=score.id, total_awarded=1.0,
+                             total_possible=1.0, status='pending')
+        db.session.add(job); db.session.commit()
+        job_id = job.id
+        db.session.remove()
+
+        queue = get_queue()
+        taken, release, sweeps, writes = [], threading.Event(), [], []
+        sweep = queue._requeue_persisted
+
+        def run_job(job_id):
+            # hold the job without claiming it, so it stays pending in the table
+            taken.append(job_id)
+            release.wait(5)
+
+        def count_sweep():
+            sweeps.append(time.monotonic())
+            sweep()
+
+        def count_write(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('UPDATE'):
+                writes.append(statement)
+
+        queue.run_job = run_job
+        queue._requeue_persisted = count_sweep
+        event.listen(db.engine, 'before_cursor_execute', count_write)
+        try:
+            queue.start()
+            # one worker holds the job; the other idles through several poll intervals
+            time.sleep(0.5)
+            assert taken == [job_id] and queue._jobs.qsize() == 0
+            assert len(sweeps) >= 2
+            # no stale rows, so the sweeps never wrote
+            assert writes == []
+        finally:
+            release.set()
+            queue.stop(timeout=5)
+            event.remove(db.engine, 'before_cursor_execute', count_write)
+        assert len(sweeps) <= 0.5 / 0.05 + 3
+        db.drop_all()
+
+
 def test_leaderboard_filter_by_subject():
     app = setup_app()
     client = app.test_client()
@@ -140,6 +261,8 @@ def test_leaderboard_filter_by_subject():
         sc1 = Score(total_scored=5.0, quiz_id=qz1.id, user_id=u1.id)
         sc2 = Score(total_scored=7.0, quiz_id=qz2.id, user_id=u2.id)
         db.session.add_all([sc1,sc2]); db.session.commit()
+        # scores inserted directly bypass the submission path; rebuild the standings
+        standings.rebuild()
 
         # login as one user to access leaderboard
         client.post('/register', data={'username':'viewer@example.com','password':'password123','confirm_password':'password123','fullname':'Viewer','qualification':'','dob':'1990-01-01','avatar':'person-circle'})
@@ -157,4 +280,126 @@ def test_leaderboard_filter_by_subject():
         assert 'U One' in html
         assert 'U Two' not in html
 
-        db.drop_all()
\ No newline at end of file
+        db.drop_all()
+
+
+def test_leaderboard_query_count_is_constant():
+    app = setup_app()
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        subject = Subject(name='S1')
+        db.session.add(subject); db.session.commit()
+        chapter = Chapter(name='C1', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+        quiz = Quiz(name='Q1', chapter_id=chapter.id)
+        db.session.add(quiz); db.session.commit()
+
+        client.post('/register', data={'username':'viewer@example.com','password':'password123','confirm_password':'password123','fullname':'Viewer','qualification':'','dob':'1990-01-01','avatar':'person-circle'})
+        client.post('/login', data={'username':'viewer@example.com','password':'password123'})
+
+        statements = []
+        def count(*args):
+            statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', count)
+
+        def add_users(n, offset):
+            for i in range(offset, offset + n):
+                user = User(username=f'player{i}@example.com', fullname=f'Player {i}')
+                user.set_password('pass')
+                db.session.add(user)
+                db.session.flush()
+                db.session.add_all([Score(total_scored=float(i), quiz_id=quiz.id, user_id=user.id),
+                                    Score(total_scored=1.0, quiz_id=quiz.id, user_id=user.id)])
+            db.session.commit()
+            standings.backfill_daily()
+            app.extensions['leaderboard_cache'].invalidate()
+
+        def queries_for(url):
+            statements.clear()
+            rv = client.get(url)
+            assert rv.status_code == 200
+            return len(statements), rv.get_data(as_text=True)
+
+        url = f'/leaderboard?subject_id={subject.id}&start_date=2000-01-01&min_score=3'
+        add_users(3, 0)
+        small, _ = queries_for(url)
+        add_users(40, 3)
+        large, html = queries_for(url)
+        # the same filters again are served from the response cache
+        cached, cached_html = queries_for(url.replace('min_score=3', 'min_score=3.0'))
+        event.remove(db.engine, 'before_cursor_execute', count)
+        assert cached < large and cached_html == html
+        metrics = app.extensions['leaderboard_cache'].metrics()
+        assert metrics['hits'] == 1 and metrics['misses'] == 2
+
+        assert small == large
+        # min_score applies to the per-user total: Player 1 has 1 + 1 = 2
+        names = re.findall(r'>\s*(Player \d+)\s*</a>', html)
+        assert names == [f'Player {i}' for i in range(42, 1, -1)]
+        # the chart only carries the top of the ranking
+        assert '"Player 42"' in html and '"Player 33"' in html and '"Player 32"' not in html
+
+        db.drop_all()
+
+
+def test_leaderboard_keyset_pages_and_my_rank():
+    app = setup_app()
+    app.config['LEADERBOARD_LIMIT'] = 4
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        subject = Subject(name='S1')
+        db.session.add(subject); db.session.commit()
+        chapter = Chapter(name='C1', subject_id=subject.id)
+        db.session.add(chapter); db.session.commit()
+        quiz = Quiz(name='Q1', chapter_id=chapter.id)
+        db.session.add(quiz); db.session.commit()
+
+        # totals with ties: equal totals are ordered by average, then user id
+        totals = [[5.0], [5.0], [2.0, 3.0], [9.0], [1.0], [5.0], [4.0, 4.0], [0.5], [3.0], [6.0]]
+        users = []
+        for i, points in enumerate(totals):
+            user = User(username=f'player{i}@example.com', fullname=f'Player {i}')
+            user.set_password('pass')
+            db.session.add(user); db.session.flush()
+            db.session.add_all([Score(total_scored=p, quiz_id=quiz.id, user_id=user.id) for p in points])
+            users.append(user)
+        db.session.commit()
+        standings.rebuild()
+        standings.backfill_daily()
+
+        expected = sorted(users, key=lambda u: (-sum(totals[users.index(u)]),
+                                                -sum(totals[users.index(u)]) / len(totals[users.index(u)]), u.id))
+        expected_ids = [u.id for u in expected]
+
+        # standings read, then the aggregate over a date range
+        for start in (None, datetime(2000, 1, 1)):
+            seen, after = [], None
+            while True:
+                entries, cursor = leaderboard_page(start=start, after=after, limit=3)
+                seen.extend(e['user_id'] for e in entries)
+                if cursor is None:
+                    break
+                after = decode_cursor(cursor)
+            assert seen == expected_ids
+
+            for position, user_id in enumerate(expected_ids, start=1):
+                rank = my_rank(user_id, start=start)
+                assert rank['rank'] == position and rank['ranked'] == len(users)
+
+        # pages follow the cursor links through the view
+        client.post('/register', data={'username':'viewer@example.com','password':'password123','confirm_password':'password123','fullname':'Viewer','qualification':'','dob':'1990-01-01','avatar':'person-circle'})
+        client.post('/login', data={'username':'viewer@example.com','password':'password123'})
+        url, names = '/leaderboard', []
+        while url:
+            html = client.get(url).get_data(as_text=True)
+            names.extend(re.findall(r'>\s*(Player \d+)\s*</a>', html))
+            assert 'Your rank' not in html  # the viewer has no scores yet
+            nxt = re.search(r'href="([^"]*after=[^"]*)"[^>]*>Next', html)
+            url = nxt.group(1).replace('&amp;', '&') if nxt else None
+        assert names == [u.fullname for u in expected]
+
+        db.drop_all()
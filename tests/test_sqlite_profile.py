@@ -0,0 +1,48 @@
+import os
+import pytest
+from sqlalchemy import create_engine
+from app import create_app, db
+from app.services import sqlite_profile
+
+
+def setup_app():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CERTIFICATE_WORKERS'] = 0
+    return app
+
+
+def pragma(conn, name):
+    return conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+
+
+def test_production_profile_is_applied_to_every_connection(tmp_path):
+    pragmas = sqlite_profile.pragmas_for({'SQLITE_PROFILE': 'production', 'SQLITE_PRAGMAS': {'busy_timeout': 2500}})
+    engine = create_engine('sqlite:///' + str(tmp_path / 'profile.db'))
+    assert sqlite_profile.listen(engine, pragmas)
+
+    with engine.connect() as first, engine.connect() as second:
+        for conn in (first, second):
+            assert pragma(conn, 'journal_mode') == 'wal'
+            assert pragma(conn, 'synchronous') == 1  # NORMAL
+            assert pragma(conn, 'busy_timeout') == 2500
+            assert pragma(conn, 'cache_size') == -32000
+            assert pragma(conn, 'temp_store') == 2  # MEMORY
+    engine.dispose()
+
+
+def test_default_profile_and_validation():
+    assert sqlite_profile.pragmas_for({'SQLITE_PROFILE': 'default'}) == {}
+    with pytest.raises(ValueError):
+        sqlite_profile.pragmas_for({'SQLITE_PROFILE': 'fastest'})
+    with pytest.raises(ValueError):
+        sqlite_profile.pragmas_for({'SQLITE_PROFILE': 'default', 'SQLITE_PRAGMAS': {'cache_size': '1; DROP TABLE user'}})
+
+
+def test_app_engine_uses_the_configured_profile():
+    app = setup_app()
+    with app.app_context():
+        assert app.extensions['sqlite_profile'] == sqlite_profile.PROFILES[app.config['SQLITE_PROFILE']]
+        assert pragma(db.session.connection(), 'busy_timeout') == 5000
@@ -0,0 +1,68 @@
+import os
+from sqlalchemy import event
+from app import create_app, db
+from app.services import startup
+
+
+def setup_app():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CERTIFICATE_WORKERS'] = 0
+    return app
+
+
+def restart(app):
+    """Forget what this process learned, as a fresh start on the same database would"""
+    app.extensions['startup'] = {'timer': startup.StartupTimer()}
+
+
+def test_unchanged_fingerprint_skips_create_all_and_seed(tmp_path):
+    app = setup_app()
+    seed_file = tmp_path / 'seed.txt'
+    seed_file.write_text('What?\nA\nB\nC\nD\nA\n')
+    app.config['STARTUP_SEED_FILES'] = [str(seed_file)]
+    seeded = []
+
+    def seed():
+        seeded.append(1)
+        return True
+
+    with app.app_context():
+        restart(app)
+        assert startup.initialize(app, seed)
+        assert len(seeded) == 1
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(a[2]))
+        restart(app)
+        assert not startup.ensure_schema(app)
+        assert not startup.initialize(app, seed)
+        assert len(seeded) == 1
+        # one lookup of the stored fingerprint, no PRAGMA/CREATE from create_all
+        assert len(statements) == 1 and 'app_state' in statements[0]
+        summary = app.extensions['startup']['timer'].summary()
+        assert 'create_all skipped' in summary and 'seed skipped' in summary
+
+        # a changed seed file re-runs the initialization once
+        seed_file.write_text('What?\nA\nB\nC\nD\nA\n\nWhy?\nA\nB\nC\nD\nB\n')
+        restart(app)
+        assert startup.initialize(app, seed)
+        restart(app)
+        assert not startup.initialize(app, seed)
+        assert len(seeded) == 2
+
+        # a failed seed does not store the fingerprint, so the next start retries
+        seed_file.write_text('Who?\nA\nB\nC\nD\nC\n')
+        restart(app)
+        assert startup.initialize(app, lambda: False)
+        restart(app)
+        assert startup.initialize(app, seed)
+        assert len(seeded) == 3
+
+        # disabled fingerprinting always initializes
+        app.config['STARTUP_FINGERPRINT'] = False
+        restart(app)
+        assert startup.initialize(app, seed)
+        assert len(seeded) == 4
@@ -0,0 +1,181 @@
+import os
+import re
+import pytest
+from app import create_app, db
+from app.models.user import User
+from app.models.subject import Subject
+from app.models.chapter import Chapter
+from app.models.quiz import Quiz
+from app.models.question import Question
+from app.models.score import Score
+from app.models.certificate_job import CertificateJob
+from app.services import certificates
+from app.services.grading import grade, load_answer_key
+from app.services.shuffle import option_order
+from app.services.submission_writer import DuplicateSubmission, PendingSubmission, get_writer
+from concurrent.futures import Future
+
+
+def setup_app():
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CERTIFICATE_WORKERS'] = 0
+    app.config['SUBMISSION_WRITER'] = True
+    return app
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    # rendered certificates go to a temporary directory, not static/certificates
+    monkeypatch.setattr(certificates, 'CERTIFICATES_DIR', str(tmp_path))
+    app = setup_app()
+    try:
+        yield app
+    finally:
+        with app.app_context():
+            get_writer().stop(timeout=5)
+            db.session.remove()
+            db.drop_all()
+
+
+def create_quiz():
+    subject = Subject(name='Math')
+    db.session.add(subject); db.session.commit()
+    chapter = Chapter(name='Algebra', subject_id=subject.id)
+    db.session.add(chapter); db.session.commit()
+    quiz = Quiz(name='Quiz1', chapter_id=chapter.id, time_duration=0)
+    db.session.add(quiz); db.session.commit()
+    db.session.add_all([Question(question_statement=f'q{i}', option1='a', option2='b', option3='c', option4='d',
+                                 correct_option=1, quiz_id=quiz.id, points=1) for i in range(4)])
+    db.session.commit()
+    return quiz
+
+
+def pending(quiz_id, user_id, token, correct=True):
+    answer_key = load_answer_key(quiz_id)
+    graded = grade(answer_key, [1 if correct else 2] * len(answer_key.question_ids))
+    certificate = (graded.total_awarded, graded.total_possible) if correct else None
+    return PendingSubmission(quiz_id, user_id, answer_key, graded, token, None, certificate, Future())
+
+
+def test_submit_through_the_writer(app, tmp_path):
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        user = User(username='student@example.com', fullname='Student')
+        user.set_password('password123')
+        db.session.add(user); db.session.commit()
+        quiz = create_quiz()
+        quiz_id, question_ids = quiz.id, [q.id for q in quiz.questions]
+
+    client.post('/login', data={'username': 'student@example.com', 'password': 'password123'})
+    page = client.get(f'/attempt_quiz/{quiz_id}').get_data(as_text=True)
+    token = re.search(r'name="attempt_id" value="([^"]+)"', page).group(1)
+    with client.session_transaction() as sess:
+        seed = sess[f'quiz_attempt_{quiz_id}']['seed']
+    # the shown position of the correct (first) option, so the attempt earns a certificate
+    form = {f'question_{qid}': str(option_order(seed, qid).index(1) + 1) for qid in question_ids}
+    form['attempt_id'] = token
+
+    response = client.post(f'/attempt_quiz/{quiz_id}', data=form)
+    assert response.status_code == 302 and f'/quiz_results/{quiz_id}' in response.headers['Location']
+    # a retry is answered with the stored result
+    assert client.post(f'/attempt_quiz/{quiz_id}', data=form).status_code == 302
+
+    with app.app_context():
+        scores = Score.query.filter_by(quiz_id=quiz_id).all()
+        assert len(scores) == 1 and scores[0].attempt_token == token
+        metrics = get_writer().metrics()
+        assert metrics['written'] == 1 and metrics['batches'] == 1
+        assert CertificateJob.query.one().status == 'done'
+        assert len(list(tmp_path.glob('certificate_*.pdf'))) == 1
+
+
+def test_group_commit_rejects_duplicates_and_isolates_failures(app):
+    with app.app_context():
+        db.create_all()
+        users = [User(username=f's{i}@example.com', fullname=f'S{i}', password_hash='-') for i in range(3)]
+        db.session.add_all(users); db.session.commit()
+        quiz = create_quiz()
+        writer = get_writer()
+
+        first = [pending(quiz.id, users[0].id, 'tok-a'), pending(quiz.id, users[1].id, 'tok-b', correct=False),
+                 pending(quiz.id, users[2].id, 'tok-a')]
+        writer.write(first)
+        saved = first[0].future.result()
+        assert saved.job_id == db.session.query(CertificateJob.id).filter_by(score_id=saved.score_id).scalar()
+        assert first[1].future.result().job_id is None
+        with pytest.raises(DuplicateSubmission):
+            first[2].future.result()
+
+        # an invalid row fails the group commit; the others are written one by one
+        second = [pending(quiz.id, users[2].id, 'tok-c'), pending(quiz.id, None, 'tok-d'),
+                  pending(quiz.id, users[0].id, 'tok-a')]
+        writer.write(second)
+        assert second[0].future.result().score_id
+        assert second[1].future.exception() is not None
+        assert isinstance(second[2].future.exception(), DuplicateSubmission)
+
+        assert sorted(t for (t,) in db.session.query(Score.attempt_token)) == ['tok-a', 'tok-b', 'tok-c']
+        metrics = writer.metrics()
+        assert metrics['batches'] == 2 and metrics['written'] == 3
+        assert metrics['rejected'] == 2 and metrics['fallbacks'] == 1
+
+
+def test_concurrent_submissions_share_a_commit(app):
+    app.config['SUBMISSION_BATCH_WAIT_MS'] = 500
+    with app.app_context():
+        db.create_all()
+        user = User(username='s@example.com', fullname='S', password_hash='-')
+        db.session.add(user); db.session.commit()
+        quiz = create_quiz()
+        writer = get_writer()
+        items = [pending(quiz.id, user.id, f'tok-{i}') for i in range(5)]
+        futures = [writer.save(*item[:-1]) for item in items]
+        assert all(f.result(timeout=10).score_id for f in futures)
+        writer.stop(timeout=5)
+        assert writer.metrics()['batches'] == 1 and writer.metrics()['max_batch'] == 5
+
+
+def test_writer_timeout_asks_for_a_retry_unless_the_result_landed(app, monkeypatch):
+    app.config['SUBMISSION_WRITER_TIMEOUT'] = 0.05
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        user = User(username='student@example.com', fullname='Student')
+        user.set_password('password123')
+        db.session.add(user); db.session.commit()
+        quiz = create_quiz()
+        user_id, quiz_id, question_ids = user.id, quiz.id, [q.id for q in quiz.questions]
+        writer = get_writer()
+    landed = []
+
+    def save(*args, **kwargs):
+        # the writer never answers; optionally the submission is committed meanwhile
+        db.session.commit()
+        if landed:
+            db.session.add(Score(quiz_id=quiz_id, user_id=user_id, total_scored=4, attempt_token=kwargs['attempt_token']))
+            db.session.commit()
+        return Future()
+
+    monkeypatch.setattr(writer, 'save', save)
+    client.post('/login', data={'username': 'student@example.com', 'password': 'password123'})
+
+    def submit():
+        page = client.get(f'/attempt_quiz/{quiz_id}').get_data(as_text=True)
+        form = {f'question_{qid}': '1' for qid in question_ids}
+        form['attempt_id'] = re.search(r'name="attempt_id" value="([^"]+)"', page).group(1)
+        return client.post(f'/attempt_quiz/{quiz_id}', data=form)
+
+    response = submit()
+    assert response.status_code == 302 and response.headers['Location'].endswith(f'/attempt_quiz/{quiz_id}')
+    assert b'Please submit the quiz again' in client.get(response.headers['Location']).data
+
+    landed.append(True)
+    response = submit()
+    assert response.status_code == 302 and f'/quiz_results/{quiz_id}' in response.headers['Location']
+
+    with app.app_context():
+        assert Score.query.filter_by(quiz_id=quiz_id).count() == 1